@@ -4,7 +4,6 @@ import os.path
 import sys
 import argparse
 import subprocess
-import hashlib
 
 import environs
 from environs import Env
@@ -24,6 +23,9 @@ from report import verifier_report
 from signedchart import signedchart
 from pullrequest import prartifact
 from tools import gitutils
+from tools import packagedigest
+from tools import releasemanifest
+from chartrepomanager import indexannotations
 
 def write_error_log(directory, *msg):
     os.makedirs(directory, exist_ok=True)
@@ -255,6 +257,7 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
     report = report_info.get_report_results(report_path=report_path,report_info_path=report_info_path,profile_type=vendor_type)
 
     label_names = prartifact.get_labels(api_url)
+    redhat_to_community = False
 
     failed = report["failed"]
     passed = report["passed"]
@@ -270,6 +273,7 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
         write_error_log(directory, *msgs)
         if vendor_type == "redhat":
             gitutils.add_output("redhat_to_community","True")
+            redhat_to_community = True
         if vendor_type != "redhat" and "force-publish" not in label_names:
             if vendor_type == "community":
                 # requires manual review and approval
@@ -283,7 +287,7 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
         sys.exit(1)
 
     if failures_in_report or vendor_type == "community":
-        return
+        return redhat_to_community
 
     if "charts.openshift.io/testedOpenShiftVersion" in annotations:
         full_version = annotations["charts.openshift.io/testedOpenShiftVersion"]
@@ -301,16 +305,31 @@ def check_report_success(directory, api_url, report_path, report_info_path, vers
             write_error_log(directory, msg)
             sys.exit(1)
 
+    return redhat_to_community
+
+def write_release_manifest(directory, category, organization, chart, version, report_path, report_info_path, redhat_to_community):
+    print("[INFO] Write release manifest. %s, %s, %s, %s" % (category, organization, chart, version))
+    try:
+        chart_entry = report_info.get_report_chart(report_path=report_path, report_info_path=report_info_path)
+        chart_url = report_info.get_report_chart_url(report_path=report_path, report_info_path=report_info_path)
+        digests = report_info.get_report_digests(report_path=report_path, report_info_path=report_info_path)
+        annotations = indexannotations.getIndexAnnotations(report_path)
+        manifest = releasemanifest.create_manifest(category, organization, chart, version, report_path, chart_entry, chart_url,
+                                                   annotations, digests, redhat_to_community)
+        releasemanifest.write_manifest(directory, manifest)
+    except (Exception, SystemExit) as err:
+        # the release computes the values itself without a manifest
+        print(f"[WARNING] release manifest not written: {err}")
+
 def verify_package_digest(url,report):
     print("[INFO] check package digest.")
 
-    response = requests.get(url, allow_redirects=True)
-    if response.status_code == 200:
-        target_digest = hashlib.sha256(response.content).hexdigest()
+    _, target_digest = packagedigest.get_package_digest(url)
 
-    found,report_data = verifier_report.get_report_data(report)
-    if found:
-        pkg_digest = verifier_report.get_package_digest(report_data)
+    pkg_digest = ""
+    verified_report = verifier_report.get_verifier_report(report)
+    if verified_report:
+        pkg_digest = verified_report.package_digest
 
     if target_digest:
         if pkg_digest and pkg_digest != target_digest:
@@ -382,4 +401,5 @@ def main():
 
 
     match_name_and_version(args.directory, category, organization, chart, version, generated_report_path)
-    check_report_success(args.directory, args.api_url, report_path, report_info_path, version)
+    redhat_to_community = check_report_success(args.directory, args.api_url, report_path, report_info_path, version)
+    write_release_manifest(args.directory, category, organization, chart, version, report_path, report_info_path, redhat_to_community)
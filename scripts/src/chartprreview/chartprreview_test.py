@@ -1,5 +1,7 @@
 import os
+import hashlib
 import pytest
+from chartprreview import chartprreview
 from chartprreview.chartprreview import verify_user
 from chartprreview.chartprreview import check_owners_file_against_directory_structure
 from chartprreview.chartprreview import write_error_log
@@ -75,3 +77,26 @@ def test_write_error_log(tmpdir):
     write_error_log(tmpdir, "First message", "Second message")
     msg = open(os.path.join(tmpdir, "errors")).read()
     assert msg == "First message\nSecond message\n"
+
+@pytest.fixture
+def chart_url(static_server, monkeypatch):
+    url = f"{static_server.url}/chart-0.1.0.tgz"
+    monkeypatch.setattr(chartprreview.report_info, "get_report_chart_url", lambda report_path: url)
+    monkeypatch.setattr(chartprreview.verifier_report, "get_verifier_report", lambda report: None)
+    monkeypatch.setattr(chartprreview.packagedigest, "package_digests", {})
+    monkeypatch.delenv(chartprreview.packagedigest.CACHE_DIR_ENV, raising=False)
+    return url
+
+def test_check_url(static_server, chart_url, tmpdir):
+    static_server.files["/chart-0.1.0.tgz"] = b"package"
+    chartprreview.check_url(str(tmpdir), "report.yaml")
+    assert static_server.head_requests == ["/chart-0.1.0.tgz"]
+    assert static_server.requests == [("/chart-0.1.0.tgz", None)]
+    assert chartprreview.packagedigest.package_digests[chart_url] == hashlib.sha256(b"package").hexdigest()
+    assert not os.path.exists(os.path.join(tmpdir, "errors"))
+
+def test_check_url_not_accessible(static_server, chart_url, tmpdir):
+    with pytest.raises(Exception, match="unable to compute SHA256 digest"):
+        chartprreview.check_url(str(tmpdir), "report.yaml")
+    with open(os.path.join(tmpdir, "errors")) as fd:
+        assert "404 Client Error" in fd.read()
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import subprocess
+
+import pytest
+
+from chartrepomanager import chartrepomanager
+
+
+def git(cwd, *args):
+    out = subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com"] + list(args),
+                         cwd=cwd, check=True, capture_output=True)
+    return out.stdout.decode("utf-8")
+
+
+def make_repository(tmpdir):
+    remote = os.path.join(tmpdir, "charts.git")
+    git(tmpdir, "init", "-q", "--bare", "-b", "main", remote)
+    seed = os.path.join(tmpdir, "seed")
+    git(tmpdir, "init", "-q", "-b", "gh-pages", seed)
+    for name in ["index.yaml", "unpublished-certified-charts.yaml", "README.md"]:
+        with open(os.path.join(seed, name), "w") as fd:
+            fd.write(f"{name}\n")
+    for commit in range(3):
+        with open(os.path.join(seed, "index.yaml"), "a") as fd:
+            fd.write(f"{commit}\n")
+        git(seed, "add", ".")
+        git(seed, "commit", "-q", "-m", f"commit {commit}")
+    git(seed, "push", "-q", remote, "gh-pages")
+    git(seed, "push", "-q", remote, "gh-pages:main")
+
+    checkout = os.path.join(tmpdir, "checkout")
+    git(tmpdir, "clone", "-q", "-b", "main", "--depth=1", f"file://{remote}", checkout)
+    return remote, checkout
+
+
+def test_create_worktree_for_index(tmpdir, monkeypatch):
+    remote, checkout = make_repository(str(tmpdir))
+    monkeypatch.chdir(checkout)
+    monkeypatch.setenv("GITHUB_SERVER_URL", "file://" + os.path.dirname(remote))
+    monkeypatch.setenv("GITHUB_REPOSITORY", os.path.basename(remote))
+    worktree = os.path.join(tmpdir, "index-worktree")
+    monkeypatch.setenv("INDEX_WORKTREE_DIR", worktree)
+
+    assert chartrepomanager.create_worktree_for_index("gh-pages") == worktree
+    assert sorted(name for name in os.listdir(worktree) if name != ".git") == sorted(chartrepomanager.INDEX_FILES)
+    assert git(worktree, "rev-list", "--count", "HEAD").strip() == "1"
+
+    # a new commit on the index branch is picked up by the reused worktree
+    other = os.path.join(tmpdir, "other")
+    git(str(tmpdir), "clone", "-q", "-b", "gh-pages", remote, other)
+    with open(os.path.join(other, "index.yaml"), "a") as fd:
+        fd.write("new\n")
+    git(other, "commit", "-q", "-am", "new")
+    git(other, "push", "-q", "origin", "gh-pages")
+
+    assert chartrepomanager.create_worktree_for_index("gh-pages") == worktree
+    with open(os.path.join(worktree, "index.yaml")) as fd:
+        assert fd.read().endswith("new\n")
+    assert not os.path.exists(os.path.join(worktree, "README.md"))
+
+
+def test_manifest_package_digest_is_checked(static_server, monkeypatch):
+    monkeypatch.setattr(chartrepomanager.packagedigest, "package_digests", {})
+    monkeypatch.delenv(chartrepomanager.packagedigest.CACHE_DIR_ENV, raising=False)
+    chart_url = f"{static_server.url}/awesome-1.0.0.tgz"
+    static_server.files["/awesome-1.0.0.tgz"] = b"uploaded package"
+    manifest = {"chart_url": chart_url,
+                "chart_entry": {"name": "awesome", "version": "1.0.0"},
+                "annotations": {},
+                "digests": {"package": "0" * 64},
+                "redhat_to_community": False}
+
+    chart_entry, url = chartrepomanager.create_index_from_report("partners", "report.yaml", manifest)
+    with pytest.raises(Exception, match="integrity issue"):
+        chartrepomanager.prepare_chart_entry(chart_entry, url, False, "now")
+    assert static_server.requests == [("/awesome-1.0.0.tgz", None)]
+
+    manifest["digests"]["package"] = hashlib.sha256(b"uploaded package").hexdigest()
+    chart_entry, url = chartrepomanager.create_index_from_report("partners", "report.yaml", manifest)
+    chartrepomanager.prepare_chart_entry(chart_entry, url, False, "now")
+    assert chart_entry["digest"] == manifest["digests"]["package"]
+
+
+def test_add_released_package_digest(tmpdir, monkeypatch):
+    monkeypatch.setattr(chartrepomanager.packagedigest, "package_digests", {})
+    monkeypatch.chdir(tmpdir)
+    os.mkdir(".cr-release-packages")
+    with open(os.path.join(".cr-release-packages", "awesome-1.0.0.tgz"), "wb") as fd:
+        fd.write(b"released package")
+    chart_url = "https://github.com/acme/charts/releases/download/acme-awesome-1.0.0/awesome-1.0.0.tgz"
+
+    chartrepomanager.add_released_package_digest("awesome-1.0.0.tgz", chart_url)
+    chart_entry = {"name": "awesome", "version": "1.0.0", "annotations": {}}
+    chartrepomanager.prepare_chart_entry(chart_entry, chart_url, False, "now")
+    assert chart_entry["digest"] == hashlib.sha256(b"released package").hexdigest()
+
+
+def test_get_release_files(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    os.mkdir(".cr-release-packages")
+    for path in [".cr-release-packages/awesome-1.0.0.tgz", ".cr-release-packages/awesome-1.0.0.tgz.prov", "key.asc", "report.yaml"]:
+        with open(path, "w") as fd:
+            fd.write(path)
+
+    assert chartrepomanager.get_release_files("awesome-1.0.0.tgz", "key.asc") == [
+        ".cr-release-packages/awesome-1.0.0.tgz", ".cr-release-packages/awesome-1.0.0.tgz.prov", "key.asc", "report.yaml"]
+    assert chartrepomanager.get_release_files("awesome-1.0.0.tgz", "key.asc", web_catalog_only=True) == [
+        ".cr-release-packages/awesome-1.0.0.tgz", ".cr-release-packages/awesome-1.0.0.tgz.prov"]
+    assert chartrepomanager.get_release_files("", "key.asc") == ["key.asc", "report.yaml"]
@@ -0,0 +1,178 @@
+"""
+Create a GitHub release and upload its assets.
+
+The release of a chart is created for the release tag if it does not exist yet, then the
+assets (chart package, provenance file, public key file and report) are uploaded at the
+same time. requests sessions are not thread safe, each upload thread uses its own
+session. An asset already in the release with the same size,
+and the same sha256 digest if the release API reports one, is not uploaded again, so the
+upload can safely be run again. An asset with the same name but different content is
+replaced.
+
+Requests failing with a connection error or a transient status code are retried with
+backoff. The API base URL is GITHUB_API_URL (set by GitHub Actions), assets are uploaded
+to the upload_url of the release.
+"""
+
+import os
+import sys
+import time
+import threading
+from concurrent import futures
+
+import requests
+
+sys.path.append('../')
+from tools import cacheutils
+
+DEFAULT_API_URL = "https://api.github.com"
+ATTEMPTS = 5
+BACKOFF_BASE = 1
+TIMEOUT = 60
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_UPLOADS = 4
+
+CONTENT_TYPES = {".tgz": "application/gzip",
+                 ".yaml": "application/yaml"}
+
+class ReleaseError(Exception):
+    pass
+
+def get_api_url():
+    return os.environ.get("GITHUB_API_URL", DEFAULT_API_URL).rstrip("/")
+
+def create_session(token):
+    session = requests.Session()
+    session.headers.update({"Accept": "application/vnd.github.v3+json"})
+    if token:
+        session.headers.update({"Authorization": f"Bearer {token}"})
+    return session
+
+def _request(session, method, url, upload_path="", **kwargs):
+    """Send the request, retrying connection errors and transient status codes."""
+    for attempt in range(ATTEMPTS):
+        if attempt:
+            time.sleep(BACKOFF_BASE * 2 ** (attempt - 1))
+        try:
+            if upload_path:
+                with open(upload_path, "rb") as fd:
+                    response = session.request(method, url, data=fd, timeout=TIMEOUT, **kwargs)
+            else:
+                response = session.request(method, url, timeout=TIMEOUT, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as err:
+            print(f"[WARNING] {method} {url} failed, attempt {attempt+1} of {ATTEMPTS}: {err}")
+            if attempt + 1 == ATTEMPTS:
+                raise ReleaseError(f"{method} {url} failed: {err}")
+            continue
+        if response.status_code not in RETRY_STATUS_CODES or attempt + 1 == ATTEMPTS:
+            return response
+        print(f"[WARNING] {method} {url} returned {response.status_code}, attempt {attempt+1} of {ATTEMPTS}")
+
+def _check(response, action):
+    if response.status_code >= 400:
+        raise ReleaseError(f"{action} failed with {response.status_code}: {response.text}")
+    return response
+
+def get_or_create_release(session, repository, tag, commit="", body=""):
+    """Return the release for tag, creating it if it does not exist."""
+    releases_url = f"{get_api_url()}/repos/{repository}/releases"
+    response = _request(session, "GET", f"{releases_url}/tags/{tag}")
+    if response.status_code == 200:
+        print(f"[INFO] Release {tag} exists")
+        return response.json()
+    if response.status_code != 404:
+        _check(response, f"Getting release {tag}")
+
+    release = {"tag_name": tag, "name": tag, "body": body}
+    if commit:
+        release["target_commitish"] = commit
+    response = _request(session, "POST", releases_url, json=release)
+    if response.status_code == 422:
+        # created by an earlier attempt whose response was lost
+        response = _request(session, "GET", f"{releases_url}/tags/{tag}")
+    print(f"[INFO] Release {tag} created")
+    return _check(response, f"Creating release {tag}").json()
+
+def get_release_assets(session, repository, release):
+    assets = []
+    url = f"{get_api_url()}/repos/{repository}/releases/{release['id']}/assets"
+    params = {"per_page": 100, "page": 1}
+    while True:
+        page = _check(_request(session, "GET", url, params=params), "Listing release assets").json()
+        assets.extend(page)
+        if len(page) < params["per_page"]:
+            return assets
+        params["page"] += 1
+
+def is_same_asset(asset, path):
+    """Return True if asset has the content of the file at path.
+
+    An asset without a digest is never the same, its content cannot be compared.
+    """
+    if not asset.get("digest") or asset.get("size") != os.path.getsize(path):
+        return False
+    return asset["digest"] == "sha256:" + cacheutils.get_file_digest(path)
+
+def delete_asset(session, repository, asset):
+    _check(_request(session, "DELETE", f"{get_api_url()}/repos/{repository}/releases/assets/{asset['id']}"),
+           f"Deleting release asset {asset['name']}")
+
+def upload_asset(session, repository, release, path, existing_asset=None):
+    """Upload the file at path to the release, return False if it was already uploaded."""
+    name = os.path.basename(path)
+    if existing_asset:
+        if is_same_asset(existing_asset, path):
+            print(f"[INFO] Release asset {name} already uploaded")
+            return False
+        print(f"[INFO] Replace release asset {name}")
+        delete_asset(session, repository, existing_asset)
+
+    upload_url = release["upload_url"].split("{")[0]
+    content_type = CONTENT_TYPES.get(os.path.splitext(name)[1], "application/octet-stream")
+    response = _request(session, "POST", upload_url, upload_path=path, params={"name": name},
+                        headers={"Content-Type": content_type})
+    if response.status_code == 422:
+        # uploaded by an earlier attempt whose response was lost
+        uploaded = {asset["name"]: asset for asset in get_release_assets(session, repository, release)}
+        if name in uploaded:
+            if is_same_asset(uploaded[name], path):
+                return True
+            print(f"[INFO] Replace release asset {name} left by an earlier attempt")
+            delete_asset(session, repository, uploaded[name])
+            response = _request(session, "POST", upload_url, upload_path=path, params={"name": name},
+                                headers={"Content-Type": content_type})
+    _check(response, f"Uploading release asset {name}")
+    print(f"[INFO] Release asset {name} uploaded")
+    return True
+
+def upload_release(repository, tag, paths, commit="", body="", token=None):
+    """Create the release for tag if needed and upload the files in paths as its assets.
+
+    Returns the release. Raises ReleaseError if the release or an asset upload failed.
+    """
+    if token is None:
+        token = os.environ.get("GITHUB_TOKEN")
+
+    thread_sessions = threading.local()
+    sessions = []
+
+    def get_session():
+        if not hasattr(thread_sessions, "session"):
+            thread_sessions.session = create_session(token)
+            sessions.append(thread_sessions.session)
+        return thread_sessions.session
+
+    def upload(path, existing_asset):
+        return upload_asset(get_session(), repository, release, path, existing_asset)
+
+    try:
+        release = get_or_create_release(get_session(), repository, tag, commit, body)
+        existing = {asset["name"]: asset for asset in get_release_assets(get_session(), repository, release)}
+        with futures.ThreadPoolExecutor(max_workers=MAX_UPLOADS) as executor:
+            uploads = [executor.submit(upload, path, existing.get(os.path.basename(path))) for path in paths]
+            for upload_future in uploads:
+                upload_future.result()
+    finally:
+        for session in sessions:
+            session.close()
+    return release
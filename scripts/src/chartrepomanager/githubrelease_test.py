@@ -0,0 +1,167 @@
+import hashlib
+import http.server
+import json
+import threading
+import urllib.parse
+
+import pytest
+import requests
+
+from chartrepomanager import githubrelease
+
+
+class ReleasesHandler(http.server.BaseHTTPRequestHandler):
+    """Stand-in for the GitHub releases API of repository acme/charts."""
+    releases = {}
+    assets = {}
+    requests = []
+    failures = 0
+    digests = True
+
+    def send_json(self, status, body):
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        ReleasesHandler.requests.append(("GET", url.path))
+        if url.path.startswith("/repos/acme/charts/releases/tags/"):
+            tag = url.path.split("/")[-1]
+            if tag in ReleasesHandler.releases:
+                self.send_json(200, ReleasesHandler.releases[tag])
+            else:
+                self.send_json(404, {"message": "Not Found"})
+        elif url.path.endswith("/assets"):
+            self.send_json(200, list(ReleasesHandler.assets.values()))
+        else:
+            self.send_json(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        url = urllib.parse.urlparse(self.path)
+        body = self.read_body()
+        ReleasesHandler.requests.append(("POST", url.path))
+        if url.path == "/repos/acme/charts/releases":
+            release = json.loads(body)
+            release.update({"id": 1, "upload_url": f"http://127.0.0.1:{self.server.server_port}/upload/releases/1/assets{{?name,label}}"})
+            ReleasesHandler.releases[release["tag_name"]] = release
+            self.send_json(201, release)
+        elif url.path == "/upload/releases/1/assets":
+            if ReleasesHandler.failures:
+                ReleasesHandler.failures -= 1
+                self.send_json(502, {"message": "Bad Gateway"})
+                return
+            name = urllib.parse.parse_qs(url.query)["name"][0]
+            if name in ReleasesHandler.assets:
+                self.send_json(422, {"message": "Validation Failed", "errors": [{"code": "already_exists"}]})
+                return
+            asset = {"id": len(ReleasesHandler.requests), "name": name, "size": len(body),
+                     "content_type": self.headers["Content-Type"]}
+            if ReleasesHandler.digests:
+                asset["digest"] = "sha256:" + hashlib.sha256(body).hexdigest()
+            ReleasesHandler.assets[name] = asset
+            self.send_json(201, asset)
+        else:
+            self.send_json(404, {"message": "Not Found"})
+
+    def do_DELETE(self):
+        ReleasesHandler.requests.append(("DELETE", self.path))
+        asset_id = int(self.path.split("/")[-1])
+        ReleasesHandler.assets = {name: asset for name, asset in ReleasesHandler.assets.items() if asset["id"] != asset_id}
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch, serve):
+    ReleasesHandler.releases = {}
+    ReleasesHandler.assets = {}
+    ReleasesHandler.requests = []
+    ReleasesHandler.failures = 0
+    ReleasesHandler.digests = True
+    monkeypatch.setattr(githubrelease, "BACKOFF_BASE", 0)
+    monkeypatch.setenv("GITHUB_API_URL", serve(ReleasesHandler))
+
+
+def write(path, content):
+    with open(path, "wb") as fd:
+        fd.write(content)
+    return str(path)
+
+
+def test_upload_release(server, tmpdir, monkeypatch):
+    create_session = githubrelease.create_session
+    session_threads = {}
+
+    def request(session, method, url, **kwargs):
+        session_threads.setdefault(id(session), set()).add(threading.get_ident())
+        return requests.Session.request(session, method, url, **kwargs)
+
+    def create_tracked_session(token):
+        session = create_session(token)
+        session.request = request.__get__(session)
+        return session
+    monkeypatch.setattr(githubrelease, "create_session", create_tracked_session)
+
+    paths = [write(tmpdir / "chart-0.1.0.tgz", b"package" * 1000),
+             write(tmpdir / "chart-0.1.0.tgz.prov", b"provenance"),
+             write(tmpdir / "report.yaml", b"report")]
+    ReleasesHandler.failures = 1
+
+    release = githubrelease.upload_release("acme/charts", "acme-chart-0.1.0", paths, "abc123", "A chart", token="token")
+    assert release["target_commitish"] == "abc123"
+    assert release["body"] == "A chart"
+    assert sorted(ReleasesHandler.assets) == ["chart-0.1.0.tgz", "chart-0.1.0.tgz.prov", "report.yaml"]
+    assert ReleasesHandler.assets["chart-0.1.0.tgz"]["size"] == 7000
+    assert ReleasesHandler.assets["chart-0.1.0.tgz"]["content_type"] == "application/gzip"
+    # a session is never shared between threads
+    assert len(session_threads) > 1
+    assert all(len(threads) == 1 for threads in session_threads.values())
+
+    # a second run only replaces the changed asset
+    write(tmpdir / "report.yaml", b"updated report")
+    ReleasesHandler.requests = []
+    githubrelease.upload_release("acme/charts", "acme-chart-0.1.0", paths, "abc123", "A chart", token="token")
+    changes = [request for request in ReleasesHandler.requests if request[0] != "GET"]
+    assert [method for method, _ in changes] == ["DELETE", "POST"]
+    assert changes[0][1].startswith("/repos/acme/charts/releases/assets/")
+    assert ReleasesHandler.assets["report.yaml"]["size"] == len(b"updated report")
+
+
+def test_asset_without_digest_is_replaced(server, tmpdir):
+    paths = [write(tmpdir / "chart-0.1.0.tgz", b"package")]
+    ReleasesHandler.digests = False
+    githubrelease.upload_release("acme/charts", "acme-chart-0.1.0", paths, token="token")
+
+    # same size, different content: without a digest the asset is replaced
+    write(tmpdir / "chart-0.1.0.tgz", b"PACKAGE")
+    ReleasesHandler.digests = True
+    ReleasesHandler.requests = []
+    githubrelease.upload_release("acme/charts", "acme-chart-0.1.0", paths, token="token")
+    assert [method for method, _ in ReleasesHandler.requests if method != "GET"] == ["DELETE", "POST"]
+    assert ReleasesHandler.assets["chart-0.1.0.tgz"]["digest"] == "sha256:" + hashlib.sha256(b"PACKAGE").hexdigest()
+
+    # with the digest the same asset is kept
+    ReleasesHandler.requests = []
+    githubrelease.upload_release("acme/charts", "acme-chart-0.1.0", paths, token="token")
+    assert [method for method, _ in ReleasesHandler.requests if method != "GET"] == []
+
+
+def test_asset_left_by_an_earlier_attempt_is_replaced(server, tmpdir):
+    path = write(tmpdir / "chart-0.1.0.tgz", b"package")
+    release = githubrelease.upload_release("acme/charts", "acme-chart-0.1.0", [], token="token")
+    ReleasesHandler.assets["chart-0.1.0.tgz"] = {"id": 99, "name": "chart-0.1.0.tgz", "size": 7}
+
+    session = githubrelease.create_session("token")
+    assert githubrelease.upload_asset(session, "acme/charts", release, path) is True
+    assert [method for method, _ in ReleasesHandler.requests if method != "GET"][-3:] == ["POST", "DELETE", "POST"]
+    assert ReleasesHandler.assets["chart-0.1.0.tgz"]["digest"] == "sha256:" + hashlib.sha256(b"package").hexdigest()
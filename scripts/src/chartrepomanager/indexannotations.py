@@ -1,35 +1,35 @@
 import sys
+import functools
 import semantic_version
-import requests
-import yaml
 import json
 
 sys.path.append('../')
 from report import report_info
+from chartrepomanager import kubeversionmap
 
 kubeOpenShiftVersionMap = {}
+ocpVersionResolver = None
 
 def getKubVersionMap():
 
     if not kubeOpenShiftVersionMap:
-        content = requests.get("https://github.com/redhat-certification/chart-verifier/blob/main/internal/tool/kubeOpenShiftVersionMap.yaml?raw=true")
-
-        version_data = yaml.safe_load(content.text)
-        for kubeVersion in version_data["versions"]:
-            kubeOpenShiftVersionMap[kubeVersion["kube-version"]] = kubeVersion["ocp-version"]
+        kubeOpenShiftVersionMap.update(kubeversionmap.get_version_map())
 
     return  kubeOpenShiftVersionMap
 
 
-def getOCPVersions(kubeVersion):
+@functools.lru_cache(maxsize=None)
+def getNpmSpec(spec):
+    return semantic_version.NpmSpec(spec)
 
-    if kubeVersion == "":
-        return "N/A"
+
+def fixKubeVersion(kubeVersion):
+    """Return kubeVersion as a valid NpmSpec string, fixing it if possible, or None."""
 
     checkKubeVersion = kubeVersion
 
     try:
-        semantic_version.NpmSpec(kubeVersion)
+        getNpmSpec(kubeVersion)
     except ValueError:
         print(f"Value error with kubeVersion -  NpmSpec : {kubeVersion}, see if it fixable")
 
@@ -52,41 +52,97 @@ def getOCPVersions(kubeVersion):
                     checkKubeVersion = f"{preVersion}{semantic_version.Version.coerce(versionInRange)}"
 
             # see if the updates have helped
-            semantic_version.NpmSpec(checkKubeVersion)
+            getNpmSpec(checkKubeVersion)
             print(f"Fixed value error in kubeVersion : {checkKubeVersion}")
 
         except ValueError:
             print(f"Unable to fix value error in kubeVersion : {kubeVersion}")
+            return None
+
+    return checkKubeVersion
+
+
+class OCPVersionResolver:
+    """Translates chart kubeVersion specs to the range of supported OCP versions.
+
+    The kube to OCP version map is coerced and sorted by kube version once. Results
+    are kept for each kubeVersion string.
+    """
+
+    OPEN_ENDED_KUBE_VERSION = semantic_version.Version("1.999.999")
+
+    def __init__(self, versionMap):
+        # (coerced kube version, coerced OCP version, OCP version as in the map)
+        self.entries = sorted((semantic_version.Version.coerce(kubeVersionKey),
+                               semantic_version.Version.coerce(ocpVersion),
+                               ocpVersion) for kubeVersionKey, ocpVersion in versionMap.items())
+        # OCP versions normally increase with kube versions, in which case the lowest and
+        # highest OCP version are the first and last kube version in the spec
+        self.ordered = all(self.entries[i][1] < self.entries[i+1][1] for i in range(len(self.entries)-1))
+        self.ocpVersions = {}
+
+    def _getMinMax(self, spec):
+        if self.ordered:
+            matching = (entry for entry in self.entries if entry[0] in spec)
+            minEntry = next(matching, None)
+            if minEntry is None:
+                return "", ""
+            maxEntry = next((entry for entry in reversed(self.entries) if entry[0] in spec), minEntry)
+            return minEntry[2], maxEntry[2]
+
+        minEntry = None
+        maxEntry = None
+        for entry in self.entries:
+            if entry[0] in spec:
+                if minEntry is None or minEntry[1] > entry[1]:
+                    minEntry = entry
+                if maxEntry is None or maxEntry[1] < entry[1]:
+                    maxEntry = entry
+        if minEntry is None:
+            return "", ""
+        return minEntry[2], maxEntry[2]
+
+    def getOCPVersions(self, kubeVersion):
+        if kubeVersion not in self.ocpVersions:
+            self.ocpVersions[kubeVersion] = self._resolve(kubeVersion)
+        return self.ocpVersions[kubeVersion]
+
+    def _resolve(self, kubeVersion):
+
+        if kubeVersion == "":
+            return "N/A"
+
+        checkKubeVersion = fixKubeVersion(kubeVersion)
+        if checkKubeVersion is None:
             return "N/A"
 
+        spec = getNpmSpec(checkKubeVersion)
+        minOCP, maxOCP = self._getMinMax(spec)
+
+        # check if minOCP is open ended
+        if minOCP != "" and self.OPEN_ENDED_KUBE_VERSION in spec:
+            ocp_versions = f">={minOCP}"
+        elif minOCP == "":
+            ocp_versions = "N/A"
+        elif maxOCP == "" or maxOCP == minOCP:
+            ocp_versions = minOCP
+        else:
+            ocp_versions = f"{minOCP} - {maxOCP}"
+
+        return ocp_versions
+
+
+def getOCPVersionResolver():
+    global ocpVersionResolver
+    if ocpVersionResolver is None:
+        ocpVersionResolver = OCPVersionResolver(getKubVersionMap())
+    return ocpVersionResolver
 
-    minOCP = ""
-    maxOCP = ""
-    getKubVersionMap()
-    for kubeVersionKey in kubeOpenShiftVersionMap :
-        #print(f"\n   Map entry : {kubeVersionKey}: {kubeOpenShiftVersionMap[kubeVersionKey]}")
-        #print(f"   MinOCP : {minOCP}, maxOCP: {maxOCP}")
-        coercedKubeVersionKey = semantic_version.Version.coerce(kubeVersionKey)
-        if coercedKubeVersionKey in semantic_version.NpmSpec(checkKubeVersion):
-            coercedOCPVersionValue = semantic_version.Version.coerce(kubeOpenShiftVersionMap[kubeVersionKey])
-            if minOCP == "" or  semantic_version.Version.coerce(minOCP) > coercedOCPVersionValue:
-                minOCP = kubeOpenShiftVersionMap[kubeVersionKey]
-                #print(f"   Found new min : {checkKubeVersion}: {minOCP}")
-            if maxOCP == "" or semantic_version.Version.coerce(maxOCP) < coercedOCPVersionValue:
-                maxOCP = kubeOpenShiftVersionMap[kubeVersionKey]
-                #print(f"   Found new Max : {checkKubeVersion}: {maxOCP}")
-
-    # check if minOCP is open ended
-    if minOCP != "" and semantic_version.Version("1.999.999") in semantic_version.NpmSpec(checkKubeVersion):
-        ocp_versions = f">={minOCP}"
-    elif minOCP == "":
-        ocp_versions = "N/A"
-    elif maxOCP == "" or maxOCP == minOCP:
-        ocp_versions = minOCP
-    else:
-        ocp_versions = f"{minOCP} - {maxOCP}"
-
-    return ocp_versions
+
+def getOCPVersions(kubeVersion):
+    if kubeVersion == "":
+        return "N/A"
+    return getOCPVersionResolver().getOCPVersions(kubeVersion)
 
 
 def getIndexAnnotations(report_path):
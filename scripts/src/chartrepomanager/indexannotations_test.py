@@ -0,0 +1,71 @@
+import semantic_version
+import pytest
+
+from chartrepomanager import indexannotations
+from chartrepomanager import kubeversionmap
+
+# every kubeVersion in the repository reports
+REPORT_KUBE_VERSIONS = [
+    "> 1.19.0", "> 1.9.0", ">= 1.10.0-0", ">= 1.14.0-0", ">= 1.16.0 < 1.22.0", ">= 1.16.0-0", ">= 1.17.0",
+    ">= 1.17.3-0", ">= 1.19", ">= 1.19.0-0", ">= 1.20.0", ">=1.10.0-0", ">=1.10.1-0", ">=1.15.0-0",
+    ">=1.16.0-0", ">=1.17.0-0", ">=1.17.1-0", ">=1.18.0", ">=1.18.0-0", ">=1.19.0", ">=1.20", ">=1.20.0",
+    ">=1.20.0-0", "1.20.0", "1.20.0 - 1.24.0", "^1.20.0",
+]
+
+EDGE_KUBE_VERSIONS = [
+    "", "not a version", "<1.0.0", ">=1.999.0", "~1.21", "1.21.x", ">= v1.16", "1.22 - 1.24", ">=1.21.0-0 <1.24.0-0",
+]
+
+VERSION_MAP = kubeversionmap._read_version_map(kubeversionmap.SNAPSHOT_PATH)
+
+# the map with OCP versions that do not increase with kube versions
+UNORDERED_VERSION_MAP = dict(VERSION_MAP, **{"1.20": "4.9", "1.21": "4.7"})
+
+
+def reference_ocp_versions(kubeVersion, versionMap):
+    """getOCPVersions as it was before OCPVersionResolver."""
+    if kubeVersion == "":
+        return "N/A"
+
+    checkKubeVersion = indexannotations.fixKubeVersion(kubeVersion)
+    if checkKubeVersion is None:
+        return "N/A"
+
+    minOCP = ""
+    maxOCP = ""
+    for kubeVersionKey in versionMap:
+        coercedKubeVersionKey = semantic_version.Version.coerce(kubeVersionKey)
+        if coercedKubeVersionKey in semantic_version.NpmSpec(checkKubeVersion):
+            coercedOCPVersionValue = semantic_version.Version.coerce(versionMap[kubeVersionKey])
+            if minOCP == "" or semantic_version.Version.coerce(minOCP) > coercedOCPVersionValue:
+                minOCP = versionMap[kubeVersionKey]
+            if maxOCP == "" or semantic_version.Version.coerce(maxOCP) < coercedOCPVersionValue:
+                maxOCP = versionMap[kubeVersionKey]
+
+    if minOCP != "" and semantic_version.Version("1.999.999") in semantic_version.NpmSpec(checkKubeVersion):
+        return f">={minOCP}"
+    elif minOCP == "":
+        return "N/A"
+    elif maxOCP == "" or maxOCP == minOCP:
+        return minOCP
+    return f"{minOCP} - {maxOCP}"
+
+
+@pytest.mark.parametrize("versionMap", [VERSION_MAP, UNORDERED_VERSION_MAP], ids=["ordered", "unordered"])
+@pytest.mark.parametrize("kubeVersion", REPORT_KUBE_VERSIONS + EDGE_KUBE_VERSIONS)
+def test_resolver_matches_reference(kubeVersion, versionMap):
+    resolver = indexannotations.OCPVersionResolver(versionMap)
+    assert resolver.ordered == (versionMap is VERSION_MAP)
+    assert resolver.getOCPVersions(kubeVersion) == reference_ocp_versions(kubeVersion, versionMap)
+    # served from the resolver cache the second time
+    assert resolver.getOCPVersions(kubeVersion) == reference_ocp_versions(kubeVersion, versionMap)
+
+
+def test_empty_kube_version_does_not_load_the_map(monkeypatch):
+    def get_version_map():
+        raise AssertionError("version map loaded")
+
+    monkeypatch.setattr(indexannotations, "ocpVersionResolver", None)
+    monkeypatch.setattr(indexannotations, "kubeOpenShiftVersionMap", {})
+    monkeypatch.setattr(kubeversionmap, "get_version_map", get_version_map)
+    assert indexannotations.getOCPVersions("") == "N/A"
@@ -0,0 +1,171 @@
+"""
+Update one entry of a helm repository index (index.yaml) without loading and dumping
+the whole document.
+
+The index is written by PyYAML with sorted keys and block style, so each chart entry is
+a block of lines starting with a "  <entry name>:" line in the "entries:" mapping and
+ending before the next line indented two spaces or less. Only the changed entry block and
+the "generated:" line are replaced, the rest of the index text is kept as it is. A new
+entry block is inserted in sorted position.
+
+If the index does not have this layout IndexPatchError is raised by the patch functions
+and update_index_entry falls back to loading and dumping the whole index.
+"""
+
+import re
+
+import yaml
+try:
+    from yaml import CLoader as Loader, CDumper as Dumper
+except ImportError:
+    from yaml import Loader, Dumper
+
+ENTRIES_LINE = "entries:"
+GENERATED_KEY = "generated"
+ENTRY_HEADER = re.compile(r"^  ([A-Za-z0-9][A-Za-z0-9._-]*):$")
+
+
+class IndexPatchError(Exception):
+    pass
+
+
+class IndexLayout:
+    """Line spans of the entries and the generated field of an index text."""
+
+    def __init__(self, index_text):
+        self.lines = index_text.splitlines(keepends=True)
+        if not self.lines or not self.lines[-1].endswith("\n"):
+            raise IndexPatchError("index does not end with a new line")
+
+        self.entries_start = None
+        self.entries_end = None
+        self.generated = None
+        # entry name -> [start line, end line)
+        self.entries = {}
+        self.entry_names = []
+
+        entry_name = None
+        for number, line in enumerate(self.lines):
+            content = line.rstrip("\n")
+            if not content.strip() or content.startswith("#"):
+                continue
+            if not content.startswith(" ") and not content.startswith("-"):
+                # top level key
+                if entry_name is not None:
+                    self._end_entry(entry_name, number)
+                    entry_name = None
+                if self.entries_start is not None and self.entries_end is None:
+                    self.entries_end = number
+                if content == ENTRIES_LINE:
+                    self.entries_start = number + 1
+                elif content.startswith(f"{GENERATED_KEY}:"):
+                    self.generated = number
+                continue
+            if self.entries_start is None or self.entries_end is not None:
+                continue
+            if content.startswith("  - ") or content.startswith("   "):
+                if entry_name is None:
+                    raise IndexPatchError(f"unexpected line {number+1} in entries")
+                continue
+            match = ENTRY_HEADER.match(content)
+            if not match:
+                raise IndexPatchError(f"entry name not recognised at line {number+1}")
+            if entry_name is not None:
+                self._end_entry(entry_name, number)
+            entry_name = match.group(1)
+            self.entries[entry_name] = [number, None]
+            self.entry_names.append(entry_name)
+
+        if self.entries_start is None:
+            raise IndexPatchError("entries not found in index")
+        if self.entries_end is None:
+            self.entries_end = len(self.lines)
+        if entry_name is not None:
+            self._end_entry(entry_name, len(self.lines))
+        if self.generated is None:
+            raise IndexPatchError("generated not found in index")
+        if self.generated + 1 < len(self.lines) and self.lines[self.generated + 1].startswith(" "):
+            raise IndexPatchError("generated is not a single line")
+
+    def _end_entry(self, entry_name, number):
+        # blank lines before the next entry belong to this entry
+        self.entries[entry_name][1] = number
+
+    def get_insert_line(self, entry_name):
+        """Return the line a new entry block is inserted at to keep the entries sorted."""
+        for name in self.entry_names:
+            if name > entry_name:
+                return self.entries[name][0]
+        return self.entries_end
+
+
+def _dump_entry(entry_name, chart_entries):
+    # dump at the same nesting level as in the index, so long lines are wrapped the same way
+    out = yaml.dump({"entries": {entry_name: chart_entries}}, Dumper=Dumper)
+    if not out.startswith(ENTRIES_LINE + "\n"):
+        raise IndexPatchError(f"unexpected dump of entry {entry_name}")
+    return out[len(ENTRIES_LINE) + 1:]
+
+def get_entry(index_text, entry_name, layout=None):
+    """Return the chart versions of entry_name in the index text, an empty list if there are none."""
+    layout = layout or IndexLayout(index_text)
+    if entry_name not in layout.entries:
+        return []
+    start, end = layout.entries[entry_name]
+    data = yaml.load(ENTRIES_LINE + "\n" + "".join(layout.lines[start:end]), Loader=Loader)
+    if not isinstance(data, dict) or not isinstance(data.get("entries"), dict) or entry_name not in data["entries"]:
+        raise IndexPatchError(f"entry {entry_name} could not be loaded")
+    return data["entries"][entry_name] or []
+
+def set_entry(index_text, entry_name, chart_entries, generated, layout=None):
+    """Return the index text with the chart versions of entry_name and generated replaced."""
+    layout = layout or IndexLayout(index_text)
+    lines = list(layout.lines)
+
+    entry_block = _dump_entry(entry_name, chart_entries)
+    generated_line = yaml.dump({GENERATED_KEY: generated}, Dumper=Dumper)
+
+    # replace from the end of the file so the earlier line numbers stay valid
+    replacements = [(layout.generated, layout.generated + 1, generated_line)]
+    if entry_name in layout.entries:
+        start, end = layout.entries[entry_name]
+        replacements.append((start, end, entry_block))
+    else:
+        insert_line = layout.get_insert_line(entry_name)
+        replacements.append((insert_line, insert_line, entry_block))
+
+    for start, end, text in sorted(replacements, reverse=True):
+        lines[start:end] = [text]
+    return "".join(lines)
+
+def _update_chart_entries(chart_entries, version, chart_entry):
+    updated_entries = [entry for entry in chart_entries if entry["version"] != version]
+    updated_entries.append(chart_entry)
+    return updated_entries
+
+def update_index_entry(index_text, entry_name, version, chart_entry, generated):
+    """Return the index text with chart_entry replacing version of entry_name.
+
+    The entry is patched in place if possible, otherwise the whole index is loaded and
+    dumped. A new index is created if index_text is empty.
+    """
+    if index_text:
+        try:
+            layout = IndexLayout(index_text)
+            chart_entries = _update_chart_entries(get_entry(index_text, entry_name, layout), version, chart_entry)
+            out = set_entry(index_text, entry_name, chart_entries, generated, layout)
+            print(f"[INFO] index entry {entry_name} patched: {len(chart_entries)} versions")
+            return out
+        except IndexPatchError as err:
+            print(f"[INFO] index layout not recognised, rewriting the index: {err}")
+
+        data = yaml.load(index_text, Loader=Loader)
+        data["generated"] = generated
+    else:
+        data = {"apiVersion": "v1",
+            "generated": generated,
+            "entries": {}}
+
+    data["entries"] = data.get("entries") or {}
+    data["entries"][entry_name] = _update_chart_entries(data["entries"].get(entry_name, []), version, chart_entry)
+    return yaml.dump(data, Dumper=Dumper)
@@ -0,0 +1,74 @@
+import pytest
+import yaml
+try:
+    from yaml import CLoader as Loader, CDumper as Dumper
+except ImportError:
+    from yaml import Loader, Dumper
+
+from chartrepomanager import indexpatch
+
+GENERATED = "2023-03-01T10:00:00.000000+00:00"
+
+
+def make_chart_entry(name, version, description="A chart"):
+    return {"apiVersion": "v2",
+            "name": name,
+            "version": version,
+            "description": description,
+            "annotations": {"charts.openshift.io/provider": "Acme",
+                            "charts.openshift.io/providerType": "partner"},
+            "urls": [f"https://github.com/acme/charts/releases/download/acme-{name}-{version}/{name}-{version}.tgz"]}
+
+
+def make_index():
+    long_description = "A long description which is wrapped when dumped " * 4
+    multi_line_description = "first line\n\nthird line after an empty line"
+    return {"apiVersion": "v1",
+            "generated": "2023-01-01T00:00:00.000000+00:00",
+            "entries": {"acme-alpha": [make_chart_entry("alpha", "1.0.0", long_description),
+                                       make_chart_entry("alpha", "1.1.0", multi_line_description)],
+                        "acme-gamma": [make_chart_entry("gamma", "0.1.0")],
+                        "other-zeta": [make_chart_entry("zeta", "2.0.0")]}}
+
+
+def full_update(index_text, entry_name, version, chart_entry):
+    data = yaml.load(index_text, Loader=Loader)
+    data["generated"] = GENERATED
+    chart_entries = [entry for entry in data["entries"].get(entry_name, []) if entry["version"] != version]
+    data["entries"][entry_name] = chart_entries + [chart_entry]
+    return yaml.dump(data, Dumper=Dumper)
+
+
+@pytest.mark.parametrize("entry_name,version", [("acme-alpha", "1.2.0"),
+                                                ("acme-alpha", "1.0.0"),
+                                                ("acme-beta", "1.0.0"),
+                                                ("aaa-first", "1.0.0"),
+                                                ("zzz-last", "1.0.0")])
+def test_patch_matches_full_rewrite(entry_name, version):
+    index_text = yaml.dump(make_index(), Dumper=Dumper)
+    chart_entry = make_chart_entry(entry_name.split("-")[1], version, "updated " * 30)
+
+    patched = indexpatch.update_index_entry(index_text, entry_name, version, chart_entry, GENERATED)
+    assert patched == full_update(index_text, entry_name, version, chart_entry)
+
+
+def test_get_entry():
+    index_text = yaml.dump(make_index(), Dumper=Dumper)
+    assert indexpatch.get_entry(index_text, "acme-alpha") == make_index()["entries"]["acme-alpha"]
+    assert indexpatch.get_entry(index_text, "acme-missing") == []
+
+
+def test_unrecognised_layout_falls_back():
+    index_text = yaml.dump(make_index(), Dumper=Dumper, default_flow_style=True)
+    with pytest.raises(indexpatch.IndexPatchError):
+        indexpatch.IndexLayout(index_text)
+
+    chart_entry = make_chart_entry("beta", "1.0.0")
+    patched = indexpatch.update_index_entry(index_text, "acme-beta", "1.0.0", chart_entry, GENERATED)
+    assert patched == full_update(index_text, "acme-beta", "1.0.0", chart_entry)
+
+
+def test_new_index():
+    chart_entry = make_chart_entry("beta", "1.0.0")
+    data = yaml.load(indexpatch.update_index_entry("", "acme-beta", "1.0.0", chart_entry, GENERATED), Loader=Loader)
+    assert data == {"apiVersion": "v1", "generated": GENERATED, "entries": {"acme-beta": [chart_entry]}}
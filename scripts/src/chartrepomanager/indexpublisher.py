@@ -0,0 +1,97 @@
+"""
+Publish the chart index entries queued by chart-repo-manager --queue-dir.
+
+All queued entries are added to their index files (index.yaml or
+unpublished-certified-charts.yaml) in a worktree of the index branch, and committed and
+pushed together, retrying on the latest index branch head if the push is rejected
+(see indexpush). Queue files are only removed once the push succeeded, entries queued
+while the publisher runs are published by the next run. With INDEX_PUSH_PLUMBING set the
+index branch is updated without a worktree (see indexpush.push_index_commit).
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime, timezone
+from environs import Env
+
+sys.path.append('../')
+from chartrepomanager import chartrepomanager
+from chartrepomanager import indexpatch
+from chartrepomanager import indexpush
+from chartrepomanager import releasequeue
+from indexfile import compactindex
+
+def apply_entries_to_texts(index_texts, pending, now):
+    """Add the queued entries to {file: content} of the index files and their compact indexes, return the updated files."""
+    updated_texts = {}
+    entry_names = {}
+    for queue_path, record in pending:
+        indexfile = record["indexfile"]
+        print(f"[INFO] Add {record['release']} to {indexfile}")
+        updated_texts[indexfile] = indexpatch.update_index_entry(updated_texts.get(indexfile, index_texts.get(indexfile, "")),
+                                                                 record["entry_name"], record["version"], record["chart_entry"], now)
+        entry_names.setdefault(indexfile, []).append(record["entry_name"])
+    for indexfile in get_index_files(pending):
+        updated_texts.update(compactindex.update_compact_indexes(indexfile, index_texts, updated_texts[indexfile],
+                                                                 entry_names[indexfile], now))
+    return updated_texts
+
+def apply_entries(indexdir, pending, now):
+    """Add the queued entries to the index files in indexdir, return the updated files."""
+    index_texts = indexpush.read_index_worktree(indexdir, get_index_branch_files(pending))
+    return indexpush.write_index_worktree(indexdir, apply_entries_to_texts(index_texts, pending, now))
+
+def get_index_files(pending):
+    return sorted({record["indexfile"] for _, record in pending})
+
+def get_index_branch_files(pending):
+    """Return the index files of the queued entries and their compact indexes."""
+    return [branch_file for indexfile in get_index_files(pending)
+            for branch_file in [indexfile] + compactindex.get_compact_index_files(indexfile)]
+
+def get_commit_message(pending):
+    releases = [f"{record['release']} (#{record['pr_number']})" for _, record in pending]
+    if len(releases) == 1:
+        return f"{releases[0]} index update"
+    return f"Publish {len(releases)} charts\n\n" + "\n".join(releases)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-q", "--queue-dir", dest="queue_dir", type=str, required=True,
+                                        help="queue directory used by chart-repo-manager --queue-dir")
+    parser.add_argument("-b", "--index-branch", dest="branch", type=str, required=True,
+                                        help="index branch")
+    parser.add_argument("-r", "--repository", dest="repository", type=str, required=True,
+                                        help="Git Repository")
+    args = parser.parse_args()
+    branch = args.branch.split("/")[-1]
+
+    with releasequeue.lock(args.queue_dir):
+        pending = releasequeue.get_pending_entries(args.queue_dir)
+        if not pending:
+            print("[INFO] No queued index entries")
+            return
+        print(f"[INFO] {len(pending)} queued index entries")
+
+        now = datetime.now(timezone.utc).astimezone().isoformat()
+        if Env().bool("INDEX_PUSH_PLUMBING", False):
+            print("[INFO] Index branch is updated without a worktree")
+            chartrepomanager.add_upstream_remote()
+            pushed = indexpush.push_index_commit(os.getcwd(), args.repository, branch, get_index_branch_files(pending),
+                                                 lambda index_texts: apply_entries_to_texts(index_texts, pending, now),
+                                                 get_commit_message(pending))
+        else:
+            print("[INFO] Creating Git worktree for index branch")
+            indexdir = chartrepomanager.create_worktree_for_index(branch)
+            pushed = indexpush.push_index_update(indexdir, args.repository, branch,
+                                                 lambda indexdir: apply_entries(indexdir, pending, now),
+                                                 get_commit_message(pending))
+        if not pushed:
+            sys.exit(1)
+
+        releasequeue.remove_entries([queue_path for queue_path, _ in pending])
+        print(f"[INFO] {len(pending)} index entries published")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+import subprocess
+
+from chartrepomanager import indexpush
+
+
+def git(cwd, *args):
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com"] + list(args),
+                   cwd=cwd, check=True, capture_output=True)
+
+
+def clone(remote, path):
+    git(os.path.dirname(path), "clone", "-q", "-o", "upstream", remote, path)
+    git(path, "config", "user.name", "test")
+    git(path, "config", "user.email", "test@example.com")
+
+
+def read(path):
+    with open(path) as fd:
+        return fd.read()
+
+
+def test_push_retries_on_concurrent_update(tmpdir, monkeypatch):
+    remote = os.path.join(tmpdir, "remote.git")
+    git(str(tmpdir), "init", "-q", "--bare", "-b", "gh-pages", remote)
+    seed = os.path.join(tmpdir, "seed")
+    git(str(tmpdir), "init", "-q", "-b", "gh-pages", seed)
+    with open(os.path.join(seed, "index.yaml"), "w") as fd:
+        fd.write("first\n")
+    git(seed, "add", "index.yaml")
+    git(seed, "commit", "-q", "-m", "seed")
+    git(seed, "push", "-q", remote, "gh-pages")
+
+    indexdir = os.path.join(tmpdir, "index")
+    clone(remote, indexdir)
+    other = os.path.join(tmpdir, "other")
+    clone(remote, other)
+
+    monkeypatch.setattr(indexpush, "get_push_url", lambda repository: remote)
+    monkeypatch.setattr(indexpush, "BACKOFF_MAX", 0)
+
+    calls = []
+
+    def update_index(indexdir):
+        if not calls:
+            # another release pushes after our fetch
+            with open(os.path.join(other, "index.yaml"), "a") as fd:
+                fd.write("other\n")
+            git(other, "commit", "-q", "-am", "other")
+            git(other, "push", "-q", "upstream", "HEAD:gh-pages")
+        calls.append(read(os.path.join(indexdir, "index.yaml")))
+        with open(os.path.join(indexdir, "index.yaml"), "a") as fd:
+            fd.write("ours\n")
+        return ["index.yaml"]
+
+    assert indexpush.push_index_update(indexdir, "acme/charts", "gh-pages", update_index, "ours")
+    assert calls == ["first\n", "first\nother\n"]
+
+    git(other, "pull", "-q", "upstream", "gh-pages")
+    assert read(os.path.join(other, "index.yaml")) == "first\nother\nours\n"
+
+
+def test_push_index_commit_without_worktree(tmpdir, monkeypatch):
+    remote = os.path.join(tmpdir, "remote.git")
+    git(str(tmpdir), "init", "-q", "--bare", "-b", "gh-pages", remote)
+    seed = os.path.join(tmpdir, "seed")
+    git(str(tmpdir), "init", "-q", "-b", "gh-pages", seed)
+    for name, content in [("index.yaml", "first\n"), ("README.md", "readme\n")]:
+        with open(os.path.join(seed, name), "w") as fd:
+            fd.write(content)
+    git(seed, "add", ".")
+    git(seed, "commit", "-q", "-m", "seed")
+    git(seed, "push", "-q", remote, "gh-pages")
+    git(seed, "checkout", "-q", "-b", "main")
+    with open(os.path.join(seed, "index.yaml"), "w") as fd:
+        fd.write("main branch\n")
+    git(seed, "commit", "-q", "-am", "main")
+    git(seed, "push", "-q", remote, "main")
+
+    gitdir = os.path.join(tmpdir, "checkout")
+    git(str(tmpdir), "clone", "-q", "-o", "upstream", "-b", "main", remote, gitdir)
+    git(gitdir, "config", "user.name", "test")
+    git(gitdir, "config", "user.email", "test@example.com")
+    other = os.path.join(tmpdir, "other")
+    clone(remote, other)
+
+    monkeypatch.setattr(indexpush, "get_push_url", lambda repository: remote)
+    monkeypatch.setattr(indexpush, "BACKOFF_MAX", 0)
+
+    calls = []
+
+    def update_texts(index_texts):
+        if not calls:
+            # another release pushes after our fetch
+            with open(os.path.join(other, "index.yaml"), "a") as fd:
+                fd.write("other\n")
+            git(other, "commit", "-q", "-am", "other")
+            git(other, "push", "-q", "upstream", "HEAD:gh-pages")
+        calls.append(index_texts)
+        return {"index.yaml": index_texts["index.yaml"] + "ours\n",
+                "unpublished-certified-charts.yaml": index_texts["unpublished-certified-charts.yaml"] + "unpublished\n"}
+
+    assert indexpush.push_index_commit(gitdir, "acme/charts", "gh-pages",
+                                       ["index.yaml", "unpublished-certified-charts.yaml"], update_texts, "ours")
+    assert calls == [{"index.yaml": "first\n", "unpublished-certified-charts.yaml": ""},
+                     {"index.yaml": "first\nother\n", "unpublished-certified-charts.yaml": ""}]
+
+    # the checkout of the main branch is not changed
+    assert read(os.path.join(gitdir, "index.yaml")) == "main branch\n"
+    assert not os.path.exists(os.path.join(gitdir, "unpublished-certified-charts.yaml"))
+
+    git(other, "pull", "-q", "upstream", "gh-pages")
+    assert read(os.path.join(other, "index.yaml")) == "first\nother\nours\n"
+    assert read(os.path.join(other, "unpublished-certified-charts.yaml")) == "unpublished\n"
+    assert read(os.path.join(other, "README.md")) == "readme\n"
@@ -0,0 +1,168 @@
+"""
+The chart-verifier kube to OpenShift version map, used to set supportedOpenShiftVersions.
+
+get_version_map() returns the map from, in order:
+- the local cache file, if it was validated less than KUBE_VERSION_MAP_TTL seconds ago.
+- the chart-verifier repository. The cache file is revalidated with If-None-Match and
+  If-Modified-Since, so an unchanged map is not downloaded again.
+- if the download fails, the newer of the stale cache file and the snapshot of the map
+  included in this package (kubeOpenShiftVersionMap.yaml).
+
+If KUBE_VERSION_MAP_OFFLINE is true the network is not used, the newer of the cache file
+and the snapshot is used. The newer map is the one mapping the latest kube version. The
+cache file is a tools.cacheutils conditional GET entry kept in KUBE_VERSION_MAP_CACHE_DIR,
+by default a directory in the system temp directory.
+
+The snapshot is refreshed with the refresh-kube-version-map command.
+"""
+
+import os
+import sys
+import tempfile
+import argparse
+
+import requests
+import semantic_version
+import yaml
+from environs import Env
+
+sys.path.append('../')
+from tools import cacheutils
+
+VERSION_MAP_URL = "https://raw.githubusercontent.com/redhat-certification/chart-verifier/main/internal/tool/kubeOpenShiftVersionMap.yaml"
+VERSION_MAP_FILE = "kubeOpenShiftVersionMap.yaml"
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), VERSION_MAP_FILE)
+CACHE_ENTRY_FILE = "kubeOpenShiftVersionMap.json"
+
+OFFLINE_ENV = "KUBE_VERSION_MAP_OFFLINE"
+CACHE_DIR_ENV = "KUBE_VERSION_MAP_CACHE_DIR"
+TTL_ENV = "KUBE_VERSION_MAP_TTL"
+TIMEOUT_ENV = "KUBE_VERSION_MAP_TIMEOUT"
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_TIMEOUT = 10
+
+def get_cache_dir():
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(tempfile.gettempdir(), "chart-repo-manager-cache")
+
+def get_cache_path():
+    return os.path.join(get_cache_dir(), CACHE_ENTRY_FILE)
+
+def parse_version_map(content):
+    """Return the kube to OCP version dict for the map yaml content, raise ValueError if it is not valid."""
+    try:
+        version_data = yaml.safe_load(content)
+        version_map = {}
+        for kubeVersion in version_data["versions"]:
+            version_map[str(kubeVersion["kube-version"])] = str(kubeVersion["ocp-version"])
+    except (yaml.YAMLError, KeyError, TypeError) as err:
+        raise ValueError(f"invalid kube to OCP version map: {err}")
+    if not version_map:
+        raise ValueError("empty kube to OCP version map")
+    return version_map
+
+def _read_version_map(path):
+    try:
+        with open(path) as fd:
+            return parse_version_map(fd.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        print(f"[WARNING] ignoring kube to OCP version map {path}: {err}")
+        return None
+
+def _get_entry_map(entry, cache_path):
+    try:
+        return parse_version_map(entry["value"])
+    except ValueError as err:
+        print(f"[WARNING] ignoring kube to OCP version map {cache_path}: {err}")
+        return None
+
+def _read_cached_map(cache_path):
+    entry = cacheutils.read_entry(cache_path, VERSION_MAP_URL)
+    return _get_entry_map(entry, cache_path) if entry else None
+
+def _read_response(response):
+    """Return the map text of the download, raise ValueError if it is not a valid map so it is not cached."""
+    parse_version_map(response.text)
+    return response.text
+
+def get_latest_kube_version(version_map):
+    return max(semantic_version.Version.coerce(kubeVersion) for kubeVersion in version_map)
+
+def _get_newer_map(cache_path):
+    """Return the newer of the cached map and the snapshot, the cache if they are the same."""
+    cached_map = _read_cached_map(cache_path)
+    snapshot_map = _read_version_map(SNAPSHOT_PATH)
+    if cached_map is None:
+        print("[INFO] using the kube to OCP version map snapshot")
+        return snapshot_map
+    if snapshot_map is not None and get_latest_kube_version(snapshot_map) > get_latest_kube_version(cached_map):
+        print(f"[INFO] using the kube to OCP version map snapshot, newer than {cache_path}")
+        return snapshot_map
+    print(f"[INFO] using cached kube to OCP version map from {cache_path}")
+    return cached_map
+
+def download_version_map(timeout):
+    """Revalidate the cached map with the chart-verifier repository, return the map or None on failure."""
+    cache_path = get_cache_path()
+    try:
+        status_code, map_text = cacheutils.conditional_get(VERSION_MAP_URL, cache_path, _read_response, timeout,
+                                                           use_entry=lambda entry: _get_entry_map(entry, cache_path) is not None)
+        if status_code != 200:
+            raise requests.HTTPError(f"{status_code} response for {VERSION_MAP_URL}")
+        return parse_version_map(map_text)
+    except (requests.RequestException, ValueError) as err:
+        print(f"[WARNING] unable to download kube to OCP version map: {err}")
+        return None
+
+def get_version_map():
+    env = Env()
+    cache_path = get_cache_path()
+
+    if env.bool(OFFLINE_ENV, False):
+        print("[INFO] offline, kube to OCP version map not downloaded")
+        return _get_newer_map(cache_path)
+
+    cache_age = cacheutils.get_entry_age(cache_path)
+    if cache_age is not None and cache_age < env.int(TTL_ENV, DEFAULT_TTL):
+        version_map = _read_cached_map(cache_path)
+        if version_map is not None:
+            return version_map
+
+    version_map = download_version_map(env.float(TIMEOUT_ENV, DEFAULT_TIMEOUT))
+    if version_map is not None:
+        return version_map
+
+    return _get_newer_map(cache_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the kube to OCP version map snapshot")
+    parser.add_argument("-s", "--snapshot", dest="snapshot", type=str, default=SNAPSHOT_PATH,
+                        help="snapshot file to write")
+    parser.add_argument("-t", "--timeout", dest="timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="download timeout in seconds")
+    args = parser.parse_args()
+
+    try:
+        response = requests.get(VERSION_MAP_URL, timeout=args.timeout)
+        response.raise_for_status()
+        version_map = parse_version_map(response.text)
+    except (requests.RequestException, ValueError) as err:
+        print(f"[ERROR] unable to download kube to OCP version map: {err}")
+        sys.exit(1)
+
+    old_map = _read_version_map(args.snapshot) or {}
+    for kubeVersion, ocpVersion in version_map.items():
+        if old_map.get(kubeVersion) != ocpVersion:
+            print(f"[INFO] kube version {kubeVersion}: OCP version {old_map.get(kubeVersion, 'none')} -> {ocpVersion}")
+
+    header = (f"# Snapshot of {VERSION_MAP_URL}\n"
+              "# Used when the map cannot be downloaded. Refresh with: refresh-kube-version-map\n")
+    lines = response.text.split("\n")
+    while lines and lines[0].startswith("#"):
+        lines.pop(0)
+    cacheutils.write_file(os.path.abspath(args.snapshot), header + "\n".join(lines).lstrip("\n"))
+    print(f"[INFO] kube to OCP version map snapshot written to {args.snapshot}: {len(version_map)} versions")
+
+if __name__ == "__main__":
+    main()
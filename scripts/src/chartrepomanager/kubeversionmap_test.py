@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from chartrepomanager import kubeversionmap
+from tools import cacheutils
+
+VERSION_MAP = b"""versions:
+  - kube-version: "1.27"
+    ocp-version: "4.14"
+  - kube-version: "1.26"
+    ocp-version: "4.13"
+"""
+
+
+@pytest.fixture
+def server(monkeypatch, static_server):
+    static_server.files["/map.yaml"] = VERSION_MAP
+    monkeypatch.setattr(kubeversionmap, "VERSION_MAP_URL", f"{static_server.url}/map.yaml")
+    return static_server
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmpdir):
+    monkeypatch.setenv(kubeversionmap.CACHE_DIR_ENV, str(tmpdir))
+    monkeypatch.delenv(kubeversionmap.OFFLINE_ENV, raising=False)
+    return str(tmpdir)
+
+
+def test_snapshot_is_valid():
+    with open(kubeversionmap.SNAPSHOT_PATH) as fd:
+        version_map = kubeversionmap.parse_version_map(fd.read())
+    assert version_map["1.13"] == "4.1"
+    assert version_map["1.20"] == "4.7"
+
+
+def test_offline_uses_snapshot(monkeypatch, server):
+    monkeypatch.setenv(kubeversionmap.OFFLINE_ENV, "true")
+    version_map = kubeversionmap.get_version_map()
+    assert version_map["1.13"] == "4.1"
+    assert server.requests == []
+
+
+def test_download_and_revalidate(monkeypatch, server, cache_dir):
+    assert kubeversionmap.get_version_map() == {"1.27": "4.14", "1.26": "4.13"}
+    # fresh cache, no request
+    assert kubeversionmap.get_version_map() == {"1.27": "4.14", "1.26": "4.13"}
+    assert server.requests == [("/map.yaml", None)]
+
+    monkeypatch.setenv(kubeversionmap.TTL_ENV, "0")
+    assert kubeversionmap.get_version_map() == {"1.27": "4.14", "1.26": "4.13"}
+    etag = server.get_etag(VERSION_MAP)
+    assert server.requests == [("/map.yaml", None), ("/map.yaml", etag)]
+
+    monkeypatch.setenv(kubeversionmap.OFFLINE_ENV, "true")
+    assert kubeversionmap.get_version_map() == {"1.27": "4.14", "1.26": "4.13"}
+
+
+def test_offline_uses_newer_snapshot(monkeypatch, cache_dir):
+    cacheutils.write_file(kubeversionmap.get_cache_path(),
+                          json.dumps({"url": kubeversionmap.VERSION_MAP_URL, "etag": '"map-1"', "last_modified": "",
+                                      "value": 'versions:\n  - kube-version: "1.20"\n    ocp-version: "4.7"\n'}))
+    assert kubeversionmap._read_cached_map(kubeversionmap.get_cache_path()) == {"1.20": "4.7"}
+    monkeypatch.setenv(kubeversionmap.OFFLINE_ENV, "true")
+    version_map = kubeversionmap.get_version_map()
+    assert version_map == kubeversionmap._read_version_map(kubeversionmap.SNAPSHOT_PATH)
+
+
+def test_download_failure_uses_snapshot(monkeypatch):
+    monkeypatch.setattr(kubeversionmap, "VERSION_MAP_URL", "http://127.0.0.1:1/map.yaml")
+    version_map = kubeversionmap.get_version_map()
+    assert version_map["1.13"] == "4.1"
@@ -0,0 +1,85 @@
+"""
+Queue of chart index entries waiting to be published.
+
+When chart-repo-manager is run with a queue directory the chart entry is not committed
+to the index branch, it is written to the queue as a json file. The publish-index command
+then adds all queued entries to the index files in one commit and one push.
+
+Queue files are named <time in ns>-<entry name>-<version>.json so they are published in
+the order they were queued. They are written to a temporary file first and renamed, so a
+publisher never reads a partially written entry. Queue files that cannot be read are moved
+to the failed directory of the queue, so they are reported once and can be looked at later.
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+import contextlib
+
+sys.path.append('../')
+from tools import cacheutils
+
+QUEUE_FILE_SUFFIX = ".json"
+LOCK_FILE = ".lock"
+FAILED_DIR = "failed"
+
+def add_entry(queue_dir, indexfile, entry_name, version, chart_entry, release, pr_number):
+    """Queue chart_entry for version of entry_name in indexfile, return the queue file path."""
+    record = {"indexfile": indexfile,
+              "entry_name": entry_name,
+              "version": version,
+              "chart_entry": chart_entry,
+              "release": release,
+              "pr_number": pr_number}
+
+    queue_path = os.path.join(queue_dir, f"{time.time_ns()}-{entry_name}-{version}{QUEUE_FILE_SUFFIX}")
+    cacheutils.write_file(queue_path, json.dumps(record, default=str))
+    print(f"[INFO] {release} queued for {indexfile}: {queue_path}")
+    return queue_path
+
+def get_pending_entries(queue_dir):
+    """Return (queue file path, record) of the queued entries, oldest first."""
+    if not os.path.isdir(queue_dir):
+        return []
+
+    pending = []
+    for name in sorted(os.listdir(queue_dir)):
+        if not name.endswith(QUEUE_FILE_SUFFIX):
+            continue
+        queue_path = os.path.join(queue_dir, name)
+        try:
+            with open(queue_path) as fd:
+                pending.append((queue_path, json.load(fd)))
+        except (OSError, ValueError) as err:
+            print(f"[WARNING] ignoring unreadable queued entry {queue_path}: {err}")
+            move_to_failed(queue_dir, queue_path)
+    return pending
+
+def move_to_failed(queue_dir, queue_path):
+    failed_dir = os.path.join(queue_dir, FAILED_DIR)
+    try:
+        os.makedirs(failed_dir, exist_ok=True)
+        os.replace(queue_path, os.path.join(failed_dir, os.path.basename(queue_path)))
+        print(f"[WARNING] {queue_path} moved to {failed_dir}")
+    except OSError as err:
+        print(f"[WARNING] unable to move {queue_path} to {failed_dir}: {err}")
+
+def remove_entries(queue_paths):
+    for queue_path in queue_paths:
+        try:
+            os.remove(queue_path)
+        except FileNotFoundError:
+            pass
+
+@contextlib.contextmanager
+def lock(queue_dir):
+    """Hold an exclusive lock on the queue, so only one publisher runs at a time."""
+    os.makedirs(queue_dir, exist_ok=True)
+    with open(os.path.join(queue_dir, LOCK_FILE), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
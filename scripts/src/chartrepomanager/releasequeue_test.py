@@ -0,0 +1,75 @@
+import os
+
+import yaml
+
+from chartrepomanager import indexpublisher
+from chartrepomanager import kubeversionmap
+from chartrepomanager import releasequeue
+from indexfile import compactindex
+
+NOW = "2023-03-01T10:00:00.000000+00:00"
+
+
+def make_chart_entry(name, version):
+    return {"apiVersion": "v2", "name": name, "version": version,
+            "annotations": {"charts.openshift.io/providerType": "partner"},
+            "urls": [f"https://example.com/{name}-{version}.tgz"]}
+
+
+def test_queue_and_apply(tmpdir, monkeypatch):
+    monkeypatch.setenv(kubeversionmap.OFFLINE_ENV, "true")
+    monkeypatch.setenv(kubeversionmap.CACHE_DIR_ENV, str(tmpdir))
+    queue_dir = os.path.join(tmpdir, "queue")
+    indexdir = os.path.join(tmpdir, "index")
+    os.makedirs(indexdir)
+    with open(os.path.join(indexdir, "index.yaml"), "w") as fd:
+        yaml.dump({"apiVersion": "v1", "generated": "old", "entries": {"acme-alpha": [make_chart_entry("alpha", "1.0.0")]}}, fd)
+
+    releasequeue.add_entry(queue_dir, "index.yaml", "acme-alpha", "1.1.0", make_chart_entry("alpha", "1.1.0"), "acme-alpha-1.1.0", "1")
+    releasequeue.add_entry(queue_dir, "index.yaml", "acme-beta", "0.1.0", make_chart_entry("beta", "0.1.0"), "acme-beta-0.1.0", "2")
+    releasequeue.add_entry(queue_dir, "unpublished-certified-charts.yaml", "acme-gamma", "1.0.0", make_chart_entry("gamma", "1.0.0"), "acme-gamma-1.0.0", "3")
+
+    pending = releasequeue.get_pending_entries(queue_dir)
+    assert [record["release"] for _, record in pending] == ["acme-alpha-1.1.0", "acme-beta-0.1.0", "acme-gamma-1.0.0"]
+
+    indexfiles = indexpublisher.apply_entries(indexdir, pending, NOW)
+    assert indexfiles == sorted(["index.yaml", "unpublished-certified-charts.yaml"] +
+                                compactindex.get_compact_index_files("index.yaml") +
+                                compactindex.get_compact_index_files("unpublished-certified-charts.yaml"))
+
+    with open(os.path.join(indexdir, "index.yaml")) as fd:
+        index = yaml.safe_load(fd)
+    assert index["generated"] == NOW
+    assert [entry["version"] for entry in index["entries"]["acme-alpha"]] == ["1.0.0", "1.1.0"]
+    assert [entry["version"] for entry in index["entries"]["acme-beta"]] == ["0.1.0"]
+    with open(os.path.join(indexdir, "unpublished-certified-charts.yaml")) as fd:
+        assert list(yaml.safe_load(fd)["entries"]) == ["acme-gamma"]
+
+    assert indexpublisher.get_commit_message(pending).startswith("Publish 3 charts\n")
+
+    releasequeue.remove_entries([queue_path for queue_path, _ in pending])
+    assert releasequeue.get_pending_entries(queue_dir) == []
+
+    # the next publish updates the compact index of the published index
+    releasequeue.add_entry(queue_dir, "index.yaml", "acme-beta", "0.2.0", make_chart_entry("beta", "0.2.0"), "acme-beta-0.2.0", "4")
+    indexpublisher.apply_entries(indexdir, releasequeue.get_pending_entries(queue_dir), NOW)
+    with open(os.path.join(indexdir, "index.yaml")) as fd:
+        index_digest = compactindex.get_index_digest(fd.read())
+    compact_index = compactindex.load_compact_index(os.path.join(indexdir, "index-compact.json"), index_digest)
+    assert [entry["version"] for entry in compact_index["entries"]["acme-beta"]] == ["0.2.0", "0.1.0"]
+    assert list(compact_index["entries"]) == ["acme-alpha", "acme-beta"]
+
+
+def test_unreadable_entry_is_moved_to_failed(tmpdir):
+    queue_dir = os.path.join(tmpdir, "queue")
+    queue_path = releasequeue.add_entry(queue_dir, "index.yaml", "acme-alpha", "1.1.0", make_chart_entry("alpha", "1.1.0"), "acme-alpha-1.1.0", "1")
+    unreadable_path = os.path.join(queue_dir, "0-acme-beta-0.1.0.json")
+    with open(unreadable_path, "w") as fd:
+        fd.write('{"indexfile": ')
+
+    assert [path for path, _ in releasequeue.get_pending_entries(queue_dir)] == [queue_path]
+    assert not os.path.exists(unreadable_path)
+    assert os.listdir(os.path.join(queue_dir, releasequeue.FAILED_DIR)) == ["0-acme-beta-0.1.0.json"]
+
+    # not read again by the next publisher
+    assert [path for path, _ in releasequeue.get_pending_entries(queue_dir)] == [queue_path]
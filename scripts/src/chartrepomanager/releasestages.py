@@ -0,0 +1,97 @@
+"""
+Run the release stages of chart-repo-manager as a dependency graph.
+
+A stage is a function called with the results of the stages it depends on. Each stage is
+started in a thread pool as soon as the stages it depends on are done, so independent
+stages, for example fetching the index branch and uploading the chart, run at the same
+time. The time taken by each stage is printed.
+
+If a stage fails no more stages are started, the exception of the stage (including the
+SystemExit of sys.exit) is raised once the running stages are done.
+"""
+
+import time
+from concurrent import futures
+
+MAX_WORKERS = 4
+
+def add_stage(stages, name, function, depends_on=()):
+    """Add stage name to stages, function is called with {dependency name: result}."""
+    if name in stages:
+        raise ValueError(f"duplicate release stage {name}")
+    stages[name] = (function, list(depends_on))
+
+def get_stage_order(stages):
+    """Return the stage names in an order where a stage comes after its dependencies."""
+    order = []
+    visiting = set()
+
+    def visit(name, path):
+        if name in order:
+            return
+        if name not in stages:
+            raise ValueError(f"release stage {path[-1]} depends on unknown stage {name}")
+        if name in visiting:
+            raise ValueError(f"release stages have a dependency cycle: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dependency in stages[name][1]:
+            visit(dependency, path + [name])
+        visiting.remove(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name, [])
+    return order
+
+def _run_stage(name, function, results):
+    start = time.monotonic()
+    try:
+        return function(results), time.monotonic() - start
+    finally:
+        print(f"[INFO] Release stage {name} done in {time.monotonic() - start:.2f}s")
+
+def run_stages(stages, max_workers=MAX_WORKERS):
+    """Run the stages, return {stage name: result}."""
+    order = get_stage_order(stages)
+    results = {}
+    timings = {}
+    pending = list(order)
+    running = {}
+    failure = None
+    start = time.monotonic()
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="release-stage") as executor:
+        while pending or running:
+            if failure is None:
+                for name in [name for name in pending if all(dependency in results for dependency in stages[name][1])]:
+                    pending.remove(name)
+                    function, depends_on = stages[name]
+                    print(f"[INFO] Release stage {name} started")
+                    future = executor.submit(_run_stage, name, function,
+                                             {dependency: results[dependency] for dependency in depends_on})
+                    running[future] = name
+            if not running:
+                break
+
+            done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name], timings[name] = future.result()
+                except BaseException as err:
+                    print(f"[ERROR] Release stage {name} failed: {err!r}")
+                    if failure is None:
+                        failure = err
+
+    print(f"[INFO] Release stages done in {time.monotonic() - start:.2f}s")
+    for name in order:
+        if name in timings:
+            print(f"[INFO]   {name}: {timings[name]:.2f}s")
+        elif name in pending:
+            print(f"[INFO]   {name}: not run")
+        else:
+            print(f"[INFO]   {name}: failed")
+
+    if failure is not None:
+        raise failure
+    return results
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from chartrepomanager import releasestages
+
+
+def test_run_stages():
+    stages = {}
+    # upload and fetch can only both pass the barrier if they run at the same time
+    barrier = threading.Barrier(2, timeout=5)
+
+    def upload(results):
+        barrier.wait()
+        return results["package"] + " uploaded"
+
+    def fetch(results):
+        barrier.wait()
+        return "worktree"
+
+    releasestages.add_stage(stages, "package", lambda results: "chart.tgz")
+    releasestages.add_stage(stages, "upload", upload, ["package"])
+    releasestages.add_stage(stages, "fetch", fetch)
+    releasestages.add_stage(stages, "index", lambda results: (results["upload"], results["fetch"]), ["upload", "fetch"])
+
+    results = releasestages.run_stages(stages)
+    assert results["index"] == ("chart.tgz uploaded", "worktree")
+
+
+def test_run_stages_failure():
+    stages = {}
+    run = []
+
+    def fail(results):
+        run.append("fail")
+        raise SystemExit(1)
+
+    releasestages.add_stage(stages, "fail", fail)
+    releasestages.add_stage(stages, "after", lambda results: run.append("after"), ["fail"])
+    with pytest.raises(SystemExit):
+        releasestages.run_stages(stages)
+    assert run == ["fail"]
+
+
+def test_stage_order():
+    stages = {}
+    releasestages.add_stage(stages, "index", None, ["entry", "worktree"])
+    releasestages.add_stage(stages, "entry", None, ["package"])
+    releasestages.add_stage(stages, "package", None)
+    releasestages.add_stage(stages, "worktree", None)
+    order = releasestages.get_stage_order(stages)
+    assert order.index("package") < order.index("entry") < order.index("index")
+    assert order.index("worktree") < order.index("index")
+
+    releasestages.add_stage(stages, "a", None, ["b"])
+    releasestages.add_stage(stages, "b", None, ["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        releasestages.get_stage_order(stages)
+    with pytest.raises(ValueError, match="unknown"):
+        releasestages.get_stage_order({"a": (None, ["missing"])})
@@ -6,17 +6,14 @@ import json
 
 import requests
 import semver
-import yaml
-try:
-    from yaml import CLoader as Loader, CDumper as Dumper
-except ImportError:
-    from yaml import Loader, Dumper
 
 sys.path.append('../')
 from owners import owners_file
 from report import verifier_report
 from pullrequest import prartifact
 from tools import gitutils
+from indexfile import indexcache
+from indexfile import indexreader
 
 ALLOW_CI_CHANGES = "allow/ci-changes"
 TYPE_MATCH_EXPRESSION = "(partners|redhat|community)"
@@ -43,10 +40,10 @@ def check_web_catalog_only(report_in_pr, num_files_in_pr, report_file_match):
     if report_in_pr:
         report_file_path = os.path.join("pr-branch","charts", category, organization, chart, version, "report.yaml")
         print(f"read report file : {report_file_path}" )
-        found_report,report_data = verifier_report.get_report_data(report_file_path)
+        report = verifier_report.get_verifier_report(report_file_path)
 
-        if found_report:
-            report_web_catalog_only = verifier_report.get_web_catalog_only(report_data)
+        if report:
+            report_web_catalog_only = report.web_catalog_only
             print(f"[INFO] webCatalogOnly/providerDelivery from report : {report_web_catalog_only}")
         else:
             msg = f"[ERROR] Failed tp open report: {report_file_path}."
@@ -63,7 +60,7 @@ def check_web_catalog_only(report_in_pr, num_files_in_pr, report_file_match):
             sys.exit(1)
     elif report_in_pr:
         if report_web_catalog_only and owner_web_catalog_only:
-            if verifier_report.get_package_digest(report_data):
+            if report.package_digest:
                 web_catalog_only = True
             else:
                 msg = f"[ERROR] The web catalog distribution method requires a package digest in the report."
@@ -190,23 +187,15 @@ def ensure_only_chart_is_modified(api_url, repository, branch):
             sys.exit(1)
 
         print("Downloading index.yaml", category, organization, chart, version)
-        r = requests.get(f'https://raw.githubusercontent.com/{repository}/{branch}/index.yaml')
-
-        if r.status_code == 200:
-            data = yaml.load(r.text, Loader=Loader)
-        else:
-            data = {"apiVersion": "v1",
-                "entries": {}}
+        status_code, index_path = indexcache.get_index_path(f'https://raw.githubusercontent.com/{repository}/{branch}/index.yaml')
 
         entry_name = f"{organization}-{chart}"
-        d = data["entries"].get(entry_name, [])
         gitutils.add_output("chart-entry-name",entry_name)
-        for v in d:
-            if v["version"] == version:
-                msg = f"[ERROR] Helm chart release already exists in the index.yaml: {version}"
-                print(msg)
-                gitutils.add_output("pr-content-error-message",msg)
-                sys.exit(1)
+        if status_code == 200 and indexreader.has_version(index_path, entry_name, version):
+            msg = f"[ERROR] Helm chart release already exists in the index.yaml: {version}"
+            print(msg)
+            gitutils.add_output("pr-content-error-message",msg)
+            sys.exit(1)
 
         tag_name = f"{organization}-{chart}-{version}"
         gitutils.add_output("chart-name-with-version",tag_name)
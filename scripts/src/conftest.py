@@ -0,0 +1,84 @@
+import hashlib
+import http.server
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def serve():
+    """Start an HTTP server for a handler class, return its base URL. Servers are shut down at teardown."""
+    servers = []
+
+    def start(handler_class):
+        httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        servers.append(httpd)
+        return f"http://127.0.0.1:{httpd.server_port}"
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+class StaticServer:
+    """Files served with an ETag, answering 304 to a matching If-None-Match.
+
+    files is path -> content (bytes), redirects is path -> location, requests logs the
+    (path, If-None-Match) of each GET request and head_requests the path of each HEAD request.
+    """
+
+    def __init__(self):
+        self.url = ""
+        self.files = {}
+        self.redirects = {}
+        self.requests = []
+        self.head_requests = []
+
+    @staticmethod
+    def get_etag(content):
+        return '"%s"' % hashlib.sha256(content).hexdigest()[:16]
+
+
+@pytest.fixture
+def static_server(serve):
+    server = StaticServer()
+
+    class StaticHandler(http.server.BaseHTTPRequestHandler):
+        def do_HEAD(self):
+            server.head_requests.append(self.path)
+            self.send_headers()
+
+        def do_GET(self):
+            server.requests.append((self.path, self.headers.get("If-None-Match")))
+            if self.send_headers():
+                self.wfile.write(server.files[self.path])
+
+        def send_headers(self):
+            """Send the response headers, return True if the file content follows."""
+            if self.path in server.redirects:
+                self.send_response(302)
+                self.send_header("Location", server.redirects[self.path])
+                self.end_headers()
+            elif self.path not in server.files:
+                self.send_response(404)
+                self.end_headers()
+            elif self.headers.get("If-None-Match") == server.get_etag(server.files[self.path]):
+                self.send_response(304)
+                self.end_headers()
+            else:
+                content = server.files[self.path]
+                self.send_response(200)
+                self.send_header("ETag", server.get_etag(content))
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                return True
+            return False
+
+        def log_message(self, format, *args):
+            pass
+
+    server.url = serve(StaticHandler)
+    return server
@@ -0,0 +1,329 @@
+"""
+Compact machine index published next to index.yaml and unpublished-certified-charts.yaml.
+
+The compact index has the same charts as the index file in a form that is cheap to
+read: a json header line followed by one json line per entry, and the same content
+in msgpack if the msgpack package is installed. The header has:
+- index_sha256, the sha256 of the index file the compact index was made from. A reader
+  only uses the compact index if it matches the index file, so a compact index left
+  behind by an index update made without it is never used.
+- strings, the interned entry, provider, chart name, annotation and OCP strings, which
+  records refer to by position.
+- offsets, entry name -> [byte offset, length] of the entry record relative to the end of
+  the header, so a tool can read one chart without reading the others.
+
+Each entry record has the versions of the chart newest first, with the supported OCP
+versions spec of each version and the range of known OCP versions it includes,
+[spec, first, last] or None if the spec is missing or invalid.
+
+chart-repo-manager and publish-index update the compact indexes with the index files
+(update_compact_indexes). Only the records of the changed entries are made from the index
+file, the records of the other entries are decoded from the published compact index and
+their strings interned again, so strings of removed versions are dropped and the update
+is the same as a compact index made from the whole index file. The compact index is made
+from the whole index file if it is missing or not for the index file it is updated from. indexfile.index reads it with
+load_compact_index and read_compact_entry.
+"""
+
+import io
+import json
+import hashlib
+import sys
+
+import semantic_version
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+sys.path.append('../')
+from chartrepomanager import indexannotations
+from chartrepomanager import kubeversionmap
+from indexfile import index
+from indexfile import indexcache
+from indexfile import indexreader
+
+COMPACT_INDEX_FORMAT = "compact-chart-index"
+COMPACT_INDEX_VERSION = 2
+COMPACT_INDEX_SUFFIX = "-compact"
+JSON_EXTENSION = ".json"
+MSGPACK_EXTENSION = ".msgpack"
+
+class _Strings:
+    def __init__(self, strings=()):
+        self.strings = list(strings)
+        self.positions = {value: position for position, value in enumerate(self.strings)}
+
+    def intern(self, value):
+        value = str(value)
+        if value not in self.positions:
+            self.positions[value] = len(self.strings)
+            self.strings.append(value)
+        return self.positions[value]
+
+def get_compact_index_name(index_name, extension=JSON_EXTENSION):
+    """Return the name (or url) of the compact index of index_name."""
+    return index_name.removesuffix(".yaml") + COMPACT_INDEX_SUFFIX + extension
+
+def get_compact_index_files(indexfile):
+    """Return the compact index files published for indexfile."""
+    compact_files = [get_compact_index_name(indexfile)]
+    if msgpack is not None:
+        compact_files.append(get_compact_index_name(indexfile, MSGPACK_EXTENSION))
+    return compact_files
+
+def get_index_digest(index_text):
+    """Return the sha256 of the index file content, str or bytes, as stored in the compact index header."""
+    if isinstance(index_text, str):
+        index_text = index_text.encode("utf-8")
+    return hashlib.sha256(index_text).hexdigest()
+
+def _get_codec(path):
+    """Return (dumps, loads, record separator) of the compact index at path."""
+    if path.endswith(MSGPACK_EXTENSION):
+        if msgpack is None:
+            raise ValueError(f"msgpack is not installed, unable to use {path}")
+        return (lambda value: msgpack.packb(value, use_bin_type=True, default=str),
+                lambda data: msgpack.unpackb(data, raw=False),
+                b"")
+    return (lambda value: json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"),
+            json.loads,
+            b"\n")
+
+def _read_header(fd, path):
+    """Return the header of the compact index fd and the position of its first record."""
+    if path.endswith(MSGPACK_EXTENSION):
+        if msgpack is None:
+            raise ValueError(f"msgpack is not installed, unable to use {path}")
+        unpacker = msgpack.Unpacker(fd, raw=False)
+        header = unpacker.unpack()
+        records_start = unpacker.tell()
+    else:
+        header = json.loads(fd.readline())
+        records_start = fd.tell()
+    if not isinstance(header, dict) or header.get("format") != COMPACT_INDEX_FORMAT or header.get("version") != COMPACT_INDEX_VERSION:
+        raise ValueError(f"{path} is not a version {COMPACT_INDEX_VERSION} compact index")
+    return header, records_start
+
+def _encode(path, header, encoded_records):
+    """Return the compact index content for the header and {entry name: encoded record}."""
+    dumps, _, separator = _get_codec(path)
+    offsets = {}
+    position = 0
+    for entry_name in sorted(encoded_records):
+        offsets[entry_name] = [position, len(encoded_records[entry_name])]
+        position += len(encoded_records[entry_name])
+    return (dumps(dict(header, offsets=offsets)) + separator +
+            b"".join(encoded_records[entry_name] for entry_name in sorted(encoded_records)))
+
+def _split(path, content):
+    """Return the header and {entry name: encoded record} of the compact index content."""
+    header, records_start = _read_header(io.BytesIO(content), path)
+    encoded_records = {}
+    for entry_name, (offset, length) in header["offsets"].items():
+        encoded_records[entry_name] = content[records_start+offset:records_start+offset+length]
+        if len(encoded_records[entry_name]) != length:
+            raise ValueError(f"{path} record of {entry_name} is truncated")
+    return header, encoded_records
+
+def _decode_record(strings, record):
+    """Return entry name and the list of charts of a compact index record, as in index.yaml."""
+    charts = []
+    for version in record["versions"]:
+        chart = {key: value for key, value in version.items() if key not in ("annotations", "kubeVersion", "ocp")}
+        chart["name"] = strings[record["name"]]
+        chart["annotations"] = {strings[key]: strings[value] for key, value in version["annotations"]}
+        if "kubeVersion" in version:
+            chart["kubeVersion"] = strings[version["kubeVersion"]]
+        charts.append(chart)
+    return strings[record["entry"]], charts
+
+def _get_ocp_versions():
+    versions = set(kubeversionmap.get_version_map().values())
+    return sorted(versions, key=semantic_version.Version.coerce)
+
+def _get_ocp_range(ocp_spec, ocp_versions):
+    """Return the first and last of ocp_versions included in ocp_spec, None if there are none."""
+    if not ocp_spec or ocp_spec == "N/A":
+        return None
+    try:
+        spec = indexannotations.getNpmSpec(ocp_spec)
+    except ValueError:
+        return None
+    included = [ocp_version for ocp_version in ocp_versions if semantic_version.Version.coerce(ocp_version) in spec]
+    if not included:
+        return None
+    return included[0], included[-1]
+
+def _version_key(chart):
+    version = index._get_version(chart["version"])
+    return (version is not None, version or semantic_version.Version("0.0.0"))
+
+class _RecordBuilder:
+    """Creates entry records, interning their strings in strings."""
+
+    def __init__(self, strings):
+        self.strings = strings
+        self.ocp_versions = _get_ocp_versions()
+        self.ocp_ranges = {}
+
+    def create_record(self, entry_name, charts):
+        strings = self.strings
+        name = charts[0]["name"]
+        versions = []
+        for chart in sorted(charts, key=_version_key, reverse=True):
+            version = {key: value for key, value in chart.items() if key not in ("name", "annotations", "kubeVersion")}
+            annotations = chart.get("annotations") or {}
+            version["annotations"] = [[strings.intern(key), strings.intern(value)] for key, value in annotations.items()]
+            if "kubeVersion" in chart:
+                version["kubeVersion"] = strings.intern(chart["kubeVersion"])
+
+            ocp_spec = index._get_ocp_spec({"supportedOCP": annotations.get("charts.openshift.io/supportedOpenShiftVersions", ""),
+                                           "kubeVersion": chart.get("kubeVersion", "")})
+            if ocp_spec not in self.ocp_ranges:
+                self.ocp_ranges[ocp_spec] = _get_ocp_range(ocp_spec, self.ocp_versions)
+            ocp_range = self.ocp_ranges[ocp_spec]
+            version["ocp"] = ([strings.intern(ocp_spec)] + [strings.intern(ocp_version) for ocp_version in ocp_range]) if ocp_range else None
+            versions.append(version)
+
+        return {"entry": strings.intern(entry_name),
+                "name": strings.intern(name),
+                "provider": strings.intern(entry_name.removesuffix(f"-{name}")),
+                "versions": versions}
+
+def _intern_record(strings, record_strings, record):
+    """Return a copy of a compact index record with its strings interned in strings.
+
+    record_strings is the strings table of the compact index the record was read from. The
+    strings are interned in the order create_record interns them.
+    """
+    versions = []
+    for version in record["versions"]:
+        version = dict(version)
+        version["annotations"] = [[strings.intern(record_strings[key]), strings.intern(record_strings[value])]
+                                  for key, value in version["annotations"]]
+        if "kubeVersion" in version:
+            version["kubeVersion"] = strings.intern(record_strings[version["kubeVersion"]])
+        if version["ocp"]:
+            version["ocp"] = [strings.intern(record_strings[position]) for position in version["ocp"]]
+        versions.append(version)
+    return {"entry": strings.intern(record_strings[record["entry"]]),
+            "name": strings.intern(record_strings[record["name"]]),
+            "provider": strings.intern(record_strings[record["provider"]]),
+            "versions": versions}
+
+def _encode_records(compact_files, records):
+    """Return {compact index file: {entry name: encoded record}} of {entry name: record}."""
+    encoded = {}
+    for compact_file in compact_files:
+        dumps, _, separator = _get_codec(compact_file)
+        encoded[compact_file] = {entry_name: dumps(record) + separator for entry_name, record in records.items()}
+    return encoded
+
+def create_compact_indexes(indexfile, index_text):
+    """Return {compact index file: content} made from the whole index file content."""
+    index_dct = indexcache.parse_index(index_text) or {}
+    strings = _Strings()
+    builder = _RecordBuilder(strings)
+    records = {entry_name: builder.create_record(entry_name, charts)
+               for entry_name, charts in sorted((index_dct.get("entries") or {}).items()) if charts}
+    header = {"format": COMPACT_INDEX_FORMAT,
+              "version": COMPACT_INDEX_VERSION,
+              "generated": str(index_dct.get("generated", "")),
+              "index_sha256": get_index_digest(index_text),
+              "strings": strings.strings}
+
+    compact_files = get_compact_index_files(indexfile)
+    encoded = _encode_records(compact_files, records)
+    return {compact_file: _encode(compact_file, header, encoded[compact_file]) for compact_file in compact_files}
+
+def _split_compact_indexes(compact_files, compact_texts, index_text):
+    """Return the header and {compact index file: {entry name: encoded record}} of the compact indexes.
+
+    None is returned if a compact index is missing, invalid or not for index_text.
+    """
+    header = None
+    encoded = {}
+    index_digest = get_index_digest(index_text)
+    for compact_file in compact_files:
+        if not compact_texts.get(compact_file):
+            print(f"[INFO] no compact index {compact_file}")
+            return None
+        try:
+            compact_header, encoded[compact_file] = _split(compact_file, compact_texts[compact_file])
+        except (ValueError, KeyError, TypeError) as err:
+            print(f"[WARNING] ignoring compact index {compact_file}: {err}")
+            return None
+        if compact_header.get("index_sha256") != index_digest:
+            print(f"[INFO] compact index {compact_file} is not for the current index file")
+            return None
+        if header is not None and compact_header["strings"] != header["strings"]:
+            print(f"[INFO] compact index {compact_file} does not match {compact_files[0]}")
+            return None
+        header = header or compact_header
+    return header, encoded
+
+def update_compact_indexes(indexfile, index_texts, updated_text, entry_names, generated):
+    """Return {compact index file: content} for updated_text, the index file with entry_names changed.
+
+    index_texts is {file: content} of the index file and of its compact indexes before the
+    update, generated is the generated value of updated_text. Only the records of entry_names are made from updated_text if the compact
+    indexes are for the index file before the update, otherwise the compact indexes are made from updated_text.
+    """
+    compact_files = get_compact_index_files(indexfile)
+    split = _split_compact_indexes(compact_files, index_texts, index_texts.get(indexfile, ""))
+    if split is None:
+        print(f"[INFO] creating the compact indexes of {indexfile}")
+        return create_compact_indexes(indexfile, updated_text)
+
+    header, encoded = split
+    _, loads, _ = _get_codec(compact_files[0])
+    changed = set(entry_names)
+    # records in the order create_compact_indexes makes them, so the strings table is the same
+    strings = _Strings()
+    builder = _RecordBuilder(strings)
+    records = {}
+    for entry_name in sorted(changed | set(encoded[compact_files[0]])):
+        if entry_name not in changed:
+            records[entry_name] = _intern_record(strings, header["strings"], loads(encoded[compact_files[0]][entry_name]))
+            continue
+        charts = indexreader.read_entry(updated_text, entry_name)
+        if charts:
+            records[entry_name] = builder.create_record(entry_name, charts)
+
+    header = dict(header, generated=str(generated), index_sha256=get_index_digest(updated_text), strings=strings.strings)
+    encoded = _encode_records(compact_files, records)
+    compact_indexes = {compact_file: _encode(compact_file, header, encoded[compact_file]) for compact_file in compact_files}
+    print(f"[INFO] compact indexes of {indexfile} updated: {', '.join(sorted(set(entry_names)))}")
+    return compact_indexes
+
+def load_compact_index(path, index_digest=None):
+    """Return the index dict of the json compact index at path.
+
+    If index_digest is set ValueError is raised if the compact index is not for the index
+    file with this sha256.
+    """
+    with open(path, "rb") as fd:
+        header, _ = _read_header(fd, path)
+        if index_digest is not None and header.get("index_sha256") != index_digest:
+            raise ValueError(f"{path} is not for the current index file")
+        entries = {}
+        for line in fd:
+            entry_name, charts = _decode_record(header["strings"], json.loads(line))
+            entries[entry_name] = charts
+    return {"apiVersion": "v1", "entries": entries, "generated": header.get("generated", "")}
+
+def read_compact_entry(path, entry_name):
+    """Return the list of charts of entry_name in the compact index at path, None if there is none.
+
+    Only the header and the record of the entry are read. A .msgpack compact index needs
+    the msgpack package.
+    """
+    _, loads, _ = _get_codec(path)
+    with open(path, "rb") as fd:
+        header, records_start = _read_header(fd, path)
+        if entry_name not in header["offsets"]:
+            return None
+        offset, length = header["offsets"][entry_name]
+        fd.seek(records_start + offset)
+        return _decode_record(header["strings"], loads(fd.read(length)))[1]
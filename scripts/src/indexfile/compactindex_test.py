@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from chartrepomanager import indexpatch
+from chartrepomanager import kubeversionmap
+from indexfile import compactindex
+from indexfile import indexcache
+
+INDEX = """apiVersion: v1
+entries:
+  acme-chart:
+  - annotations:
+      charts.openshift.io/provider: Acme
+      charts.openshift.io/providerType: partner
+      charts.openshift.io/supportedOpenShiftVersions: 4.8 - 4.10
+    name: chart
+    version: 1.2.0
+    created: 2023-01-01T00:00:00Z
+    urls:
+    - https://example.com/acme-chart-1.2.0.tgz
+  - annotations:
+      charts.openshift.io/provider: Acme
+      charts.openshift.io/providerType: partner
+    kubeVersion: '>=1.21.0'
+    name: chart
+    version: v1.10.0
+  acme-other:
+  - annotations:
+      charts.openshift.io/provider: Acme
+      charts.openshift.io/providerType: partner
+    name: other
+    version: 0.1.0
+generated: 2023-01-02T00:00:00Z
+"""
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch, tmpdir):
+    monkeypatch.setenv(kubeversionmap.OFFLINE_ENV, "true")
+    monkeypatch.setenv(kubeversionmap.CACHE_DIR_ENV, str(tmpdir))
+
+
+def write(tmpdir, name, content):
+    path = str(tmpdir / name)
+    with open(path, "wb") as fd:
+        fd.write(content)
+    return path
+
+
+def make_chart_entry(version):
+    return {"annotations": {"charts.openshift.io/provider": "Acme",
+                            "charts.openshift.io/providerType": "partner",
+                            "charts.openshift.io/supportedOpenShiftVersions": ">=4.10"},
+            "name": "other", "version": version}
+
+
+def test_compact_index(tmpdir):
+    compact_indexes = compactindex.create_compact_indexes("index.yaml", INDEX)
+    assert list(compact_indexes)[0] == "index-compact.json"
+    compact_path = write(tmpdir, "index-compact.json", compact_indexes["index-compact.json"])
+
+    expected = indexcache.parse_index(INDEX)
+    loaded = compactindex.load_compact_index(compact_path, compactindex.get_index_digest(INDEX))
+    assert loaded["generated"] == "2023-01-02T00:00:00Z"
+    assert loaded["entries"]["acme-other"] == expected["entries"]["acme-other"]
+    # versions newest first
+    assert loaded["entries"]["acme-chart"] == expected["entries"]["acme-chart"][::-1]
+
+    assert compactindex.read_compact_entry(compact_path, "acme-chart") == loaded["entries"]["acme-chart"]
+    assert compactindex.read_compact_entry(compact_path, "acme-missing") is None
+
+    with open(compact_path, "rb") as fd:
+        header = json.loads(fd.readline())
+        records = [json.loads(line) for line in fd]
+    strings = header["strings"]
+    assert strings.count("Acme") == 1
+    ocp_ranges = [[strings[i] for i in version["ocp"]] if version["ocp"] else None for version in records[0]["versions"]]
+    assert ocp_ranges[1] == ["4.8 - 4.10", "4.8", "4.10"]
+    assert ocp_ranges[0][0] == ">=4.8" and ocp_ranges[0][1] == "4.8"
+    assert records[1]["versions"][0]["ocp"] is None
+
+
+def test_compact_index_is_for_one_index_file(tmpdir):
+    compact_path = write(tmpdir, "index-compact.json", compactindex.create_compact_indexes("index.yaml", INDEX)["index-compact.json"])
+    with pytest.raises(ValueError):
+        compactindex.load_compact_index(compact_path, compactindex.get_index_digest(INDEX + "\n"))
+
+
+def test_update_compact_index(tmpdir, monkeypatch):
+    index_texts = {"index.yaml": INDEX}
+    index_texts.update(compactindex.create_compact_indexes("index.yaml", INDEX))
+    updated_text = indexpatch.update_index_entry(INDEX, "acme-other", "0.2.0", make_chart_entry("0.2.0"), "2023-02-01T00:00:00Z")
+
+    # only the changed entry is made again
+    monkeypatch.setattr(compactindex, "create_compact_indexes", None)
+    compact_indexes = compactindex.update_compact_indexes("index.yaml", index_texts, updated_text, ["acme-other"], "2023-02-01T00:00:00Z")
+    monkeypatch.undo()
+    compact_path = write(tmpdir, "index-compact.json", compact_indexes["index-compact.json"])
+
+    expected = compactindex.create_compact_indexes("index.yaml", updated_text)["index-compact.json"]
+    loaded = compactindex.load_compact_index(compact_path, compactindex.get_index_digest(updated_text))
+    assert loaded == compactindex.load_compact_index(write(tmpdir, "expected.json", expected))
+    assert [chart["version"] for chart in loaded["entries"]["acme-other"]] == ["0.2.0", "0.1.0"]
+    assert loaded["generated"] == "2023-02-01T00:00:00Z"
+    # the same as a compact index made from the whole index file
+    assert compact_indexes == compactindex.create_compact_indexes("index.yaml", updated_text)
+
+
+def test_update_compact_index_drops_unused_strings():
+    index_texts = {"index.yaml": INDEX}
+    index_texts.update(compactindex.create_compact_indexes("index.yaml", INDEX))
+    # the version with the "4.8 - 4.10" OCP versions is removed
+    charts = indexpatch.get_entry(INDEX, "acme-chart")
+    updated_text = indexpatch.set_entry(INDEX, "acme-chart", charts[1:], "2023-02-01T00:00:00Z")
+
+    compact_indexes = compactindex.update_compact_indexes("index.yaml", index_texts, updated_text, ["acme-chart"], "2023-02-01T00:00:00Z")
+    assert compact_indexes == compactindex.create_compact_indexes("index.yaml", updated_text)
+    header = json.loads(compact_indexes["index-compact.json"].split(b"\n")[0])
+    assert "4.8 - 4.10" not in header["strings"]
+
+def test_update_compact_index_not_for_index_file():
+    updated_text = indexpatch.update_index_entry(INDEX, "acme-other", "0.2.0", make_chart_entry("0.2.0"), "2023-02-01T00:00:00Z")
+    for compact_texts in [{}, {"index-compact.json": b"not a compact index\n"},
+                          compactindex.create_compact_indexes("index.yaml", updated_text)]:
+        index_texts = dict(compact_texts, **{"index.yaml": INDEX})
+        compact_indexes = compactindex.update_compact_indexes("index.yaml", index_texts, updated_text, ["acme-other"], "2023-02-01T00:00:00Z")
+        assert compact_indexes == compactindex.create_compact_indexes("index.yaml", updated_text)
+
+
+@pytest.mark.skipif(compactindex.msgpack is None, reason="msgpack is not installed")
+def test_compact_index_msgpack(tmpdir):
+    compact_indexes = compactindex.create_compact_indexes("index.yaml", INDEX)
+    compact_path = write(tmpdir, "index-compact.msgpack", compact_indexes["index-compact.msgpack"])
+    assert compactindex.read_compact_entry(compact_path, "acme-other") == indexcache.parse_index(INDEX)["entries"]["acme-other"]
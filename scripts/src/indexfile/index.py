@@ -1,105 +1,235 @@
 
-import json
+import heapq
 import requests
-import yaml
 import semantic_version
 import sys
 
 sys.path.append('../')
 from chartrepomanager import indexannotations
+from indexfile import compactindex
+from indexfile import indexcache
+from tools import cacheutils
 
 INDEX_FILE = "https://charts.openshift.io/index.yaml"
 
-def _make_http_request(url, body=None, params={}, headers={}, verbose=False):
-    response = requests.get(url, params=params, headers=headers, json=body)
-    if verbose:
-        print(json.dumps(headers, indent=4, sort_keys=True))
-        print(json.dumps(body, indent=4, sort_keys=True))
-        print(json.dumps(params, indent=4, sort_keys=True))
-        print(response.text)
-    return response.text
-
-def _load_index_yaml():
-    yaml_text = _make_http_request(INDEX_FILE)
-    dct = yaml.safe_load(yaml_text)
+def _load_index_yaml(index_url=INDEX_FILE):
+    """Return the index dict, raise requests.HTTPError if the index is not available."""
+    status_code, dct = indexcache.get_index(index_url)
+    if dct is None:
+        raise requests.HTTPError(f"index {index_url} not available: {status_code}")
     return dct
 
-def get_chart_info(tar_name):
-    index_dct = _load_index_yaml()
-    for entry, charts in index_dct["entries"].items():
-        if tar_name.startswith(entry):
+def _load_index(index_url=INDEX_FILE):
+    """Return the index dict, from its compact index if it is for the current index file, otherwise from the yaml."""
+    compact_url = compactindex.get_compact_index_name(index_url)
+    try:
+        status_code, index_path = indexcache.get_index_path(index_url)
+        if status_code == 200:
+            status_code, compact_path = indexcache.get_index_path(compact_url)
+            if status_code == 200:
+                return compactindex.load_compact_index(compact_path, cacheutils.get_file_digest(index_path))
+    except (requests.RequestException, OSError, ValueError, KeyError, IndexError, TypeError) as err:
+        print(f"[WARNING] ignoring compact index {compact_url}: {err}")
+    return _load_index_yaml(index_url)
+
+# version string -> parsed version, None if it is not a valid version
+parsed_versions = {}
+
+def _get_version(version):
+    """Return the parsed version, with or without a "v" prefix, None if it is not a valid version."""
+    if version not in parsed_versions:
+        try:
+            parsed_versions[version] = semantic_version.Version.coerce(str(version).removeprefix("v"))
+        except ValueError:
+            print(f"[WARNING] invalid chart version : {version}")
+            parsed_versions[version] = None
+    return parsed_versions[version]
+
+def _add_latest(latest, key, version, sequence, chart, count):
+    """Keep chart in latest[key] if it is one of the count latest versions seen for key.
+
+    latest[key] is the chart with the latest version if count is 1, otherwise a min heap of
+    the latest versions. A version seen earlier wins over an equal version seen later.
+    """
+    candidate = (version, -sequence, chart)
+    if count == 1:
+        if key not in latest or candidate[:2] > latest[key][:2]:
+            latest[key] = candidate
+    elif key not in latest:
+        latest[key] = [candidate]
+    elif len(latest[key]) < count:
+        heapq.heappush(latest[key], candidate)
+    elif candidate[:2] > latest[key][0][:2]:
+        heapq.heapreplace(latest[key], candidate)
+
+def _get_latest_list(latest, count):
+    if count == 1:
+        return [chart for _, _, chart in latest.values()]
+    return [chart for heap in latest.values() for _, _, chart in sorted(heap, key=lambda candidate: candidate[:2], reverse=True)]
+
+def select_latest_charts(chart_list, count=1):
+    """Return the count latest versions of each chart in chart_list, newest first.
+
+    Charts are grouped by provider and name in a single pass, the order of chart_list does
+    not matter. Charts are returned in the order each chart is first seen.
+    """
+    if count < 1:
+        raise ValueError(f"count must be at least 1 : {count}")
+    latest = {}
+    for sequence, chart in enumerate(chart_list):
+        version = _get_version(chart["version"])
+        if version is not None:
+            _add_latest(latest, (chart["provider"], chart["name"]), version, sequence, chart, count)
+    return _get_latest_list(latest, count)
+
+def _get_chart_info(entry, chart):
+    chart_info = {}
+    chart_info["name"] = chart['name']
+    chart_info["version"] = chart["version"]
+    chart_info["providerType"] = chart["annotations"]["charts.openshift.io/providerType"]
+    chart_info["provider"] =  entry.removesuffix(f'-{chart["name"]}')
+    if 'charts.openshift.io/supportedOpenShiftVersions' in chart["annotations"]:
+        chart_info["supportedOCP"] = chart["annotations"]["charts.openshift.io/supportedOpenShiftVersions"]
+    else:
+        chart_info["supportedOCP"] = ""
+    if "kubeVersion" in chart:
+        chart_info["kubeVersion"] = chart["kubeVersion"]
+    else:
+        chart_info["kubeVersion"] =""
+    return chart_info
+
+class IndexView:
+    """Lookups on the charts of an index file.
+
+    The index entries are read once and the charts are kept in dictionaries keyed by
+    "<entry>-<version>" (the release and tarball name) and by (provider, chart name).
+    """
+
+    def __init__(self, index_dct):
+        self.charts_info = []
+        self.charts_by_tar_name = {}
+        self.charts_by_provider = {}
+        for entry, charts in (index_dct.get("entries") or {}).items():
             for chart in charts:
-                index_tar_name = f"{entry}-{chart['version']}"
-                if tar_name == index_tar_name :
-                    print(f"[INFO] match found: {tar_name}")
-                    providerType = chart["annotations"]["charts.openshift.io/providerType"]
-                    provider = chart["annotations"]["charts.openshift.io/provider"]
-                    return providerType, provider, chart["name"], chart["version"]
-    print(f"[INFO] match not found: {tar_name}")
-    return "","","",""
+                chart_info = _get_chart_info(entry, chart)
+                self.charts_info.append(chart_info)
+                self.charts_by_tar_name[f"{entry}-{chart['version']}"] = (chart, chart_info)
+                self.charts_by_provider.setdefault((chart_info["provider"], chart["name"]), []).append(chart_info)
+
+    def get_chart_info(self, tar_name):
+        """Return providerType, provider, name and version of the chart release tar_name, empty if not found."""
+        if tar_name not in self.charts_by_tar_name:
+            print(f"[INFO] match not found: {tar_name}")
+            return "","","",""
+        print(f"[INFO] match found: {tar_name}")
+        chart, _ = self.charts_by_tar_name[tar_name]
+        providerType = chart["annotations"]["charts.openshift.io/providerType"]
+        provider = chart["annotations"]["charts.openshift.io/provider"]
+        return providerType, provider, chart["name"], chart["version"]
+
+    def get_provider_type(self, tar_name):
+        if tar_name not in self.charts_by_tar_name:
+            return ""
+        return self.charts_by_tar_name[tar_name][1]["providerType"]
+
+    def get_charts_info(self):
+        return [dict(chart_info) for chart_info in self.charts_info]
+
+    def get_latest_version(self, provider, chart_name):
+        """Return the chart info of the latest version of the chart of provider, None if not found."""
+        latest = select_latest_charts(self.charts_by_provider.get((provider, chart_name), []))
+        return dict(latest[0]) if latest else None
+
+    def get_latest_charts(self, count=1):
+        chart_list = self.get_charts_info()
+        print(f"{len(chart_list)} charts found in Index file")
+        return select_latest_charts(chart_list, count)
+
+# index url -> IndexView, so the index is only downloaded and parsed once per process
+index_views = {}
+
+def get_index_view(index_url=INDEX_FILE):
+    if index_url not in index_views:
+        print(f"[INFO] loading index {index_url}")
+        index_views[index_url] = IndexView(_load_index(index_url))
+    return index_views[index_url]
+
+def get_chart_info(tar_name):
+    return get_index_view().get_chart_info(tar_name)
 
 def get_charts_info():
-    chart_info_list = []
-
-    index_dct = _load_index_yaml()
-    for entry, charts in index_dct["entries"].items():
-        for chart in charts:
-            chart_info = {}
-            chart_info["name"] = chart['name']
-            chart_info["version"] = chart["version"]
-            chart_info["providerType"] = chart["annotations"]["charts.openshift.io/providerType"]
-            chart_info["provider"] =  entry.removesuffix(f'-{chart["name"]}')
-            #print(f'[INFO] found chart : {chart_info["provider"]} {chart["name"]} {chart["version"]} ')
-            if 'charts.openshift.io/supportedOpenShiftVersions' in chart["annotations"]:
-                chart_info["supportedOCP"] = chart["annotations"]["charts.openshift.io/supportedOpenShiftVersions"]
-            else:
-                chart_info["supportedOCP"] = ""
-            if "kubeVersion" in chart:
-                chart_info["kubeVersion"] = chart["kubeVersion"]
-            else:
-                chart_info["kubeVersion"] =""
-            chart_info_list.append(chart_info)
-
-    return chart_info_list
-
-def get_latest_charts():
-    chart_list = get_charts_info()
-
-    print(f"{len(chart_list)} charts found in Index file")
-
-    chart_in_process = {"name" : ""}
-    chart_latest_version = ""
-    latest_charts = []
-
-    for index,chart in enumerate(chart_list):
-        chart_name = chart["name"]
-        #print(f'[INFO] look for latest chart : {chart_name} {chart["version"]}')
-        if chart_name == chart_in_process["name"]:
-            new_version = semantic_version.Version.coerce(chart["version"])
-            #print(f'   [INFO] compare chart versions : {new_version}({chart["version"]}) : {chart_latest_version}')
-            if new_version > chart_latest_version:
-                #print(f'   [INFO] a new latest chart version : {new_version}')
-                chart_latest_version = new_version
-                chart_in_process = chart
-        else:
-            if chart_in_process["name"] != "":
-                #print(f'   [INFO] chart completed : {chart_in_process["name"]} {chart_in_process["version"]}')
-                latest_charts.append(chart_in_process)
-
-                #print(f'[INFO] new  chart found : {chart_name} {chart["version"]}')
-                chart_in_process = chart
-                chart_version = chart["version"]
-                if chart_version.startswith("v"):
-                    chart_version = chart_version[1:]
-                chart_latest_version = semantic_version.Version.coerce(chart_version)
+    return get_index_view().get_charts_info()
+
+def get_latest_charts(count=1):
+    return get_index_view().get_latest_charts(count)
+
+def _get_ocp_spec(chart):
+    """Return the supported OCP versions spec of a chart, from the annotation or its kubeVersion."""
+    if chart.get("supportedOCP") and chart["supportedOCP"] != "N/A":
+        return chart["supportedOCP"]
+    if chart.get("kubeVersion"):
+        return indexannotations.getOCPVersions(chart["kubeVersion"])
+    return ""
+
+def get_ocp_compatibility(ocp_versions, chart_list=None):
+    """Check charts against one or more OCP versions in a single pass.
+
+    ocp_versions is an OCP version or a list of OCP versions, chart_list is a list of charts
+    as returned by get_charts_info or get_latest_charts, by default all charts in the index.
+    Each supported OCP versions spec is parsed and checked once, however many charts share it.
+
+    Returns a copy of each chart with "ocpSpec", the supported OCP versions spec used, and
+    "compatibility", a dict of OCP version to True or False, or None if the chart has no
+    usable spec.
+    """
+    if isinstance(ocp_versions, str):
+        ocp_versions = [ocp_versions]
+    if chart_list is None:
+        chart_list = get_charts_info()
+
+    target_versions = [semantic_version.Version.coerce(ocp_version) for ocp_version in ocp_versions]
+
+    spec_results = {}
+    compatibility_matrix = []
+    for chart in chart_list:
+        ocp_spec = _get_ocp_spec(chart)
+        if ocp_spec not in spec_results:
+            try:
+                spec = indexannotations.getNpmSpec(ocp_spec) if ocp_spec and ocp_spec != "N/A" else None
+            except ValueError:
+                print(f"[WARNING] invalid supported OCP versions : {ocp_spec}")
+                spec = None
+            if spec is None:
+                spec_results[ocp_spec] = [None] * len(target_versions)
             else:
-                chart_in_process = chart
-
-        if index+1 == len(chart_list):
-            #print(f'   [INFO] last chart completed : {chart_in_process["name"]} {chart_in_process["version"]}')
-            latest_charts.append(chart_in_process)
-
-    return latest_charts
+                spec_results[ocp_spec] = [target_version in spec for target_version in target_versions]
+
+        chart_compatibility = dict(chart)
+        chart_compatibility["ocpSpec"] = ocp_spec
+        chart_compatibility["compatibility"] = dict(zip(ocp_versions, spec_results[ocp_spec]))
+        compatibility_matrix.append(chart_compatibility)
+
+    print(f"[INFO] {len(compatibility_matrix)} charts checked against OCP {', '.join(ocp_versions)} using {len(spec_results)} distinct specs")
+    return compatibility_matrix
+
+def get_latest_charts_per_ocp_version(ocp_versions, chart_list=None, count=1):
+    """Return {OCP version: the count latest versions of each chart supporting the OCP version}.
+
+    The compatibility of chart_list, by default all charts in the index, is checked with
+    get_ocp_compatibility and the latest versions are selected in the same single pass
+    as select_latest_charts.
+    """
+    if isinstance(ocp_versions, str):
+        ocp_versions = [ocp_versions]
+    latest = {ocp_version: {} for ocp_version in ocp_versions}
+    for sequence, chart in enumerate(get_ocp_compatibility(ocp_versions, chart_list)):
+        version = _get_version(chart["version"])
+        if version is None:
+            continue
+        for ocp_version, compatible in chart["compatibility"].items():
+            if compatible:
+                _add_latest(latest[ocp_version], (chart["provider"], chart["name"]), version, sequence, chart, count)
+    return {ocp_version: _get_latest_list(latest[ocp_version], count) for ocp_version in ocp_versions}
 
 
 if __name__ == "__main__":
@@ -111,24 +241,12 @@ if __name__ == "__main__":
         print(f'[INFO] found latest chart : {chart["name"]} {chart["version"]}')
 
 
-    OCP_VERSION = semantic_version.Version.coerce("4.11")
-
-    for chart in chart_list:
-        if "supportedOCP" in chart and chart["supportedOCP"] != "N/A" and chart["supportedOCP"] != "":
-            if OCP_VERSION in semantic_version.NpmSpec(chart["supportedOCP"]):
-                print(f'PASS: Chart supported OCP version {chart["supportedOCP"]} includes: {OCP_VERSION}')
-            else:
-                print(f'   ERROR: Chart supported OCP version {chart["supportedOCP"]} does not include {OCP_VERSION}')
-        elif "kubeVersion" in chart and chart["kubeVersion"] != "":
-            supportedOCPVersion = indexannotations.getOCPVersions(chart["kubeVersion"])
-            if OCP_VERSION in semantic_version.NpmSpec(supportedOCPVersion):
-                print(f'PASS: Chart kubeVersion  {chart["kubeVersion"]} (OCP: {supportedOCPVersion}) includes OCP version: {OCP_VERSION}')
-            else:
-                print(f'   ERROR: Chart kubeVersion {chart["kubeVersion"]} (OCP: {supportedOCPVersion}) does not include {OCP_VERSION}')
-
-
-
-
-
-
+    OCP_VERSION = "4.11"
 
+    for chart in get_ocp_compatibility(OCP_VERSION, chart_list):
+        if chart["compatibility"][OCP_VERSION] is None:
+            continue
+        if chart["compatibility"][OCP_VERSION]:
+            print(f'PASS: Chart {chart["name"]} {chart["version"]} supported OCP version {chart["ocpSpec"]} includes: {OCP_VERSION}')
+        else:
+            print(f'   ERROR: Chart {chart["name"]} {chart["version"]} supported OCP version {chart["ocpSpec"]} does not include {OCP_VERSION}')
@@ -0,0 +1,183 @@
+import pytest
+
+from chartrepomanager import kubeversionmap
+from indexfile import compactindex
+from indexfile import index
+from indexfile import indexcache
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch, tmpdir):
+    monkeypatch.setenv(kubeversionmap.OFFLINE_ENV, "true")
+    monkeypatch.setenv(kubeversionmap.CACHE_DIR_ENV, str(tmpdir))
+
+
+def make_chart(name, supportedOCP="", kubeVersion=""):
+    return {"name": name, "version": "1.0.0", "providerType": "partner", "provider": "acme",
+            "supportedOCP": supportedOCP, "kubeVersion": kubeVersion}
+
+
+def test_get_ocp_compatibility():
+    chart_list = [make_chart("open-ended", supportedOCP=">=4.8"),
+                  make_chart("range", supportedOCP="4.6 - 4.10"),
+                  make_chart("same-range", supportedOCP="4.6 - 4.10"),
+                  make_chart("kube", supportedOCP="N/A", kubeVersion=">=1.19.0 <1.24.0"),
+                  make_chart("bad-kube", kubeVersion="not a version"),
+                  make_chart("no-spec")]
+
+    matrix = index.get_ocp_compatibility(["4.10", "4.12"], chart_list)
+
+    compatibility = {chart["name"]: chart["compatibility"] for chart in matrix}
+    assert compatibility["open-ended"] == {"4.10": True, "4.12": True}
+    assert compatibility["range"] == {"4.10": True, "4.12": False}
+    assert compatibility["same-range"] == compatibility["range"]
+    assert compatibility["kube"] == {"4.10": True, "4.12": False}
+    assert compatibility["bad-kube"] == {"4.10": None, "4.12": None}
+    assert compatibility["no-spec"] == {"4.10": None, "4.12": None}
+    assert matrix[3]["ocpSpec"] == "4.6 - 4.10"
+    assert "compatibility" not in chart_list[0]
+
+
+def test_get_ocp_compatibility_single_version():
+    matrix = index.get_ocp_compatibility("4.7", [make_chart("range", supportedOCP="4.6 - 4.10")])
+    assert matrix[0]["compatibility"] == {"4.7": True}
+
+
+def make_entry(name, version, provider="acme", providerType="partner"):
+    return {"name": name, "version": version,
+            "annotations": {"charts.openshift.io/providerType": providerType,
+                            "charts.openshift.io/provider": provider.capitalize()}}
+
+
+def test_index_view():
+    view = index.IndexView({"entries": {
+        "acme-chart": [make_entry("chart", "1.0.0"), make_entry("chart", "v1.10.0"), make_entry("chart", "1.2.0")],
+        "acme-chart-extra": [make_entry("chart-extra", "0.1.0")],
+        "redhat-chart": [make_entry("chart", "2.0.0", "redhat", "redhat")]}})
+
+    assert view.get_chart_info("acme-chart-1.2.0") == ("partner", "Acme", "chart", "1.2.0")
+    assert view.get_chart_info("acme-chart-extra-0.1.0") == ("partner", "Acme", "chart-extra", "0.1.0")
+    assert view.get_chart_info("acme-chart-3.0.0") == ("", "", "", "")
+    assert view.get_provider_type("redhat-chart-2.0.0") == "redhat"
+    assert view.get_latest_version("acme", "chart")["version"] == "v1.10.0"
+    assert view.get_latest_version("acme", "missing") is None
+    assert len(view.get_charts_info()) == 5
+
+
+def test_index_loaded_once(monkeypatch):
+    requests = []
+
+    def get_index(url):
+        requests.append(url)
+        return 200, {"entries": {"acme-chart": [make_entry("chart", "1.0.0")]}}
+
+    monkeypatch.setattr(index.indexcache, "get_index", get_index)
+    monkeypatch.setattr(index.indexcache, "get_index_path", lambda url: (404, ""))
+    monkeypatch.setattr(index, "index_views", {})
+    assert index.get_chart_info("acme-chart-1.0.0")[2] == "chart"
+    assert index.get_chart_info("acme-chart-2.0.0")[2] == ""
+    assert len(index.get_charts_info()) == 1
+    assert requests == [index.INDEX_FILE]
+
+
+def test_index_not_available_is_not_kept(monkeypatch):
+    responses = [(503, None), (200, {"entries": {"acme-chart": [make_entry("chart", "1.0.0")]}})]
+    monkeypatch.setattr(index.indexcache, "get_index", lambda url: responses.pop(0))
+    monkeypatch.setattr(index.indexcache, "get_index_path", lambda url: (404, ""))
+    monkeypatch.setattr(index, "index_views", {})
+    with pytest.raises(index.requests.HTTPError):
+        index.get_chart_info("acme-chart-1.0.0")
+    assert index.index_views == {}
+    assert index.get_chart_info("acme-chart-1.0.0")[2] == "chart"
+
+
+INDEX = b"""apiVersion: v1
+entries:
+  acme-chart:
+  - annotations:
+      charts.openshift.io/provider: Acme
+      charts.openshift.io/providerType: partner
+    name: chart
+    version: 1.0.0
+generated: "2023-01-01T00:00:00Z"
+"""
+
+
+def test_load_index_uses_compact_index_of_index_file(static_server, monkeypatch, tmpdir):
+    monkeypatch.setenv(indexcache.CACHE_DIR_ENV, str(tmpdir))
+    index_url = f"{static_server.url}/index.yaml"
+    static_server.files["/index.yaml"] = INDEX
+    static_server.files["/index-compact.json"] = compactindex.create_compact_indexes("index.yaml", INDEX.decode("utf-8"))["index-compact.json"]
+    load_index_yaml = index._load_index_yaml
+    monkeypatch.setattr(index, "_load_index_yaml", None)
+    loaded = index._load_index(index_url)
+    assert [chart["version"] for chart in loaded["entries"]["acme-chart"]] == ["1.0.0"]
+    monkeypatch.setattr(index, "_load_index_yaml", load_index_yaml)
+
+    # index.yaml updated without its compact index
+    static_server.files["/index.yaml"] = INDEX.replace(b"version: 1.0.0", b"version: 1.1.0")
+    loaded = index._load_index(index_url)
+    assert [chart["version"] for chart in loaded["entries"]["acme-chart"]] == ["1.1.0"]
+
+
+
+def test_load_index_downloads_index_file_once(static_server, monkeypatch, tmpdir):
+    monkeypatch.setenv(indexcache.CACHE_DIR_ENV, str(tmpdir))
+    index_url = f"{static_server.url}/index.yaml"
+
+    def index_requests():
+        return [etag for path, etag in static_server.requests if path == "/index.yaml"]
+
+    # cold cache, no compact index
+    static_server.files["/index.yaml"] = INDEX
+    loaded = index._load_index(index_url)
+    assert [chart["version"] for chart in loaded["entries"]["acme-chart"]] == ["1.0.0"]
+    # the index parsed for the missing compact index is revalidated, a 304
+    etag = static_server.get_etag(INDEX)
+    assert index_requests() == [None, etag]
+
+    # index.yaml updated, its compact index is for the previous index file
+    static_server.files["/index-compact.json"] = compactindex.create_compact_indexes("index.yaml", INDEX.decode("utf-8"))["index-compact.json"]
+    updated = INDEX.replace(b"version: 1.0.0", b"version: 1.1.0")
+    static_server.files["/index.yaml"] = updated
+    loaded = index._load_index(index_url)
+    assert [chart["version"] for chart in loaded["entries"]["acme-chart"]] == ["1.1.0"]
+    assert index_requests() == [None, etag, etag, static_server.get_etag(updated)]
+
+
+def make_version(name, version, provider="acme", supportedOCP=""):
+    return {"name": name, "version": version, "provider": provider, "providerType": "partner",
+            "supportedOCP": supportedOCP, "kubeVersion": ""}
+
+
+def test_select_latest_charts():
+    chart_list = [make_version("chart", "1.2.0"),
+                  make_version("other", "0.1.0"),
+                  make_version("chart", "v1.10.0"),
+                  make_version("chart", "1.9.0", provider="redhat"),
+                  make_version("chart", "1.3"),
+                  make_version("other", "not a version")]
+
+    latest = index.select_latest_charts(chart_list)
+    assert [(chart["provider"], chart["name"], chart["version"]) for chart in latest] == [
+        ("acme", "chart", "v1.10.0"), ("acme", "other", "0.1.0"), ("redhat", "chart", "1.9.0")]
+
+    latest = index.select_latest_charts(chart_list, count=2)
+    assert [chart["version"] for chart in latest if chart["provider"] == "acme" and chart["name"] == "chart"] == ["v1.10.0", "1.3"]
+
+    # the order of the chart list does not matter
+    def versions(charts):
+        return sorted((chart["provider"], chart["name"], chart["version"]) for chart in charts)
+    assert versions(index.select_latest_charts(chart_list[::-1])) == versions(index.select_latest_charts(chart_list))
+
+
+def test_get_latest_charts_per_ocp_version():
+    chart_list = [make_version("chart", "1.0.0", supportedOCP="4.8 - 4.10"),
+                  make_version("chart", "2.0.0", supportedOCP=">=4.11"),
+                  make_version("chart", "1.1.0", supportedOCP="4.9 - 4.10"),
+                  make_version("old", "1.0.0", supportedOCP="4.8")]
+
+    latest = index.get_latest_charts_per_ocp_version(["4.8", "4.10", "4.12"], chart_list)
+    assert [(chart["name"], chart["version"]) for chart in latest["4.8"]] == [("chart", "1.0.0"), ("old", "1.0.0")]
+    assert [(chart["name"], chart["version"]) for chart in latest["4.10"]] == [("chart", "1.1.0")]
+    assert [(chart["name"], chart["version"]) for chart in latest["4.12"]] == [("chart", "2.0.0")]
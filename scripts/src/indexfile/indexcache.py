@@ -0,0 +1,107 @@
+"""
+Fetch a chart repository index.yaml with a local cache shared by all tools.
+
+The index text is kept in INDEX_CACHE_DIR, by default a directory in the system temp
+directory, with a json sidecar, a tools.cacheutils conditional GET entry holding the ETag
+of the download and the parsed index. A cached index is revalidated with If-None-Match,
+so an unchanged index costs one 304 response and is not parsed again. An index downloaded
+with get_index_path is parsed from the cached text the first time get_index needs it.
+
+Timestamps in the index are kept as strings so the parsed index can be stored as json,
+the parsed index is the same whether it comes from the cache or a download.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+
+import requests
+import yaml
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+sys.path.append('../')
+from tools import cacheutils
+
+CACHE_DIR_ENV = "INDEX_CACHE_DIR"
+TIMEOUT = 30
+
+class IndexLoader(SafeLoader):
+    """Safe loader that does not convert timestamps."""
+
+IndexLoader.yaml_implicit_resolvers = {
+    first: [(tag, regexp) for tag, regexp in resolvers if tag != "tag:yaml.org,2002:timestamp"]
+    for first, resolvers in SafeLoader.yaml_implicit_resolvers.items()}
+
+def parse_index(index_text):
+    return yaml.load(index_text, Loader=IndexLoader)
+
+def get_cache_dir():
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(tempfile.gettempdir(), "chart-index-cache")
+
+def get_cache_paths(url):
+    """Return the paths of the cached index text and of its json sidecar for url."""
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    cache_dir = get_cache_dir()
+    return os.path.join(cache_dir, f"{key}.yaml"), os.path.join(cache_dir, f"{key}.json")
+
+def _parse_cached_index(url, text_path, sidecar_path):
+    """Return the parsed index of the cached text, kept in the sidecar so it is parsed once."""
+    with open(text_path, "rb") as fd:
+        index = parse_index(fd.read())
+    entry = cacheutils.read_entry(sidecar_path, url)
+    if entry:
+        try:
+            cacheutils.write_file(sidecar_path, json.dumps(dict(entry, value=index)))
+        except OSError as err:
+            print(f"[WARNING] unable to cache index {url}: {err}")
+    return index
+
+def _fetch(url, parse):
+    """Return (status code, index text path, parsed index or None)."""
+    text_path, sidecar_path = get_cache_paths(url)
+
+    def use_entry(entry):
+        return os.path.exists(text_path)
+
+    def read_response(response):
+        # the content is kept as downloaded, so its digest is the digest of the published file
+        try:
+            cacheutils.write_file(text_path, response.content)
+        except OSError as err:
+            print(f"[WARNING] unable to cache index {url}: {err}")
+        return parse_index(response.content) if parse else None
+
+    try:
+        status_code, index = cacheutils.conditional_get(url, sidecar_path, read_response, TIMEOUT, use_entry=use_entry)
+    except requests.RequestException as err:
+        sidecar = cacheutils.read_entry(sidecar_path, url)
+        if not sidecar or not use_entry(sidecar):
+            raise
+        print(f"[WARNING] unable to download {url}, using cached index: {err}")
+        index = sidecar["value"]
+        if parse and index is None:
+            index = _parse_cached_index(url, text_path, sidecar_path)
+        return 200, text_path, index
+
+    if status_code != 200:
+        print(f"[INFO] {url} download failed: {status_code}")
+        return status_code, "", None
+    if parse and index is None:
+        # the cached text was downloaded by get_index_path and not parsed yet
+        index = _parse_cached_index(url, text_path, sidecar_path)
+    return 200, text_path, index
+
+def get_index(url):
+    """Return (status code, parsed index) of the index at url, the index is None if the status code is not 200."""
+    status_code, _, index = _fetch(url, parse=True)
+    return status_code, index
+
+def get_index_path(url):
+    """Return (status code, path of a local copy of the index at url), the path is empty if the status code is not 200."""
+    status_code, text_path, _ = _fetch(url, parse=False)
+    return status_code, text_path
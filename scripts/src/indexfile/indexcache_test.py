@@ -0,0 +1,68 @@
+import pytest
+
+from indexfile import indexcache
+
+INDEX = b"""apiVersion: v1
+entries:
+  acme-chart:
+  - name: chart
+    version: 1.0.0
+    created: "2023-01-01T00:00:00Z"
+    digest: abc
+  - name: chart
+    version: 0.1.0
+    created: 2022-01-01T00:00:00.000000000Z
+generated: 2023-01-02T00:00:00Z
+"""
+
+
+@pytest.fixture
+def server(monkeypatch, tmpdir, static_server):
+    monkeypatch.setenv(indexcache.CACHE_DIR_ENV, str(tmpdir))
+    static_server.files["/index.yaml"] = INDEX
+    return static_server
+
+
+def test_get_index(server, monkeypatch):
+    url = f"{server.url}/index.yaml"
+    status_code, index = indexcache.get_index(url)
+    assert status_code == 200
+    assert [chart["version"] for chart in index["entries"]["acme-chart"]] == ["1.0.0", "0.1.0"]
+    assert index["generated"] == "2023-01-02T00:00:00Z"
+
+    # a warm fetch is a 304 and the index is not parsed again
+    monkeypatch.setattr(indexcache, "parse_index", None)
+    assert indexcache.get_index(url) == (200, index)
+    assert server.requests == [("/index.yaml", None), ("/index.yaml", server.get_etag(INDEX))]
+
+    status_code, index_path = indexcache.get_index_path(url)
+    with open(index_path, "rb") as fd:
+        assert fd.read() == INDEX
+
+
+def test_get_index_not_found(server):
+    assert indexcache.get_index(f"{server.url}/missing.yaml") == (404, None)
+
+
+def test_get_index_download_failure_uses_cache(server, monkeypatch):
+    url = f"{server.url}/index.yaml"
+    status_code, index = indexcache.get_index(url)
+
+    def fail(*args, **kwargs):
+        raise indexcache.requests.ConnectionError("offline")
+    monkeypatch.setattr(indexcache.cacheutils.requests, "get", fail)
+    assert indexcache.get_index(url) == (200, index)
+
+
+def test_get_index_after_get_index_path(server, monkeypatch):
+    url = f"{server.url}/index.yaml"
+    indexcache.get_index_path(url)
+
+    # the text downloaded by get_index_path is parsed, not downloaded again
+    status_code, index = indexcache.get_index(url)
+    assert [chart["version"] for chart in index["entries"]["acme-chart"]] == ["1.0.0", "0.1.0"]
+    assert server.requests == [("/index.yaml", None), ("/index.yaml", server.get_etag(INDEX))]
+
+    # and it is parsed once
+    monkeypatch.setattr(indexcache, "parse_index", None)
+    assert indexcache.get_index(url) == (200, index)
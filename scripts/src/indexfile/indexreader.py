@@ -0,0 +1,80 @@
+"""
+Read a single entry of an index.yaml without loading the whole index.
+
+The index is read as a stream of libyaml parser events. The events of the other entries
+are skipped without building Python objects, the events of the requested entry are
+collected and only they are loaded. Reading stops at the end of the entry, so memory use
+does not grow with the number of charts in the index.
+"""
+
+import yaml
+try:
+    from yaml import CLoader as Loader, CDumper as Dumper
+except ImportError:
+    from yaml import Loader, Dumper
+
+from indexfile import indexcache
+
+COLLECTION_START_EVENTS = (yaml.MappingStartEvent, yaml.SequenceStartEvent)
+COLLECTION_END_EVENTS = (yaml.MappingEndEvent, yaml.SequenceEndEvent)
+
+def _get_node_events(events, event, collect):
+    """Consume the events of the node starting with event, return them if collect is True."""
+    node_events = [event] if collect else None
+    depth = 1 if isinstance(event, COLLECTION_START_EVENTS) else 0
+    while depth:
+        event = next(events)
+        if isinstance(event, COLLECTION_START_EVENTS):
+            depth += 1
+        elif isinstance(event, COLLECTION_END_EVENTS):
+            depth -= 1
+        if collect:
+            node_events.append(event)
+    return node_events
+
+def _load_node(node_events):
+    text = yaml.emit([yaml.StreamStartEvent(), yaml.DocumentStartEvent()] + node_events +
+                     [yaml.DocumentEndEvent(), yaml.StreamEndEvent()], Dumper=Dumper)
+    return indexcache.parse_index(text)
+
+def _find_mapping_value(events, key):
+    """Consume the events of a mapping up to the value of key, return the first event of the value or None."""
+    while True:
+        key_event = next(events)
+        if isinstance(key_event, yaml.MappingEndEvent):
+            return None
+        value_event = next(events)
+        if isinstance(key_event, yaml.ScalarEvent) and key_event.value == key:
+            return value_event
+        _get_node_events(events, key_event, False)
+        _get_node_events(events, value_event, False)
+
+def read_entry(stream, entry_name):
+    """Return the list of chart versions of entries[entry_name] in the index stream, None if there is none."""
+    events = yaml.parse(stream, Loader=Loader)
+    try:
+        for event in events:
+            if isinstance(event, yaml.MappingStartEvent):
+                break
+            if not isinstance(event, (yaml.StreamStartEvent, yaml.DocumentStartEvent)):
+                return None
+        else:
+            return None
+
+        entries_event = _find_mapping_value(events, "entries")
+        if not isinstance(entries_event, yaml.MappingStartEvent):
+            return None
+        entry_event = _find_mapping_value(events, entry_name)
+        if entry_event is None:
+            return None
+        return _load_node(_get_node_events(events, entry_event, True))
+    finally:
+        events.close()
+
+def get_entry(index_path, entry_name):
+    """Return the list of chart versions of entry_name in the index file at index_path, None if there is none."""
+    with open(index_path, "rb") as fd:
+        return read_entry(fd, entry_name)
+
+def has_version(index_path, entry_name, version):
+    return any(chart.get("version") == version for chart in get_entry(index_path, entry_name) or [])
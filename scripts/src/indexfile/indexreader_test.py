@@ -0,0 +1,47 @@
+import io
+
+
+from indexfile import indexcache
+from indexfile import indexreader
+
+INDEX = """apiVersion: v1
+entries:
+  acme-chart:
+  - annotations:
+      charts.openshift.io/provider: Acme
+    name: chart
+    version: 1.0.0
+    urls:
+    - https://example.com/acme-chart-1.0.0.tgz
+    created: 2023-01-01T00:00:00Z
+  - name: chart
+    version: "0.1"
+  acme-chart-extra:
+  - name: chart-extra
+    version: 2.0.0
+  empty: []
+generated: 2023-01-02T00:00:00Z
+"""
+
+
+def test_read_entry():
+    expected = indexcache.parse_index(INDEX)["entries"]
+    for entry_name in ["acme-chart", "acme-chart-extra", "empty"]:
+        assert indexreader.read_entry(io.StringIO(INDEX), entry_name) == expected[entry_name]
+    assert indexreader.read_entry(io.StringIO(INDEX), "acme") is None
+    assert indexreader.read_entry(io.StringIO("apiVersion: v1\n"), "acme-chart") is None
+    assert indexreader.read_entry(io.StringIO(""), "acme-chart") is None
+
+
+def test_read_entry_stops_after_entry():
+    # the rest of the stream is not parsed, so a syntax error after the entry is not seen
+    assert indexreader.read_entry(io.StringIO(INDEX.replace("generated:", "generated: [")), "acme-chart")[1]["version"] == "0.1"
+
+
+def test_has_version(tmpdir):
+    index_path = tmpdir / "index.yaml"
+    index_path.write(INDEX)
+    assert indexreader.has_version(str(index_path), "acme-chart", "1.0.0")
+    assert indexreader.has_version(str(index_path), "acme-chart", "0.1")
+    assert not indexreader.has_version(str(index_path), "acme-chart", "2.0.0")
+    assert not indexreader.has_version(str(index_path), "missing", "1.0.0")
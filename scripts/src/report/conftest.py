@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from report import verifier_pool
+
+REPORT_OUTPUT = {"annotations": [{"name": "charts.openshift.io/digest", "value": "sha256:1234"}],
+                 "digests": {"chart": "sha256:1234"},
+                 "metadata": {"chart-uri": "chart.tgz", "chart": {"name": "chart", "version": "1.0.0"}},
+                 "results": {"passed": "1", "failed": "0", "message": []}}
+
+
+class FakeContainer:
+    """Container of FakeDockerClient, exec_run reads the report from the staging volume."""
+
+    def __init__(self, client, staging_dir):
+        self.client = client
+        self.staging_dir = staging_dir
+        self.short_id = f"c{len(client.started)}"
+        self.removed = False
+
+    def exec_run(self, command, stdout=True, stderr=True):
+        assert not self.removed
+        report_path = command[-1].replace(verifier_pool.STAGING_MOUNT, self.staging_dir, 1)
+        with self.client.lock:
+            self.client.running += 1
+            self.client.max_running = max(self.client.max_running, self.client.running)
+        time.sleep(0.01)
+        with self.client.lock:
+            self.client.running -= 1
+        self.client.commands.append(command)
+        if not os.path.exists(report_path):
+            return 1, b""
+        return 0, json.dumps(REPORT_OUTPUT).encode("utf-8")
+
+    def remove(self, force=False):
+        self.removed = True
+
+
+class FakeDockerClient:
+    def __init__(self):
+        self.started = []
+        self.commands = []
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.images = self
+        self.containers = self
+
+    def get(self, image):
+        return type("Image", (), {"attrs": {"Config": {"Entrypoint": ["/app/chart-verifier"]}}})
+
+    def run(self, image, entrypoint=None, detach=False, volumes=None):
+        assert detach and entrypoint == ["sleep", "infinity"]
+        staging_dir = next(host_dir for host_dir, bind in volumes.items() if bind["bind"] == verifier_pool.STAGING_MOUNT)
+        container = FakeContainer(self, staging_dir)
+        self.started.append(container)
+        return container
+
+
+
+
+@pytest.fixture
+def docker_client(monkeypatch):
+    """FakeDockerClient used by the verifier container pools, no pool is left open."""
+    client = FakeDockerClient()
+    monkeypatch.setattr(verifier_pool.docker, "from_env", lambda: client)
+    monkeypatch.setattr(verifier_pool, "pools", {})
+    yield client
+    verifier_pool.close_pools()
@@ -0,0 +1,99 @@
+"""
+Extract the report info (annotations, digests, metadata and results) from many reports.
+
+Reports can be given as files, directories (searched for report.yaml and report.json) or
+glob patterns, for example "charts/**/report.yaml". Reports are processed in parallel in
+a process pool and one json line per report is written to the output file. When the
+chart-verifier container pool is used (VERIFIER_IMAGE and VERIFIER_POOL_SIZE are set)
+reports are processed in threads sharing one container pool, which is closed when done.
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+import concurrent.futures
+
+sys.path.append('../')
+from report import report_info
+from report import verifier_pool
+
+REPORT_FILE_NAMES = ["report.yaml", "report.json"]
+
+def find_reports(paths):
+    report_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for report_file_name in REPORT_FILE_NAMES:
+                report_paths.extend(glob.glob(os.path.join(path, "**", report_file_name), recursive=True))
+        elif glob.has_magic(path):
+            report_paths.extend(glob.glob(path, recursive=True))
+        else:
+            report_paths.append(path)
+
+    return sorted(set(report_paths))
+
+def get_report_info_record(report_path, profile_type="", profile_version=""):
+    record = {"report": report_path}
+    try:
+        info = report_info.get_report_info(report_path, "", profile_type, profile_version)
+        record[report_info.REPORT_ANNOTATIONS] = info.get(report_info.REPORT_ANNOTATIONS)
+        record[report_info.REPORT_DIGESTS] = info.get(report_info.REPORT_DIGESTS)
+        record[report_info.REPORT_METADATA] = info.get(report_info.REPORT_METADATA)
+        results = info.get(report_info.REPORT_RESULTS)
+        results["failed"] = int(results["failed"])
+        results["passed"] = int(results["passed"])
+        record[report_info.REPORT_RESULTS] = results
+    except SystemExit:
+        record["error"] = "report info could not be extracted, see log for details"
+    except Exception as err:
+        record["error"] = f"{type(err).__name__}: {err}"
+    return record
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("reports", nargs="+",
+                        help="report files, directories or glob patterns, e.g. 'charts/**/report.yaml'")
+    parser.add_argument("-o", "--output", dest="output", type=str, required=True,
+                        help="json lines output file")
+    parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=os.cpu_count(),
+                        help="number of reports processed in parallel")
+    parser.add_argument("-t", "--profile-type", dest="profile_type", type=str, default="",
+                        help="profile vendor type used for the results")
+    parser.add_argument("-p", "--profile-version", dest="profile_version", type=str, default="",
+                        help="profile version used for the results")
+    args = parser.parse_args()
+
+    report_paths = find_reports(args.reports)
+    print(f"[INFO] {len(report_paths)} reports found")
+
+    # worker processes do not run exit handlers and would leave their pool containers running
+    if os.environ.get("VERIFIER_IMAGE") and verifier_pool.get_pool_size():
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs)
+
+    errors = 0
+    try:
+        with executor:
+            records = executor.map(get_report_info_record, report_paths,
+                                   [args.profile_type] * len(report_paths),
+                                   [args.profile_version] * len(report_paths),
+                                   chunksize=4)
+            with open(args.output, "w") as fd:
+                for record in records:
+                    if "error" in record:
+                        errors += 1
+                        print(f"[ERROR] {record['report']}: {record['error']}")
+                    fd.write(json.dumps(record))
+                    fd.write("\n")
+    finally:
+        verifier_pool.close_pools()
+
+    print(f"[INFO] report info written to {args.output}: {len(report_paths)} reports, {errors} errors")
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import json
+import sys
+
+from report import get_report_info
+from report import report_info
+from report import verifier_pool
+from report.conftest import REPORT_OUTPUT
+
+
+def test_reports_through_verifier_pool(tmp_path, docker_client, monkeypatch):
+    report_paths = []
+    for index in range(10):
+        report_path = tmp_path / f"chart-{index}" / "report.yaml"
+        report_path.parent.mkdir()
+        report_path.write_text("kind: verify-report\n")
+        report_paths.append(str(report_path))
+    output_path = tmp_path / "report-info.jsonl"
+
+    monkeypatch.setenv("VERIFIER_IMAGE", "verifier")
+    monkeypatch.setenv(verifier_pool.POOL_SIZE_ENV, "3")
+    monkeypatch.setenv("REPORT_INFO_USE_VERIFIER", "True")
+    monkeypatch.delenv("REPORT_INFO_CACHE_DIR", raising=False)
+    monkeypatch.setattr(report_info, "report_infos", {})
+    monkeypatch.setattr(sys, "argv", ["get-report-info", str(tmp_path), "-o", str(output_path), "-j", "4"])
+
+    get_report_info.main()
+
+    with open(output_path) as fd:
+        records = [json.loads(line) for line in fd]
+    assert sorted(record["report"] for record in records) == sorted(report_paths)
+    for record in records:
+        assert "error" not in record
+        assert record["digests"] == REPORT_OUTPUT["digests"]
+        assert record["results"]["passed"] == 1
+
+    assert 1 <= len(docker_client.started) <= 3
+    assert all(container.removed for container in docker_client.started)
+    assert verifier_pool.pools == {}
@@ -7,6 +7,24 @@ sys.path.append('../')
 from chartprreview import chartprreview
 from signedchart import signedchart
 from tools import gitutils
+from tools import chartarchive
+
+def check_chart_tarball(directory, tar, category, organization, chart, version):
+    try:
+        tar_chart_name, tar_chart_version = chartarchive.get_name_and_version(tar)
+    except chartarchive.ChartArchiveError as err:
+        msg = f"[ERROR] Chart tarball is not a valid chart: {err}"
+        chartprreview.write_error_log(directory, msg)
+        sys.exit(1)
+
+    msgs = []
+    if tar_chart_name != chart:
+        msgs.append(f"[ERROR] Chart name ({tar_chart_name}) doesn't match the directory structure (charts/{category}/{organization}/{chart}/{version})")
+    if tar_chart_version != version:
+        msgs.append(f"[ERROR] Chart version ({tar_chart_version}) doesn't match the directory structure (charts/{category}/{organization}/{chart}/{version})")
+    if msgs:
+        chartprreview.write_error_log(directory, *msgs)
+        sys.exit(1)
 
 def generate_verify_options(directory,category, organization, chart, version):
     print("[INFO] Generate verify options. %s, %s, %s" % (organization,chart,version))
@@ -30,6 +48,7 @@ def generate_verify_options(directory,category, organization, chart, version):
         return flags,src,True, cluster_needed
     elif os.path.exists(tar) and not os.path.exists(src):
         print("[INFO] tarball included")
+        check_chart_tarball(directory, tar, category, organization, chart, version)
         if not os.path.exists(report_path):
             owners_file = os.path.join(os.getcwd(),"charts", category, organization, chart, "OWNERS")
             signed_flags = signedchart.get_verifier_flags(tar,owners_file,directory)
@@ -0,0 +1,95 @@
+"""
+On disk cache for the report info json generated by chart-verifier.
+
+The cache is used if the REPORT_INFO_CACHE_DIR environment variable is set. Entries are
+content addressed: the key is made from the sha256 of the report content, the report
+info type, the profile values and the chart-verifier version, so a cache directory can be
+shared between workflow steps and jobs, for example as an uploaded artifact.
+
+The cache size is limited to REPORT_INFO_CACHE_MAX_SIZE bytes (default 64MiB). When the
+limit is exceeded the least recently used entries are removed.
+"""
+
+import os
+import sys
+import json
+import hashlib
+
+sys.path.append('../')
+from tools import cacheutils
+
+CACHE_DIR_ENV = "REPORT_INFO_CACHE_DIR"
+CACHE_MAX_SIZE_ENV = "REPORT_INFO_CACHE_MAX_SIZE"
+DEFAULT_CACHE_MAX_SIZE = 64 * 1024 * 1024
+CACHE_FILE_SUFFIX = ".json"
+
+def get_cache_dir():
+    return os.environ.get(CACHE_DIR_ENV, "")
+
+def get_max_size():
+    try:
+        return int(os.environ.get(CACHE_MAX_SIZE_ENV, DEFAULT_CACHE_MAX_SIZE))
+    except ValueError:
+        print(f"[WARNING] {CACHE_MAX_SIZE_ENV} is not a number, using {DEFAULT_CACHE_MAX_SIZE}")
+        return DEFAULT_CACHE_MAX_SIZE
+
+def get_key(report_path, info_type, set_values, verifier_version):
+    key = "\n".join([cacheutils.get_file_digest(report_path), info_type, set_values, verifier_version])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def get(key):
+    """Return the cached report info for key, or None if it is not cached."""
+    cache_dir = get_cache_dir()
+    if not cache_dir:
+        return None
+
+    cache_path = os.path.join(cache_dir, key + CACHE_FILE_SUFFIX)
+    try:
+        with open(cache_path) as fd:
+            report_out = json.load(fd)
+        # mark as recently used for eviction
+        os.utime(cache_path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        print(f"[WARNING] ignoring unreadable report info cache entry {cache_path}: {err}")
+        return None
+
+    return report_out
+
+def put(key, report_out):
+    cache_dir = get_cache_dir()
+    if not cache_dir:
+        return
+
+    try:
+        cacheutils.write_file(os.path.join(cache_dir, key + CACHE_FILE_SUFFIX), json.dumps(report_out))
+    except OSError as err:
+        print(f"[WARNING] unable to write report info cache entry in {cache_dir}: {err}")
+        return
+
+    evict(cache_dir, get_max_size())
+
+def evict(cache_dir, max_size):
+    """Remove least recently used entries until the cache is no larger than max_size."""
+    entries = []
+    total_size = 0
+    for entry in os.scandir(cache_dir):
+        if not entry.name.endswith(CACHE_FILE_SUFFIX):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_size -= size
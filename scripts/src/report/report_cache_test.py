@@ -0,0 +1,122 @@
+import os
+import stat
+
+import pytest
+
+from report import report_cache
+from report import report_info
+
+REPORT_OUT = {"results": {"passed": "3", "failed": "0", "message": []}}
+
+# chart-verifier stand in, the arguments of each report call are logged.
+FAKE_VERIFIER = """#!/bin/sh
+if [ "$1" = "version" ]; then
+    echo "v1.10.0"
+    exit 0
+fi
+echo "$@" >> "$(dirname "$0")/calls"
+echo '{"results":{"passed":"3","failed":"0","message":[]}}'
+"""
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv(report_cache.CACHE_DIR_ENV, str(cache_dir))
+    monkeypatch.delenv(report_cache.CACHE_MAX_SIZE_ENV, raising=False)
+    return cache_dir
+
+
+@pytest.fixture
+def report_path(tmp_path):
+    report_path = tmp_path / "report.yaml"
+    report_path.write_text("kind: verify-report\n")
+    return str(report_path)
+
+
+def write_report(tmp_path, name, content):
+    report_path = tmp_path / name
+    report_path.write_text(content)
+    return str(report_path)
+
+
+def test_key_composition(tmp_path, report_path):
+    key = report_cache.get_key(report_path, "all", "", "v1.10.0")
+
+    # the key is made from the report content, not its path
+    same_content = write_report(tmp_path, "copy.yaml", "kind: verify-report\n")
+    assert report_cache.get_key(same_content, "all", "", "v1.10.0") == key
+
+    other_keys = [
+        report_cache.get_key(write_report(tmp_path, "other.yaml", "kind: other\n"), "all", "", "v1.10.0"),
+        report_cache.get_key(report_path, "results", "", "v1.10.0"),
+        report_cache.get_key(report_path, "all", report_info._get_set_values("partner", ""), "v1.10.0"),
+        report_cache.get_key(report_path, "all", report_info._get_set_values("partner", "v1.1"), "v1.10.0"),
+        report_cache.get_key(report_path, "all", report_info._get_set_values("", "v1.1"), "v1.10.0"),
+        report_cache.get_key(report_path, "all", "", "v1.9.0"),
+    ]
+    assert len(set(other_keys + [key])) == len(other_keys) + 1
+
+
+def test_get_put(cache_dir, report_path):
+    key = report_cache.get_key(report_path, "all", "", "v1.10.0")
+    assert report_cache.get(key) is None
+    report_cache.put(key, REPORT_OUT)
+    assert report_cache.get(key) == REPORT_OUT
+    assert os.listdir(cache_dir) == [key + report_cache.CACHE_FILE_SUFFIX]
+
+
+def test_not_used_without_cache_dir(monkeypatch, report_path):
+    monkeypatch.delenv(report_cache.CACHE_DIR_ENV, raising=False)
+    key = report_cache.get_key(report_path, "all", "", "v1.10.0")
+    report_cache.put(key, REPORT_OUT)
+    assert report_cache.get(key) is None
+
+
+def test_report_change_is_a_miss(tmp_path, cache_dir, report_path, monkeypatch):
+    verifier = tmp_path / "bin" / "chart-verifier"
+    verifier.parent.mkdir()
+    verifier.write_text(FAKE_VERIFIER)
+    verifier.chmod(verifier.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", f"{verifier.parent}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.delenv("VERIFIER_IMAGE", raising=False)
+    monkeypatch.setattr(report_info, "verifier_versions", {})
+
+    assert report_info._run_report_info(report_path, "results", "", "") == REPORT_OUT
+    assert report_info._run_report_info(report_path, "results", "", "") == REPORT_OUT
+    assert (verifier.parent / "calls").read_text().count("\n") == 1
+
+    with open(report_path, "a") as fd:
+        fd.write("results: []\n")
+    assert report_info._run_report_info(report_path, "results", "", "") == REPORT_OUT
+    assert (verifier.parent / "calls").read_text().count("\n") == 2
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_corrupt_entry_is_a_miss(cache_dir, report_path):
+    key = report_cache.get_key(report_path, "all", "", "v1.10.0")
+    cache_dir.mkdir()
+    (cache_dir / (key + report_cache.CACHE_FILE_SUFFIX)).write_text('{"results": ')
+    assert report_cache.get(key) is None
+
+    report_cache.put(key, REPORT_OUT)
+    assert report_cache.get(key) == REPORT_OUT
+
+
+def test_least_recently_used_entries_are_evicted(cache_dir, report_path, monkeypatch):
+    keys = [report_cache.get_key(report_path, "all", "", f"v1.{minor}.0") for minor in range(4)]
+    for position, key in enumerate(keys):
+        report_cache.put(key, REPORT_OUT)
+        # keys[0] is the least recently used
+        os.utime(cache_dir / (key + report_cache.CACHE_FILE_SUFFIX), (1000 + position, 1000 + position))
+    entry_size = os.path.getsize(cache_dir / (keys[0] + report_cache.CACHE_FILE_SUFFIX))
+
+    # a read marks keys[0] as the most recently used
+    assert report_cache.get(keys[0]) == REPORT_OUT
+
+    monkeypatch.setenv(report_cache.CACHE_MAX_SIZE_ENV, str(3 * entry_size))
+    new_key = report_cache.get_key(report_path, "all", "", "v2.0.0")
+    report_cache.put(new_key, REPORT_OUT)
+
+    cached = {name.removesuffix(report_cache.CACHE_FILE_SUFFIX) for name in os.listdir(cache_dir)}
+    assert cached == {keys[0], keys[3], new_key}
@@ -3,14 +3,25 @@ import os
 import sys
 import docker
 import json
+import copy
 import subprocess
+from environs import Env
+
+sys.path.append('../')
+from report import report_summary
+from report import report_cache
+from report import verifier_pool
 
 REPORT_ANNOTATIONS = "annotations"
 REPORT_RESULTS = "results"
 REPORT_DIGESTS = "digests"
 REPORT_METADATA = "metadata"
+REPORT_ALL = "all"
 SHA_ERROR = "Digest in report did not match report content"
 
+report_infos = {}
+verifier_versions = {}
+
 def write_error_log(*msg):
     directory = os.environ.get("WORKFLOW_WORKING_DIRECTORY")
     if directory:
@@ -24,67 +35,194 @@ def write_error_log(*msg):
         print(line)
 
 
-def _get_report_info(report_path, report_info_path,info_type, profile_type, profile_version):
+def _get_set_values(profile_type, profile_version):
+    set_values = ""
+    if profile_type:
+        set_values = "profile.vendortype=%s" % profile_type
+    if profile_version:
+        if set_values:
+            set_values = "%s,profile.version=%s" % (set_values,profile_version)
+        else:
+            set_values = "profile.version=%s" % profile_version
+    return set_values
 
-    if report_info_path and len(report_info_path) > 0:
-        print(f"[INFO] Using existing report info: {report_info_path}")
-        report_out = json.load(open(report_info_path))
-    else:
-        command = f"report"
-        set_values = ""
-        if profile_type:
-            set_values = "profile.vendortype=%s" % profile_type
-        if profile_version:
-            if set_values:
-                set_values = "%s,profile.version=%s" % (set_values,profile_version)
-            else:
-                set_values = "profile.version=%s" % profile_version
 
-        if os.environ.get("VERIFIER_IMAGE"):
-            print(f"[INFO] Generate report info using docker  : {report_path}")
-            docker_command = f"{command} {info_type} /charts/{os.path.basename(report_path)}"
-            if set_values:
-                docker_command = "%s --set %s" % (docker_command, set_values)
+def _get_verifier_version():
+    """Return an identifier of the chart-verifier used, the image id when using docker."""
+    verifier_image = os.environ.get("VERIFIER_IMAGE", "")
+    if verifier_image not in verifier_versions:
+        if verifier_image:
+            try:
+                client = docker.from_env()
+                verifier_versions[verifier_image] = f"{verifier_image}@{client.images.get(verifier_image).id}"
+            except docker.errors.DockerException as err:
+                print(f"[WARNING] unable to get image id of {verifier_image}: {err}")
+                verifier_versions[verifier_image] = verifier_image
+        else:
+            try:
+                out = subprocess.run(["chart-verifier","version"],capture_output=True)
+                verifier_versions[verifier_image] = out.stdout.decode("utf-8").strip()
+            except OSError as err:
+                print(f"[WARNING] unable to get chart-verifier version: {err}")
+                verifier_versions[verifier_image] = ""
+    return verifier_versions[verifier_image]
+
+
+def _run_report_info(report_path, info_type, profile_type, profile_version, exit_on_error=True):
+    """Return the chart-verifier report output for info_type.
+
+    If the output can not be loaded the error is logged and the process exits, or None is
+    returned if exit_on_error is False.
+    """
 
+    command = f"report"
+    set_values = _get_set_values(profile_type, profile_version)
+
+    cache_key = ""
+    if report_cache.get_cache_dir():
+        verifier_version = _get_verifier_version()
+        if verifier_version:
+            cache_key = report_cache.get_key(report_path, info_type, set_values, verifier_version)
+            report_out = report_cache.get(cache_key)
+            if report_out is not None:
+                print(f"[INFO] Using cached report info for : {os.path.abspath(report_path)}")
+                return report_out
+
+    if os.environ.get("VERIFIER_IMAGE"):
+        print(f"[INFO] Generate report info using docker  : {report_path}")
+        docker_command = f"{command} {info_type} /charts/{os.path.basename(report_path)}"
+        if set_values:
+            docker_command = "%s --set %s" % (docker_command, set_values)
+
+        if verifier_pool.get_pool_size():
+            pool_command = [command, info_type]
+            if set_values:
+                pool_command.extend(["--set", set_values])
+            print(f'Call verifier container pool using image: {os.environ.get("VERIFIER_IMAGE")}, command: {pool_command}, report: {report_path}')
+            output = verifier_pool.get_pool(os.environ.get("VERIFIER_IMAGE")).run(report_path, pool_command)
+        else:
             client = docker.from_env()
             report_directory = os.path.dirname(os.path.abspath(report_path))
             print(f'Call docker using image: {os.environ.get("VERIFIER_IMAGE")}, docker command: {docker_command}, report directory: {report_directory}')
-            output = client.containers.run(os.environ.get("VERIFIER_IMAGE"),docker_command,stdin_open=True,tty=True,stdout=True,volumes={report_directory: {'bind': '/charts/', 'mode': 'rw'}})
+            try:
+                output = client.containers.run(os.environ.get("VERIFIER_IMAGE"),docker_command,stdin_open=True,tty=True,stdout=True,volumes={report_directory: {'bind': '/charts/', 'mode': 'rw'}})
+            except docker.errors.ContainerError as err:
+                if exit_on_error:
+                    raise
+                print(f"[INFO] chart-verifier {command} {info_type} failed: {err}")
+                return None
+            output = output.decode("utf-8") if isinstance(output, bytes) else output
+    else:
+        print(f"[INFO] Generate report info using chart-verifier on path : {os.path.abspath(report_path)}")
+        if set_values:
+            out = subprocess.run(["chart-verifier",command,info_type,"--set",set_values,os.path.abspath(report_path)],capture_output=True)
         else:
-            print(f"[INFO] Generate report info using chart-verifier on path : {os.path.abspath(report_path)}")
-            if set_values:
-                out = subprocess.run(["chart-verifier",command,info_type,"--set",set_values,os.path.abspath(report_path)],capture_output=True)
-            else:
-                out = subprocess.run(["chart-verifier",command,info_type,os.path.abspath(report_path)],capture_output=True)
-            output = out.stdout.decode("utf-8")
+            out = subprocess.run(["chart-verifier",command,info_type,os.path.abspath(report_path)],capture_output=True)
+        output = out.stdout.decode("utf-8")
 
-        if SHA_ERROR in output:
-            msg = f"[ERROR] {SHA_ERROR}"
+    if SHA_ERROR in output:
+        msg = f"[ERROR] {SHA_ERROR}"
+        write_error_log(msg)
+        sys.exit(1)
+
+    try:
+        report_out = json.loads(output)
+    except BaseException as err:
+        if not exit_on_error:
+            print(f"[INFO] chart-verifier {command} {info_type} output could not be loaded: {err}")
+            return None
+        msgs = []
+        msgs.append(f"[ERROR] loading report output: /n{output}")
+        msgs.append(f"[ERROR] exception was: {err=}, {type(err)=}")
+        write_error_log(*msgs)
+        sys.exit(1)
+
+    if cache_key:
+        report_cache.put(cache_key, report_out)
+
+    return report_out
+
+
+class ReportInfo:
+    """Report info for one report and profile.
+
+    The report info is generated once, for all info types, the first time any
+    info type is requested; every later request is served from the stored output.
+    Recognised reports are handled in process by report_summary, otherwise
+    chart-verifier is run. Set REPORT_INFO_USE_VERIFIER=True to always use
+    chart-verifier.
+    """
+
+    def __init__(self, report_path, report_info_path="", profile_type="", profile_version=""):
+        self.report_path = report_path
+        self.report_info_path = report_info_path
+        self.profile_type = profile_type
+        self.profile_version = profile_version
+        self.report_out = None
+
+    def _load(self):
+        if self.report_info_path and len(self.report_info_path) > 0:
+            print(f"[INFO] Using existing report info: {self.report_info_path}")
+            self.report_out = json.load(open(self.report_info_path))
+            return
+
+        env = Env()
+        if not env.bool("REPORT_INFO_USE_VERIFIER", False):
+            self.report_out = report_summary.get_report_summary(self.report_path, self.profile_type, self.profile_version)
+            if self.report_out is not None:
+                print(f"[INFO] Generated report info in process : {os.path.abspath(self.report_path)}")
+                return
+
+        self.report_out = _run_report_info(self.report_path, REPORT_ALL, self.profile_type, self.profile_version, exit_on_error=False)
+        if self.report_out is None:
+            # chart-verifier without the report all view, each info type is requested when needed
+            print(f"[INFO] chart-verifier report {REPORT_ALL} not available, requesting each report info type")
+            self.report_out = {}
+
+    def get(self, info_type):
+        if self.report_out is None:
+            self._load()
+
+        if not info_type in self.report_out and not self.report_info_path:
+            # verifier output did not include this info type, ask for it directly
+            print(f"[INFO] {info_type} not found in report info, request it from chart-verifier")
+            self.report_out.update(_run_report_info(self.report_path, info_type, self.profile_type, self.profile_version))
+
+        if not info_type in self.report_out:
+            msg = f"Error extracting {info_type} from the report: {self.report_out}"
             write_error_log(msg)
             sys.exit(1)
 
-        try:
-            report_out = json.loads(output)
-        except BaseException as err:
-            msgs = []
-            msgs.append(f"[ERROR] loading report output: /n{output}")
-            msgs.append(f"[ERROR] exception was: {err=}, {type(err)=}")
-            write_error_log(*msgs)
-            sys.exit(1)
+        if info_type == REPORT_ANNOTATIONS:
+            annotations = {}
+            for report_annotation in self.report_out[REPORT_ANNOTATIONS]:
+                annotations[report_annotation["name"]] = report_annotation["value"]
 
-    if not info_type in report_out:
-        msg = f"Error extracting {info_type} from the report:", report_out.strip()
-        write_error_log(msg)
-        sys.exit(1)
+            return annotations
+
+        return copy.deepcopy(self.report_out[info_type])
 
-    if info_type == REPORT_ANNOTATIONS:
-        annotations = {}
-        for report_annotation in report_out[REPORT_ANNOTATIONS]:
-            annotations[report_annotation["name"]] = report_annotation["value"]
 
-        return annotations
+def get_report_info(report_path=None, report_info_path=None, profile_type=None, profile_version=None):
+    """Return the ReportInfo for a report and profile, creating it on first use."""
+    report_info_path = report_info_path or ""
+    if report_info_path:
+        key = (report_info_path, "", "", "")
+        profile_type = ""
+        profile_version = ""
+    else:
+        report_path = os.path.abspath(report_path)
+        mtime = os.stat(report_path).st_mtime_ns if os.path.exists(report_path) else 0
+        key = (report_path, mtime, profile_type or "", profile_version or "")
+
+    if key not in report_infos:
+        report_infos[key] = ReportInfo(report_path, report_info_path, profile_type or "", profile_version or "")
+
+    return report_infos[key]
 
-    return report_out[info_type]
+
+def _get_report_info(report_path, report_info_path,info_type, profile_type, profile_version):
+    return get_report_info(report_path, report_info_path, profile_type, profile_version).get(info_type)
 
 
 def get_report_annotations(report_path=None,report_info_path=None):
@@ -134,6 +272,7 @@ def main():
 
     print("\n\n\n\nverifier command results:\n")
     os.environ["VERIFIER_IMAGE"] = ""
+    report_infos.clear()
     get_report_results("./report.yaml","","")
     get_report_results("./report.yaml","community","v1.1")
     get_report_digests("./report.yaml")
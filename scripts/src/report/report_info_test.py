@@ -0,0 +1,47 @@
+import os
+import stat
+
+import pytest
+
+from report import report_info
+
+# chart-verifier stand in without the report all view, like chart-verifier versions before it was added.
+FAKE_VERIFIER = """#!/bin/sh
+case "$2" in
+    all) echo "Error: unknown report type all" >&2; exit 1 ;;
+    annotations) echo '{"annotations":[{"name":"charts.openshift.io/digest","value":"sha256:1234"}]}' ;;
+    results) echo '{"results":{"passed":"3","failed":"0","message":[]}}' ;;
+    metadata) echo '{"metadata":{"chart-uri":"chart.tgz","chart":{"name":"chart","version":"1.0.0"}}}' ;;
+    *) exit 1 ;;
+esac
+"""
+
+
+@pytest.fixture
+def old_verifier(tmp_path, monkeypatch):
+    verifier = tmp_path / "bin" / "chart-verifier"
+    verifier.parent.mkdir()
+    verifier.write_text(FAKE_VERIFIER)
+    verifier.chmod(verifier.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", f"{verifier.parent}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("REPORT_INFO_USE_VERIFIER", "True")
+    monkeypatch.delenv("VERIFIER_IMAGE", raising=False)
+    monkeypatch.delenv("REPORT_INFO_CACHE_DIR", raising=False)
+    monkeypatch.setattr(report_info, "report_infos", {})
+
+    report_path = tmp_path / "report.yaml"
+    report_path.write_text("kind: verify-report\n")
+    return str(report_path)
+
+
+def test_report_all_failure_does_not_exit(old_verifier):
+    assert report_info._run_report_info(old_verifier, report_info.REPORT_ALL, "", "", exit_on_error=False) is None
+    with pytest.raises(SystemExit):
+        report_info._run_report_info(old_verifier, report_info.REPORT_ALL, "", "")
+
+
+def test_report_all_failure_falls_back_to_each_view(old_verifier):
+    assert report_info.get_report_results(old_verifier) == {"passed": 3, "failed": 0, "message": []}
+    assert report_info.get_report_annotations(old_verifier) == {"charts.openshift.io/digest": "sha256:1234"}
+    assert report_info.get_report_chart_url(old_verifier) == "chart.tgz"
+    assert report_info.get_report_info(old_verifier).report_out.keys() == {"results", "annotations", "metadata"}
@@ -0,0 +1,449 @@
+"""
+In-process implementation of the chart-verifier report views used by report_info:
+
+    chart-verifier report annotations|digests|metadata|results|all <report>
+
+The report (report.yaml or report.json) is read directly and the output has the same
+json layout chart-verifier produces, so report_info can use either source.
+
+The chart-verifier profiles are read from verifierProfiles.yaml, a copy of the profiles of
+the chart-verifier release it names. A report is only handled here if it is recognised,
+otherwise None is returned and the caller should use chart-verifier instead. A report is
+not recognised if:
+- it does not load or is not a "verify-report".
+- it was created by a chart-verifier later than the release of verifierProfiles.yaml.
+- it has no profile, or the profile vendor type and version are not in the profiles.
+- a check name is not qualified with a check version, for example "v1.0/helm-lint".
+- it has no reportDigest but was created by a chart-verifier that adds one.
+
+The reportDigest is checked the way chart-verifier checks it: it is a hash of the Go
+report structure (hashstructure v2 with FNV-1 64), computed with the digest itself empty.
+If the digest computed here does not match the reportDigest, None is returned and
+chart-verifier decides whether the report content matches its digest.
+"""
+
+import os
+import json
+import struct
+
+import semantic_version
+import yaml
+try:
+    from yaml import CBaseLoader as BaseLoader
+except ImportError:
+    from yaml import BaseLoader
+
+ANNOTATIONS_PREFIX = "charts.openshift.io"
+
+BOOLEAN_FIELDS = {"deprecated", "enabled"}
+
+MANDATORY = "Mandatory"
+OPTIONAL = "Optional"
+PASS = "PASS"
+
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "verifierProfiles.yaml")
+
+# first chart-verifier release adding a reportDigest to its reports
+REPORT_DIGEST_VERIFIER_VERSION = semantic_version.Version("1.8.0")
+REPORT_DIGEST_PREFIX = "uint64:"
+
+FNV_OFFSET_BASIS = 0xcbf29ce484222325
+FNV_PRIME = 0x100000001b3
+UINT64_MASK = 2**64 - 1
+
+profiles = {}
+
+
+def load_profiles(path=PROFILES_PATH):
+    """Return (chart-verifier version, {(vendor type, version): profile}) of the profiles file."""
+    with open(path) as fd:
+        profiles_data = yaml.safe_load(fd)
+    verifier_version = semantic_version.Version(str(profiles_data["verifier-version"]))
+    loaded = {}
+    for profile in profiles_data["profiles"]:
+        checks = [(check["name"], check["type"]) for check in profile["checks"]]
+        for _, check_type in checks:
+            if check_type not in (MANDATORY, OPTIONAL):
+                raise ValueError(f"unknown check type {check_type} in profile {profile['vendorType']} {profile['version']}")
+        loaded[(profile["vendorType"], profile["version"])] = {"annotations": list(profile["annotations"]), "checks": checks}
+    return verifier_version, loaded
+
+
+def get_profiles():
+    """Return (chart-verifier version, profiles) of verifierProfiles.yaml, loaded once."""
+    if not profiles:
+        profiles["verifier_version"], profiles["profiles"] = load_profiles()
+    return profiles["verifier_version"], profiles["profiles"]
+
+
+# Helm chart metadata fields as (yaml key, json key, omit when empty). In report.yaml the
+# keys are the lower case helm field names, chart-verifier outputs the helm json keys.
+CHART_FIELDS = [
+    ("name", "name", True),
+    ("home", "home", True),
+    ("sources", "sources", True),
+    ("version", "version", True),
+    ("description", "description", True),
+    ("keywords", "keywords", True),
+    ("maintainers", "maintainers", True),
+    ("icon", "icon", True),
+    ("apiversion", "apiVersion", True),
+    ("condition", "condition", True),
+    ("tags", "tags", True),
+    ("appversion", "appVersion", True),
+    ("deprecated", "deprecated", True),
+    ("annotations", "annotations", True),
+    ("kubeversion", "kubeVersion", True),
+    ("dependencies", "dependencies", True),
+    ("type", "type", True),
+]
+
+MAINTAINER_FIELDS = [
+    ("name", "name", True),
+    ("email", "email", True),
+    ("url", "url", True),
+]
+
+DEPENDENCY_FIELDS = [
+    ("name", "name", False),
+    ("version", "version", True),
+    ("repository", "repository", False),
+    ("condition", "condition", True),
+    ("tags", "tags", True),
+    ("enabled", "enabled", True),
+    ("importvalues", "import-values", True),
+    ("alias", "alias", True),
+]
+
+
+# The Go structure of a chart-verifier report for the reportDigest, as (struct name, fields),
+# a field is (Go field name, report keys, kind) with the keys lower case without dashes.
+STRING = "string"
+STRINGS = "strings"
+STRING_MAP = "map"
+BOOL = "bool"
+
+MAINTAINER_LAYOUT = ("Maintainer", [
+    ("Name", ("name",), STRING),
+    ("Email", ("email",), STRING),
+    ("URL", ("url",), STRING),
+])
+
+DEPENDENCY_LAYOUT = ("Dependency", [
+    ("Name", ("name",), STRING),
+    ("Version", ("version",), STRING),
+    ("Repository", ("repository",), STRING),
+    ("Condition", ("condition",), STRING),
+    ("Tags", ("tags",), STRINGS),
+    ("Enabled", ("enabled",), BOOL),
+    ("ImportValues", ("importvalues",), STRINGS),
+    ("Alias", ("alias",), STRING),
+])
+
+CHART_LAYOUT = ("Metadata", [
+    ("Name", ("name",), STRING),
+    ("Home", ("home",), STRING),
+    ("Sources", ("sources",), STRINGS),
+    ("Version", ("version",), STRING),
+    ("Description", ("description",), STRING),
+    ("Keywords", ("keywords",), STRINGS),
+    ("Maintainers", ("maintainers",), [MAINTAINER_LAYOUT]),
+    ("Icon", ("icon",), STRING),
+    ("APIVersion", ("apiversion",), STRING),
+    ("Condition", ("condition",), STRING),
+    ("Tags", ("tags",), STRING),
+    ("AppVersion", ("appversion",), STRING),
+    ("Deprecated", ("deprecated",), BOOL),
+    ("Annotations", ("annotations",), STRING_MAP),
+    ("KubeVersion", ("kubeversion",), STRING),
+    ("Dependencies", ("dependencies",), [DEPENDENCY_LAYOUT]),
+    ("Type", ("type",), STRING),
+])
+
+PROFILE_LAYOUT = ("Profile", [
+    ("VendorType", ("vendortype",), STRING),
+    ("Version", ("version",), STRING),
+])
+
+DIGESTS_LAYOUT = ("Digests", [
+    ("Chart", ("chart",), STRING),
+    ("Package", ("package",), STRING),
+])
+
+TOOL_LAYOUT = ("ToolMetadata", [
+    ("Version", ("verifierversion",), STRING),
+    ("Profile", ("profile",), PROFILE_LAYOUT),
+    ("ReportDigest", (), STRING),
+    ("ChartUri", ("charturi",), STRING),
+    ("Digests", ("digests",), DIGESTS_LAYOUT),
+    ("LastCertifiedTimestamp", ("lastcertifiedtimestamp",), STRING),
+    ("CertifiedOpenShiftVersions", ("certifiedopenshiftversions",), STRING),
+    ("TestedOpenShiftVersion", ("testedopenshiftversion",), STRING),
+    ("SupportedOpenShiftVersions", ("supportedopenshiftversions",), STRING),
+    ("ProviderDelivery", ("webcatalogonly", "providercontrolleddelivery"), BOOL),
+])
+
+CHECK_LAYOUT = ("CheckReport", [
+    ("Check", ("check",), STRING),
+    ("Type", ("type",), STRING),
+    ("Outcome", ("outcome",), STRING),
+    ("Reason", ("reason",), STRING),
+])
+
+REPORT_LAYOUT = ("Report", [
+    ("Apiversion", ("apiversion",), STRING),
+    ("Kind", ("kind",), STRING),
+    ("Metadata", ("metadata",), ("ReportMetadata", [
+        ("ToolMetadata", ("tool",), TOOL_LAYOUT),
+        ("ChartData", ("chart",), CHART_LAYOUT),
+        ("Overrides", ("chartoverrides",), STRING),
+    ])),
+    ("Results", ("results",), [CHECK_LAYOUT]),
+])
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
+def _lower_keys(data):
+    lowered = {}
+    for key, value in data.items():
+        lowered[str(key).lower().replace("-", "")] = value
+    return lowered
+
+
+def _convert_fields(data, fields):
+    if not isinstance(data, dict):
+        return data
+    lowered = _lower_keys(data)
+    converted = {}
+    for yaml_key, json_key, omit_empty in fields:
+        value = lowered.get(yaml_key)
+        if yaml_key in BOOLEAN_FIELDS:
+            value = _to_bool(value)
+        if omit_empty and not value:
+            continue
+        if value is None:
+            value = ""
+        if json_key == "maintainers":
+            value = [_convert_fields(maintainer, MAINTAINER_FIELDS) for maintainer in value]
+        elif json_key == "dependencies":
+            value = [_convert_fields(dependency, DEPENDENCY_FIELDS) for dependency in value]
+        converted[json_key] = value
+    return converted
+
+
+def convert_chart_metadata(chart):
+    """Return Chart.yaml (or report chart) fields as helm outputs the chart metadata json."""
+    return _convert_fields(chart, CHART_FIELDS)
+
+
+def _load_report(report_path):
+    try:
+        with open(report_path) as report_data:
+            if report_path.endswith(".json"):
+                return json.load(report_data)
+            # chart-verifier reads scalars into string fields, keep them as written
+            return yaml.load(report_data, Loader=BaseLoader)
+    except Exception as err:
+        print(f"[INFO] report not loaded in process: {err=}")
+        return None
+
+
+def _fnv1_64(data):
+    digest = FNV_OFFSET_BASIS
+    for byte in data:
+        digest = (digest * FNV_PRIME) & UINT64_MASK
+        digest ^= byte
+    return digest
+
+
+def _hash_ordered(first, second):
+    return _fnv1_64(struct.pack("<QQ", first, second))
+
+
+def _hash_finish(digest):
+    return _fnv1_64(struct.pack("<Q", digest))
+
+
+def _hash_string(value):
+    if isinstance(value, (dict, list)):
+        raise ValueError(f"expected a string: {value}")
+    return _fnv1_64(("" if value is None else str(value)).encode("utf-8"))
+
+
+def _hash_value(value, kind):
+    if kind == STRING:
+        return _hash_string(value)
+    if kind == BOOL:
+        return _fnv1_64(b"\x01" if _to_bool(value) else b"\x00")
+    if kind == STRINGS:
+        digest = 0
+        for item in value or []:
+            digest = _hash_ordered(digest, _hash_string(item))
+        return digest
+    if kind == STRING_MAP:
+        digest = 0
+        for key, item in (value or {}).items():
+            digest ^= _hash_ordered(_hash_string(key), _hash_string(item))
+        return _hash_finish(digest)
+    if isinstance(kind, list):
+        digest = 0
+        for item in value or []:
+            digest = _hash_ordered(digest, _hash_struct(item, kind[0]))
+        return digest
+    return _hash_struct(value, kind)
+
+
+def _hash_struct(data, layout):
+    name, fields = layout
+    data = _lower_keys(data) if isinstance(data, dict) else {}
+    digest = _hash_string(name)
+    for field_name, keys, kind in fields:
+        value = next((data[key] for key in keys if key in data), None)
+        digest ^= _hash_ordered(_hash_string(field_name), _hash_value(value, kind))
+        digest = _hash_finish(digest)
+    return digest
+
+
+def get_report_digest(report_data):
+    """Return the reportDigest chart-verifier computes for the report.
+
+    Raises ValueError if the report does not fit the Go report structure.
+    """
+    return f"{REPORT_DIGEST_PREFIX}{_hash_struct(report_data, REPORT_LAYOUT)}"
+
+
+def _get_verifier_version(tool):
+    try:
+        return semantic_version.Version.coerce(str(tool.get("verifier-version", "")).lstrip("v"))
+    except ValueError:
+        return None
+
+
+def _get_profile(tool):
+    if not isinstance(tool.get("profile"), dict):
+        return "", ""
+    profile = _lower_keys(tool["profile"])
+    return profile.get("vendortype", ""), profile.get("version", "")
+
+
+def is_recognised(report_data):
+    """Return True if the report can be summarised without chart-verifier."""
+    if not isinstance(report_data, dict) or report_data.get("kind") != "verify-report":
+        return False
+
+    metadata = report_data.get("metadata")
+    if not isinstance(metadata, dict) or not isinstance(metadata.get("tool"), dict) or not isinstance(metadata.get("chart"), dict):
+        return False
+
+    tool = metadata["tool"]
+    profiles_verifier_version, known_profiles = get_profiles()
+    verifier_version = _get_verifier_version(tool)
+    if verifier_version is None or verifier_version > profiles_verifier_version:
+        return False
+    if not tool.get("reportDigest") and verifier_version >= REPORT_DIGEST_VERIFIER_VERSION:
+        return False
+
+    if _get_profile(tool) not in known_profiles:
+        return False
+
+    results = report_data.get("results")
+    if not isinstance(results, list):
+        return False
+    for result in results:
+        if not isinstance(result, dict) or "/" not in str(result.get("check", "")):
+            return False
+
+    return True
+
+
+def get_annotations(report_data):
+    tool = report_data["metadata"]["tool"]
+    profile = get_profiles()[1][_get_profile(tool)]
+
+    annotations = []
+    for name in profile["annotations"]:
+        if name == "digest":
+            value = (tool.get("digests") or {}).get("chart", "")
+        else:
+            value = tool.get(name, "")
+        if value:
+            annotations.append({"name": f"{ANNOTATIONS_PREFIX}/{name}", "value": str(value)})
+    return annotations
+
+
+def get_digests(report_data):
+    return dict(report_data["metadata"]["tool"].get("digests") or {})
+
+
+def get_metadata(report_data):
+    tool = report_data["metadata"]["tool"]
+    vendor_type, profile_version = _get_profile(tool)
+    web_catalog_only = _to_bool(tool.get("providerControlledDelivery", tool.get("webCatalogOnly", False)))
+    return {"vendorType": vendor_type,
+            "profileVersion": profile_version,
+            "webCatalogOnly": web_catalog_only,
+            "chart-uri": tool.get("chart-uri", ""),
+            "chart": convert_chart_metadata(report_data["metadata"]["chart"])}
+
+
+def get_results(report_data, profile_type="", profile_version=""):
+    report_vendor_type, report_profile_version = _get_profile(report_data["metadata"]["tool"])
+    profile = get_profiles()[1].get((profile_type or report_vendor_type, profile_version or report_profile_version))
+    if profile is None:
+        return None
+    checks = profile["checks"]
+
+    report_checks = {}
+    for result in report_data["results"]:
+        report_checks.setdefault(result["check"], result)
+
+    passed = 0
+    failed = 0
+    messages = []
+    for check_name, check_type in checks:
+        result = report_checks.get(check_name)
+        if result is None:
+            if check_type == MANDATORY:
+                failed += 1
+                messages.append(f"Missing mandatory check : {check_name}")
+        elif result.get("outcome") == PASS:
+            passed += 1
+        elif check_type == MANDATORY:
+            failed += 1
+            messages.append(result.get("reason", ""))
+
+    return {"passed": str(passed), "failed": str(failed), "message": messages}
+
+
+def get_report_summary(report_path, profile_type="", profile_version=""):
+    """Return all report views for report_path, or None if chart-verifier is needed."""
+    if not report_path or not os.path.exists(report_path):
+        return None
+
+    report_data = _load_report(report_path)
+    if not is_recognised(report_data):
+        return None
+
+    report_digest = report_data["metadata"]["tool"].get("reportDigest")
+    if report_digest:
+        try:
+            digest = get_report_digest(report_data)
+        except ValueError as err:
+            print(f"[INFO] report digest not checked in process: {err}")
+            return None
+        if digest != report_digest:
+            print(f"[INFO] report digest {report_digest} does not match the digest {digest} computed in process")
+            return None
+
+    results = get_results(report_data, profile_type, profile_version)
+    if results is None:
+        return None
+
+    return {"annotations": get_annotations(report_data),
+            "digests": get_digests(report_data),
+            "metadata": get_metadata(report_data),
+            "results": results}
@@ -0,0 +1,215 @@
+import glob
+import os
+import shutil
+import stat
+import subprocess
+
+import pytest
+import yaml
+
+from report import report_info
+from report import report_summary
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+# Parity corpus: every report submitted to the repository plus the test data reports.
+CORPUS = sorted(glob.glob(os.path.join(REPO_ROOT, "charts", "**", "report.yaml"), recursive=True)
+                + glob.glob(os.path.join(REPO_ROOT, "tests", "data", "**", "report.yaml"), recursive=True)
+                + glob.glob(os.path.join(REPO_ROOT, "tests", "data", "**", "report.json"), recursive=True))
+
+# Test reports with a reportDigest that does not match their content.
+DIGEST_MISMATCH = {os.path.join(REPO_ROOT, path) for path in [
+    "tests/data/HC-19/report_sha_bad/report.yaml",
+    "tests/data/HC-19/report_edited_sha_bad/report.yaml",
+]}
+
+# chart-verifier stand in rejecting the report digest, the arguments of each call are logged.
+FAKE_VERIFIER = """#!/bin/sh
+echo "$@" >> "$(dirname "$0")/calls"
+echo "Digest in report did not match report content"
+"""
+
+# Parity is checked against the output of chart-verifier PARITY_VERIFIER_VERSION, the release of
+# verifierProfiles.yaml, as report_info runs it:
+#     chart-verifier report all [--set profile.vendortype=<type>,profile.version=<version>] <report>
+# The parity tests are skipped if that chart-verifier is not installed, the unit test workflow
+# installs it.
+PARITY_VERIFIER_VERSION = "1.10.0"
+
+# (report, profile type, profile version) covering each profile, report format and option.
+PARITY_CASES = [
+    ("tests/data/common/partner/report.yaml", "", ""),
+    ("tests/data/common/redhat/report.yaml", "", ""),
+    ("tests/data/common/community/report.yaml", "", ""),
+    ("tests/data/common/community/report.yaml", "partner", ""),
+    ("tests/data/HC-09/partner/report.json", "", ""),
+    ("tests/data/HC-11/partner/report.yaml", "", ""),
+    ("tests/data/HC-06/partner/report.yaml", "", ""),
+    ("charts/partners/exate/exateapigator/0.3.0/report.yaml", "", ""),
+    ("charts/partners/mavenir/mco/3.0.1800-b17/report.yaml", "", ""),
+    ("charts/partners/ibm/ibm-spectrum-protect-plus-prod/1.2.1/report.yaml", "", ""),
+    ("charts/partners/ibm/ibm-spectrum-protect-plus-prod/1.2.1/report.yaml", "partner", "v1.1"),
+]
+
+def corpus_id(report_path):
+    return os.path.relpath(report_path, REPO_ROOT)
+
+def parity_id(case):
+    return "-".join(filter(None, case))
+
+
+@pytest.fixture(scope="module")
+def chart_verifier():
+    if shutil.which("chart-verifier") is None:
+        pytest.skip("chart-verifier is not installed")
+    out = subprocess.run(["chart-verifier", "version"], capture_output=True)
+    if PARITY_VERIFIER_VERSION not in out.stdout.decode("utf-8"):
+        pytest.skip(f"chart-verifier {PARITY_VERIFIER_VERSION} is not installed")
+
+
+def remove_report_digest(report_path, tmpdir):
+    with open(report_path) as fd:
+        content = fd.read()
+    content = "\n".join(line for line in content.split("\n") if "reportDigest:" not in line)
+    new_path = os.path.join(tmpdir, "report.yaml")
+    with open(new_path, "w") as fd:
+        fd.write(content)
+    return new_path
+
+
+def test_corpus_is_not_empty():
+    assert len(CORPUS) > 100
+
+
+@pytest.mark.parametrize("report_path", CORPUS, ids=corpus_id)
+def test_report_summary_matches_report(report_path):
+    if report_path in DIGEST_MISMATCH:
+        assert report_summary.get_report_summary(report_path) is None
+        return
+
+    summary = report_summary.get_report_summary(report_path)
+    with open(report_path) as fd:
+        report_data = yaml.safe_load(fd)
+
+    if summary is None:
+        pytest.skip("report format not handled in process")
+
+    tool = report_data["metadata"]["tool"]
+    assert summary["digests"] == tool["digests"]
+    assert summary["metadata"]["chart-uri"] == tool["chart-uri"]
+    assert summary["metadata"]["chart"]["name"] == report_data["metadata"]["chart"]["name"]
+    assert summary["metadata"]["chart"]["version"] == str(report_data["metadata"]["chart"]["version"])
+
+    annotations = {annotation["name"]: annotation["value"] for annotation in summary["annotations"]}
+    assert annotations["charts.openshift.io/digest"] == tool["digests"]["chart"]
+    if summary["metadata"]["profileVersion"] == "v1.0":
+        assert "charts.openshift.io/testedOpenShiftVersion" not in annotations
+    else:
+        assert "charts.openshift.io/certifiedOpenShiftVersions" not in annotations
+
+    results = summary["results"]
+    assert int(results["failed"]) == len(results["message"])
+
+
+@pytest.mark.parametrize("report_path", CORPUS, ids=corpus_id)
+def test_report_summary_parity_with_chart_verifier(report_path, chart_verifier, monkeypatch):
+    if report_path in DIGEST_MISMATCH:
+        pytest.skip("report digest does not match")
+    summary = report_summary.get_report_summary(report_path)
+    if summary is None:
+        pytest.skip("report format not handled in process")
+
+    monkeypatch.delenv("VERIFIER_IMAGE", raising=False)
+    monkeypatch.delenv("REPORT_INFO_CACHE_DIR", raising=False)
+    verifier_summary = report_info._run_report_info(report_path, report_info.REPORT_ALL, "", "")
+
+    assert summary["annotations"] == verifier_summary["annotations"]
+    assert summary["digests"] == verifier_summary["digests"]
+    assert summary["metadata"] == verifier_summary["metadata"]
+    assert summary["results"] == verifier_summary["results"]
+
+
+@pytest.mark.parametrize("case", PARITY_CASES, ids=parity_id)
+def test_report_summary_profile_parity_with_chart_verifier(case, chart_verifier, monkeypatch):
+    report, profile_type, profile_version = case
+    report_path = os.path.join(REPO_ROOT, report)
+    summary = report_summary.get_report_summary(report_path, profile_type, profile_version)
+    assert summary is not None
+
+    monkeypatch.delenv("VERIFIER_IMAGE", raising=False)
+    monkeypatch.delenv("REPORT_INFO_CACHE_DIR", raising=False)
+    verifier_summary = report_info._run_report_info(report_path, report_info.REPORT_ALL, profile_type, profile_version)
+    assert {info_type: verifier_summary[info_type] for info_type in summary} == summary
+
+
+@pytest.mark.parametrize("report_path", sorted(DIGEST_MISMATCH), ids=corpus_id)
+def test_report_digest_mismatch_uses_chart_verifier(report_path, tmp_path, monkeypatch):
+    verifier = tmp_path / "chart-verifier"
+    verifier.write_text(FAKE_VERIFIER)
+    verifier.chmod(verifier.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(report_info, "report_infos", {})
+    monkeypatch.delenv("REPORT_INFO_USE_VERIFIER", raising=False)
+    monkeypatch.delenv("REPORT_INFO_CACHE_DIR", raising=False)
+    monkeypatch.delenv("VERIFIER_IMAGE", raising=False)
+
+    with pytest.raises(SystemExit):
+        report_info.get_report_results(report_path)
+    assert (tmp_path / "calls").read_text() == f"report all {report_path}\n"
+
+
+def test_report_digest():
+    report_path = os.path.join(REPO_ROOT, "tests", "data", "HC-19", "report_sha_good", "report.yaml")
+    with open(report_path) as fd:
+        report_data = yaml.load(fd, Loader=yaml.BaseLoader)
+    assert report_summary.get_report_digest(report_data) == "uint64:4706854001499919657"
+
+    report_data["results"][0]["outcome"] = "FAIL"
+    assert report_summary.get_report_digest(report_data) != "uint64:4706854001499919657"
+
+
+def test_report_without_digest_from_verifier_adding_digests(tmpdir):
+    report_path = remove_report_digest(os.path.join(REPO_ROOT, "tests", "data", "HC-19", "report_sha_good", "report.yaml"), tmpdir)
+    assert report_summary.get_report_summary(report_path) is None
+
+
+def test_report_from_later_verifier_uses_chart_verifier(tmpdir):
+    report_path = os.path.join(REPO_ROOT, "tests", "data", "HC-19", "report_sha_good", "report.yaml")
+    with open(report_path) as fd:
+        content = fd.read().replace("verifier-version: 1.9.0", "verifier-version: 9.0.0")
+    later_path = os.path.join(tmpdir, "report.yaml")
+    with open(later_path, "w") as fd:
+        fd.write(content)
+    assert report_summary.get_report_summary(later_path) is None
+
+
+def test_load_profiles(tmpdir):
+    verifier_version, profiles = report_summary.load_profiles()
+    assert str(verifier_version) == "1.10.0"
+    assert ("partner", "v1.2") in profiles
+    assert ("v1.0/helm-lint", report_summary.MANDATORY) in profiles[("community", "v1.1")]["checks"]
+    assert "certifiedOpenShiftVersions" in profiles[("partner", "v1.0")]["annotations"]
+
+    profiles_path = os.path.join(tmpdir, "verifierProfiles.yaml")
+    with open(report_summary.PROFILES_PATH) as fd:
+        content = fd.read().replace("type: Optional", "type: Unknown", 1)
+    with open(profiles_path, "w") as fd:
+        fd.write(content)
+    with pytest.raises(ValueError):
+        report_summary.load_profiles(profiles_path)
+
+
+@pytest.mark.parametrize("vendor_type,report_dir", [("partner", "partner"), ("community", "community")])
+def test_missing_mandatory_check(vendor_type, report_dir):
+    report_path = os.path.join(REPO_ROOT, "tests", "data", "HC-11", report_dir, "report.yaml")
+    results = report_summary.get_report_summary(report_path, vendor_type)["results"]
+    assert results["failed"] == "1"
+    assert results["message"] == ["Missing mandatory check : v1.0/helm-lint"]
+
+
+def test_profile_type_override():
+    report_path = os.path.join(REPO_ROOT, "tests", "data", "common", "community", "report.yaml")
+    community_results = report_summary.get_report_summary(report_path)["results"]
+    partner_results = report_summary.get_report_summary(report_path, "partner")["results"]
+    assert int(partner_results["failed"]) >= int(community_results["failed"])
+    assert report_summary.get_report_summary(report_path, "partner", "v9.9") is None
@@ -0,0 +1,112 @@
+"""
+Pool of long running chart-verifier containers used when VERIFIER_IMAGE is set.
+
+Instead of creating, starting and removing a container for each report command, up to
+VERIFIER_POOL_SIZE containers are started the first time they are needed and report
+commands are run in them with docker exec. All containers share one staging directory
+mounted on /charts/, reports are copied into it before a command is run. The containers
+and the staging directory are removed by close_pools(), which is also run when the process
+exits. Worker processes of a process pool exit without running exit handlers, so a pool
+should only be used from the process that closes it; get-report-info shares one pool
+between threads for this reason.
+
+The pool is used when VERIFIER_POOL_SIZE is set to a number greater than 0.
+"""
+
+import os
+import sys
+import atexit
+import queue
+import shutil
+import tempfile
+import threading
+import uuid
+
+import docker
+
+POOL_SIZE_ENV = "VERIFIER_POOL_SIZE"
+MAX_POOL_SIZE = 8
+STAGING_MOUNT = "/charts"
+
+pools = {}
+pools_lock = threading.Lock()
+
+def get_pool_size():
+    try:
+        pool_size = int(os.environ.get(POOL_SIZE_ENV, "0"))
+    except ValueError:
+        print(f"[WARNING] {POOL_SIZE_ENV} is not a number, verifier container pool not used")
+        return 0
+    return max(0, min(pool_size, MAX_POOL_SIZE))
+
+
+class VerifierPool:
+    """A bounded set of running containers of one chart-verifier image."""
+
+    def __init__(self, image, size, client=None):
+        self.image = image
+        self.size = size
+        self.client = client or docker.from_env()
+        self.staging_dir = tempfile.mkdtemp(prefix="verifier-pool-")
+        self.entrypoint = self.client.images.get(image).attrs["Config"]["Entrypoint"] or ["chart-verifier"]
+        self.containers = []
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+
+    def _start_container(self):
+        print(f"[INFO] Start verifier container {len(self.containers)+1} of {self.size} using image: {self.image}")
+        container = self.client.containers.run(self.image, entrypoint=["sleep", "infinity"], detach=True,
+                                               volumes={self.staging_dir: {'bind': STAGING_MOUNT, 'mode': 'rw'}})
+        self.containers.append(container)
+        return container
+
+    def _acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.containers) < self.size:
+                return self._start_container()
+        return self.idle.get()
+
+    def run(self, report_path, command):
+        """Run the chart-verifier command (list) for report_path, return the command stdout as a string."""
+        report_dir = str(uuid.uuid4())
+        os.makedirs(os.path.join(self.staging_dir, report_dir))
+        shutil.copy(report_path, os.path.join(self.staging_dir, report_dir))
+        container_report_path = f"{STAGING_MOUNT}/{report_dir}/{os.path.basename(report_path)}"
+
+        container = self._acquire()
+        try:
+            exit_code, output = container.exec_run(self.entrypoint + command + [container_report_path], stdout=True, stderr=False)
+        finally:
+            self.idle.put(container)
+            shutil.rmtree(os.path.join(self.staging_dir, report_dir), ignore_errors=True)
+
+        if exit_code:
+            print(f"[WARNING] verifier command exit code {exit_code} in container {container.short_id}")
+        return (output or b"").decode("utf-8", errors="replace")
+
+    def close(self):
+        for container in self.containers:
+            try:
+                container.remove(force=True)
+            except docker.errors.DockerException as err:
+                print(f"[WARNING] unable to remove verifier container {container.short_id}: {err}", file=sys.stderr)
+        self.containers = []
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
+def get_pool(image):
+    with pools_lock:
+        if image not in pools:
+            pools[image] = VerifierPool(image, get_pool_size())
+        return pools[image]
+
+@atexit.register
+def close_pools():
+    with pools_lock:
+        for pool in pools.values():
+            pool.close()
+        pools.clear()
@@ -0,0 +1,62 @@
+import json
+import os
+from concurrent import futures
+
+import pytest
+
+from report import verifier_pool
+from report.conftest import FakeDockerClient, REPORT_OUTPUT
+
+
+@pytest.fixture
+def report_path(tmp_path):
+    path = tmp_path / "report.yaml"
+    path.write_text("kind: verify-report\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("value,size", [("", 0), ("3", 3), ("100", verifier_pool.MAX_POOL_SIZE), ("-1", 0), ("x", 0)])
+def test_get_pool_size(value, size, monkeypatch):
+    monkeypatch.setenv(verifier_pool.POOL_SIZE_ENV, value)
+    assert verifier_pool.get_pool_size() == size
+
+
+def test_run_returns_text(report_path):
+    client = FakeDockerClient()
+    pool = verifier_pool.VerifierPool("verifier", 2, client)
+    try:
+        output = pool.run(report_path, ["report", "all"])
+    finally:
+        pool.close()
+
+    assert json.loads(output) == REPORT_OUTPUT
+    assert client.commands[0][:3] == ["/app/chart-verifier", "report", "all"]
+    assert client.commands[0][-1].startswith(f"{verifier_pool.STAGING_MOUNT}/")
+
+
+def test_run_is_bounded_and_close_removes_containers(report_path):
+    client = FakeDockerClient()
+    pool = verifier_pool.VerifierPool("verifier", 3, client)
+    with futures.ThreadPoolExecutor(max_workers=8) as executor:
+        outputs = list(executor.map(lambda _: pool.run(report_path, ["report", "results"]), range(20)))
+    staging_dir = pool.staging_dir
+    pool.close()
+
+    assert all(json.loads(output) == REPORT_OUTPUT for output in outputs)
+    assert 1 <= len(client.started) <= 3
+    assert client.max_running <= 3
+    assert all(container.removed for container in client.started)
+    assert not os.path.exists(staging_dir)
+
+
+def test_close_pools(report_path, docker_client, monkeypatch):
+    client = docker_client
+    monkeypatch.setenv(verifier_pool.POOL_SIZE_ENV, "2")
+
+    pool = verifier_pool.get_pool("verifier")
+    assert verifier_pool.get_pool("verifier") is pool
+    pool.run(report_path, ["report", "all"])
+    verifier_pool.close_pools()
+
+    assert verifier_pool.pools == {}
+    assert client.started and all(container.removed for container in client.started)
@@ -23,7 +23,9 @@ A tampered report is only determined if the chart-testing check has passed:
 These are not comprehensive lists - other certification checks will preform further checks
 """
 
+import os
 import sys
+import copy
 import semantic_version
 
 import yaml
@@ -42,25 +44,132 @@ CERTIFIED_VERSION_ANNOTATION = "charts.openshift.io/certifiedOpenShiftVersions"
 SUPPORTED_VERSIONS_ANNOTATION = "charts.openshift.io/supportedOpenShiftVersions"
 KUBE_VERSION_ATTRIBUTE = "kubeVersion"
 
-def get_report_data(report_path):
+verifier_reports = {}
+
+class VerifierReport:
+    """A verifier report loaded from a file, use get_verifier_report to get one.
+
+    The report is parsed once, the values used by the workflow are worked out
+    when first used. The report is shared by everyone getting it, data returns a
+    copy of the report content.
+    """
+
+    __slots__ = ("path", "_data", "_results", "_digests", "_profile_version", "_web_catalog_only")
+
+    def __init__(self, path, data):
+        self.path = path
+        self._data = data
+        self._results = None
+        self._digests = None
+        self._profile_version = None
+        self._web_catalog_only = None
+
+    @property
+    def data(self):
+        return copy.deepcopy(self._data)
+
+    @property
+    def results(self):
+        """Results keyed by check name without the check version, e.g. "chart-testing"."""
+        if self._results is None:
+            self._results = {}
+            for result in self._data["results"]:
+                check = result["check"]
+                separator = check.rfind("/")
+                if separator != -1:
+                    self._results.setdefault(check[separator+1:], result)
+        return self._results
+
+    def get_result(self, check_name):
+        """Return outcome and reason of the check with a name ending in check_name, e.g. "/chart-testing"."""
+        if check_name.startswith("/") and "/" not in check_name[1:]:
+            result = self.results.get(check_name[1:])
+        else:
+            result = None
+            for report_result in self._data["results"]:
+                if report_result["check"].endswith(check_name):
+                    result = report_result
+                    break
+        if result is None:
+            return False,"Not Found"
+        return result["outcome"] == "PASS",result["reason"]
+
+    @property
+    def digests(self):
+        if self._digests is None:
+            try:
+                self._digests = self._data["metadata"]["tool"]["digests"] or {}
+            except Exception as err:
+                print(f"Exception getting digests {err=}, {type(err)=}")
+                self._digests = {}
+        return self._digests
+
+    @property
+    def package_digest(self):
+        return self.digests.get("package")
+
+    @property
+    def public_key_digest(self):
+        return self.digests.get("publicKey")
+
+    @property
+    def profile_version(self):
+        if self._profile_version is None:
+            self._profile_version = "1.1"
+            try:
+                self._profile_version = self._data["metadata"]["tool"]["profile"]["version"][1:]
+            except Exception:
+                pass
+        return self._profile_version
+
+    @property
+    def web_catalog_only(self):
+        if self._web_catalog_only is None:
+            self._web_catalog_only = False
+            try:
+                if "webCatalogOnly" in self._data["metadata"]["tool"]:
+                    self._web_catalog_only = self._data["metadata"]["tool"]["webCatalogOnly"]
+                if "providerControlledDelivery" in self._data["metadata"]["tool"]:
+                    self._web_catalog_only = self._data["metadata"]["tool"]["providerControlledDelivery"]
+            except Exception as err:
+                print(f"Exception getting webCatalogOnly/providerControlledDelivery {err=}, {type(err)=}")
+                pass
+        return self._web_catalog_only
+
+
+def get_verifier_report(report_path):
+    """Return the VerifierReport for report_path, or None if it cannot be loaded.
+
+    Reports are cached by path and modification time.
+    """
     try:
-        with open(report_path) as report_data:
+        path = os.path.abspath(report_path)
+        mtime = os.stat(path).st_mtime_ns
+        cached = verifier_reports.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path) as report_data:
             report_content = yaml.load(report_data,Loader=Loader)
-        return True,report_content
+        report = VerifierReport(path, report_content)
+        verifier_reports[path] = (mtime, report)
+        return report
     except Exception as err:
         print(f"Exception 2 loading file: {err}")
+        return None
+
+def get_report_data(report_path):
+    report = get_verifier_report(report_path)
+    if report is None:
         return False,""
+    return True,report.data
+
+def _get_report(report_data):
+    if isinstance(report_data, VerifierReport):
+        return report_data
+    return VerifierReport("", report_data)
 
 def get_result(report_data,check_name):
-    outcome = False
-    reason = "Not Found"
-    for result in report_data["results"]:
-        if result["check"].endswith(check_name):
-            reason = result["reason"]
-            if result["outcome"] == "PASS":
-                outcome = True
-            break
-    return outcome,reason
+    return _get_report(report_data).get_result(check_name)
 
 def get_chart_testing_result(report_data):
     return get_result(report_data,"/chart-testing")
@@ -72,46 +181,16 @@ def get_signature_is_valid_result(report_data):
     return get_result(report_data,"/signature-is-valid")
 
 def get_profile_version(report_data):
-    profile_version = "1.1"
-    try:
-        profile_version = report_data["metadata"]["tool"]["profile"]["version"][1:]
-    except Exception:
-        pass
-    return profile_version
+    return _get_report(report_data).profile_version
 
 def get_web_catalog_only(report_data):
-    web_catalog_only = False
-    try:
-        if "webCatalogOnly" in report_data["metadata"]["tool"]:
-            web_catalog_only = report_data["metadata"]["tool"]["webCatalogOnly"]
-        if "providerControlledDelivery" in report_data["metadata"]["tool"]:
-            web_catalog_only = report_data["metadata"]["tool"]["providerControlledDelivery"]
-    except Exception as err:
-        print(f"Exception getting webCatalogOnly/providerControlledDelivery {err=}, {type(err)=}")
-        pass
-    return web_catalog_only
+    return _get_report(report_data).web_catalog_only
 
 def get_package_digest(report_data):
-    package_digest = None
-    try:
-        digests = report_data["metadata"]["tool"]["digests"]
-        if "package" in digests:
-            package_digest = digests["package"]
-    except Exception as err:
-        print(f"Exception getting package digest {err=}, {type(err)=}")
-        pass
-    return package_digest
+    return _get_report(report_data).package_digest
 
 def get_public_key_digest(report_data):
-    public_key_digest = None
-    try:
-        digests = report_data["metadata"]["tool"]["digests"]
-        if "publicKey" in digests:
-            public_key_digest = digests["publicKey"]
-    except Exception as err:
-        print(f"Exception getting publicKey digest {err=}, {type(err)=}")
-        pass
-    return public_key_digest
+    return _get_report(report_data).public_key_digest
 
 
 def report_is_valid(report_data):
@@ -140,19 +219,20 @@ def report_is_valid(report_data):
 
 def validate(report_path):
 
-    is_valid_yaml,report_data = get_report_data(report_path)
+    report = get_verifier_report(report_path)
 
-    if not is_valid_yaml:
+    if report is None:
         return False,f"Report is not valid yaml: {report_path}"
 
-    if not report_is_valid(report_data):
+    # report_is_valid only reads the data, use it without the copy made by report.data
+    if not report_is_valid(report._data):
         return False,f"Report is incomplete and cannot be processed: {report_path}"
 
     ## No value in checking if chart testing failed
-    chart_testing_outcome,_ = get_chart_testing_result(report_data)
+    chart_testing_outcome,_ = get_chart_testing_result(report)
     if chart_testing_outcome:
 
-        profile_version_string = get_profile_version(report_data)
+        profile_version_string = report.profile_version
 
         try:
             profile_version = semantic_version.Version.coerce(profile_version_string)
@@ -184,7 +264,7 @@ def validate(report_path):
         except ValueError:
             return False,f"{tested_version_annotation} {tested_version_string} is not a valid semantic version."
 
-        has_kubeversion_outcome,_ = get_chart_testing_result(report_data)
+        has_kubeversion_outcome,_ = get_chart_testing_result(report)
         if has_kubeversion_outcome:
 
             chart = report_info.get_report_chart(report_path)
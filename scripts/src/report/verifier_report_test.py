@@ -0,0 +1,85 @@
+import os
+import shutil
+
+import pytest
+
+from report import verifier_report
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+REPORT_PATH = os.path.join(REPO_ROOT, "tests", "data", "HC-06", "partner", "report.yaml")
+
+
+@pytest.fixture
+def report_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(verifier_report, "verifier_reports", {})
+    path = tmp_path / "report.yaml"
+    shutil.copy(REPORT_PATH, path)
+    return str(path)
+
+
+def test_report_is_cached(report_path):
+    report = verifier_report.get_verifier_report(report_path)
+    assert report is not None
+    assert verifier_report.get_verifier_report(report_path) is report
+    assert verifier_report.get_verifier_report(os.path.relpath(report_path)) is report
+
+
+def test_report_cache_is_invalidated_by_a_change(report_path):
+    report = verifier_report.get_verifier_report(report_path)
+    assert report.web_catalog_only is True
+
+    with open(report_path) as fd:
+        content = fd.read()
+    with open(report_path, "w") as fd:
+        fd.write(content.replace("providerControlledDelivery: true", "providerControlledDelivery: false"))
+    stat = os.stat(report_path)
+    os.utime(report_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    changed_report = verifier_report.get_verifier_report(report_path)
+    assert changed_report is not report
+    assert changed_report.web_catalog_only is False
+
+
+def test_missing_report(tmp_path):
+    assert verifier_report.get_verifier_report(str(tmp_path / "report.yaml")) is None
+
+
+def test_data_is_a_copy(report_path):
+    report = verifier_report.get_verifier_report(report_path)
+    data = report.data
+    data["results"].clear()
+    data["metadata"]["tool"]["profile"]["version"] = "v9.9"
+
+    assert report.data["results"]
+    assert report.get_result("/chart-testing") == (True, "Chart tests have passed")
+    assert verifier_report.get_verifier_report(report_path).data["metadata"]["tool"]["profile"]["version"] == "v1.1"
+
+
+def test_cached_values(report_path):
+    report = verifier_report.get_verifier_report(report_path)
+    assert report.profile_version == "1.1"
+    assert report.web_catalog_only is True
+    assert report.package_digest == "9cb7e3a5d82537f512319c754ccd6e9a4be08118b34849609d0fc261934d062a"
+    assert report.public_key_digest is None
+
+
+@pytest.mark.parametrize("check_name,expected", [
+    ("/chart-testing", (True, "Chart tests have passed")),
+    ("/has-kubeversion", (True, "Kubernetes version specified")),
+    ("v1.1/has-kubeversion", (True, "Kubernetes version specified")),
+    ("/signature-is-valid", (False, "Not Found")),
+    ("chart-testing", (True, "Chart tests have passed")),
+])
+def test_get_result(report_path, check_name, expected):
+    report = verifier_report.get_verifier_report(report_path)
+    assert report.get_result(check_name) == expected
+    assert verifier_report.get_result(report.data, check_name) == expected
+
+
+def test_validate_does_not_copy_the_report(report_path, monkeypatch):
+    def copy_data(report):
+        raise AssertionError("report data copied")
+
+    monkeypatch.setattr(verifier_report.VerifierReport, "data", property(copy_data))
+    monkeypatch.setattr(verifier_report, "get_chart_testing_result", lambda report: (False, ""))
+    assert verifier_report.validate(report_path) == (True, "")
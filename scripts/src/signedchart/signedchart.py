@@ -84,9 +84,9 @@ def get_pgp_key_from_owners(owner_path):
 
 def check_report_for_signed_chart(report_path):
 
-    found,report_data = verifier_report.get_report_data(report_path)
-    if found:
-        outcome,reason = verifier_report.get_signature_is_valid_result(report_data)
+    report = verifier_report.get_verifier_report(report_path)
+    if report:
+        outcome,reason = verifier_report.get_signature_is_valid_result(report)
         if "Chart is signed" in reason:
             return True
     return False
@@ -98,11 +98,11 @@ def check_pgp_public_key(owner_pgp_key,report_path):
     #  - report not found
     #  - report is not for a signed chart
     #  - digests match
-    found,report_data = verifier_report.get_report_data(report_path)
-    if found:
+    report = verifier_report.get_verifier_report(report_path)
+    if report:
         pgp_public_key_digest_owners = subprocess.getoutput(f'echo {owner_pgp_key} | sha256sum').split(" ")[0]
         print(f"[INFO] digest of PGP key from OWNERS :{pgp_public_key_digest_owners}:")
-        pgp_public_digest_report = verifier_report.get_public_key_digest(report_data)
+        pgp_public_digest_report = report.public_key_digest
         print(f"[INFO] PGP key digest in report :{pgp_public_digest_report}:")
         if pgp_public_digest_report:
             return pgp_public_key_digest_owners == pgp_public_digest_report
@@ -0,0 +1,112 @@
+"""
+File and HTTP helpers shared by the caches of the release tools.
+
+- write_file writes a file through a temporary file in the same directory and a rename,
+  so a reader, for example another workflow step, never sees a partly written file.
+- get_file_digest returns the sha256 of a file, read in chunks.
+- conditional_get downloads a URL and keeps a value computed from the response in a json
+  cache entry with the ETag and Last-Modified of the response. The entry is revalidated
+  with If-None-Match and If-Modified-Since, so an unchanged resource is not downloaded
+  or processed again.
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+import requests
+
+CHUNK_SIZE = 1024 * 1024
+
+def write_file(path, content):
+    """Write content, str or bytes, to path, replacing the file at once."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(content, bytes) else "w") as temp_file:
+            temp_file.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def get_file_digest(path):
+    """Return the sha256 hex digest of the file at path."""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as fd:
+        for chunk in iter(lambda: fd.read(CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def read_entry(entry_path, url):
+    """Return the conditional_get cache entry at entry_path if it is for url, otherwise {}."""
+    if not entry_path:
+        return {}
+    try:
+        with open(entry_path) as fd:
+            entry = json.load(fd)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as err:
+        print(f"[WARNING] ignoring unreadable cache entry {entry_path}: {err}")
+        return {}
+    if not isinstance(entry, dict) or entry.get("url") != url or "value" not in entry \
+            or not (entry.get("etag") or entry.get("last_modified")):
+        return {}
+    return entry
+
+def conditional_get(url, entry_path, read_response, timeout, use_entry=None):
+    """Return (HTTP status code, value) for url, revalidating the value cached in entry_path.
+
+    read_response(response) returns the value of a 200 response, it must be json
+    serializable. The response is streamed so it can be read in chunks. A 304 response
+    returns the cached value. The value is None if the status code is not 200, values of
+    other responses are never cached. If entry_path is empty nothing is cached.
+
+    use_entry(entry) can reject a cached entry, for example if a file it refers to is
+    missing, the resource is then downloaded again. requests exceptions are raised, the
+    caller can fall back on read_entry.
+    """
+    entry = read_entry(entry_path, url)
+    if entry and use_entry is not None and not use_entry(entry):
+        entry = {}
+
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    with requests.get(url, headers=headers, stream=True, allow_redirects=True, timeout=timeout) as response:
+        if response.status_code == 304 and entry:
+            try:
+                # mark as validated now, for callers using the entry age
+                os.utime(entry_path)
+            except OSError:
+                pass
+            return 200, entry.get("value")
+        if response.status_code != 200:
+            return response.status_code, None
+        value = read_response(response)
+        etag = response.headers.get("ETag", "")
+        last_modified = response.headers.get("Last-Modified", "")
+
+    if entry_path and (etag or last_modified):
+        try:
+            write_file(entry_path, json.dumps({"url": url, "etag": etag, "last_modified": last_modified, "value": value}))
+        except (OSError, TypeError, ValueError) as err:
+            print(f"[WARNING] unable to write cache entry {entry_path}: {err}")
+    return 200, value
+
+def get_entry_age(entry_path):
+    """Return the seconds since the entry at entry_path was written or revalidated, None if there is none."""
+    try:
+        return max(0, time.time() - os.path.getmtime(entry_path))
+    except OSError:
+        return None
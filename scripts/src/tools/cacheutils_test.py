@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from tools import cacheutils
+
+CONTENT = b"cached content" * 1000
+
+
+def read_length(response):
+    return len(response.content)
+
+
+@pytest.fixture
+def server(static_server):
+    static_server.files["/file"] = CONTENT
+    return static_server
+
+
+def test_write_file(tmpdir):
+    path = str(tmpdir / "dir" / "file.txt")
+    cacheutils.write_file(path, "text")
+    cacheutils.write_file(path + ".bin", b"bytes")
+    with open(path) as fd:
+        assert fd.read() == "text"
+    with open(path + ".bin", "rb") as fd:
+        assert fd.read() == b"bytes"
+    assert sorted(os.listdir(tmpdir / "dir")) == ["file.txt", "file.txt.bin"]
+
+
+def test_write_file_error_removes_temp_file(tmpdir):
+    with pytest.raises(TypeError):
+        cacheutils.write_file(str(tmpdir / "file.txt"), None)
+    assert os.listdir(tmpdir) == []
+
+
+def test_get_file_digest(tmpdir):
+    path = str(tmpdir / "file")
+    cacheutils.write_file(path, CONTENT * 100)
+    assert cacheutils.get_file_digest(path) == hashlib.sha256(CONTENT * 100).hexdigest()
+
+
+def test_conditional_get(server, tmpdir):
+    url = f"{server.url}/file"
+    entry_path = str(tmpdir / "entry.json")
+    etag = server.get_etag(CONTENT)
+
+    assert cacheutils.get_entry_age(entry_path) is None
+    assert cacheutils.conditional_get(url, entry_path, read_length, 10) == (200, len(CONTENT))
+    assert cacheutils.read_entry(entry_path, url)["value"] == len(CONTENT)
+    assert cacheutils.read_entry(entry_path, f"{server.url}/other") == {}
+
+    # a 304 returns the cached value without reading the response
+    assert cacheutils.conditional_get(url, entry_path, None, 10) == (200, len(CONTENT))
+    assert cacheutils.get_entry_age(entry_path) < 60
+
+    # a rejected entry is downloaded again
+    assert cacheutils.conditional_get(url, entry_path, read_length, 10, use_entry=lambda entry: False) == (200, len(CONTENT))
+    assert server.requests == [("/file", None), ("/file", etag), ("/file", None)]
+
+
+def test_conditional_get_does_not_cache_errors(server, tmpdir):
+    entry_path = str(tmpdir / "entry.json")
+    assert cacheutils.conditional_get(f"{server.url}/missing", entry_path, read_length, 10) == (404, None)
+    assert not os.path.exists(entry_path)
+
+
+def test_conditional_get_ignores_invalid_entry(server, tmpdir):
+    url = f"{server.url}/file"
+    entry_path = str(tmpdir / "entry.json")
+    cacheutils.write_file(entry_path, json.dumps({"url": url, "etag": server.get_etag(CONTENT)}))
+    assert cacheutils.conditional_get(url, entry_path, read_length, 10) == (200, len(CONTENT))
+    assert server.requests == [("/file", None)]
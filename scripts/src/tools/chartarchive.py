@@ -0,0 +1,96 @@
+"""
+Read the Chart.yaml of a helm chart archive (.tgz) without helm.
+
+The archive is read as a gzip stream and reading stops at the chart Chart.yaml,
+<chart directory>/Chart.yaml, so nothing is extracted to disk and the rest of a large
+archive, for example vendored dependencies, is not decompressed.
+
+update_chart_yaml rewrites the Chart.yaml of an archive the same way, streaming the
+archive into a new one without extracting it or running helm package.
+"""
+
+import io
+import sys
+import gzip
+import tarfile
+
+import yaml
+try:
+    from yaml import CBaseLoader as BaseLoader
+except ImportError:
+    from yaml import BaseLoader
+
+sys.path.append('../')
+from report import report_summary
+
+CHART_FILE = "Chart.yaml"
+# compression level of updated archives, the gzip default used by helm package
+COMPRESS_LEVEL = 6
+
+
+class ChartArchiveError(Exception):
+    pass
+
+
+def is_chart_file(member_name):
+    """Return True for the Chart.yaml of the chart, not of a dependency in charts/."""
+    parts = member_name.split("/")
+    if parts[0] == ".":
+        parts = parts[1:]
+    return len(parts) == 2 and parts[1] == CHART_FILE
+
+def get_chart_yaml(archive_path):
+    """Return the Chart.yaml content of the chart archive."""
+    try:
+        # helm writes a gzip extra header field, which tarfile "r|gz" streams do not
+        # support, so the gzip stream is read with gzip
+        with gzip.open(archive_path, "rb") as archive, tarfile.open(fileobj=archive, mode="r|") as tar:
+            for member in tar:
+                if member.isfile() and is_chart_file(member.name):
+                    return tar.extractfile(member).read().decode("utf-8")
+    except (OSError, EOFError, tarfile.TarError, UnicodeDecodeError) as err:
+        raise ChartArchiveError(f"unable to read {archive_path}: {err}")
+    raise ChartArchiveError(f"{CHART_FILE} not found in {archive_path}")
+
+def get_chart_metadata(archive_path):
+    """Return the chart metadata of the chart archive, as output by helm show chart."""
+    content = get_chart_yaml(archive_path)
+    try:
+        chart = yaml.load(content, Loader=BaseLoader)
+    except yaml.YAMLError as err:
+        raise ChartArchiveError(f"unable to parse {CHART_FILE} in {archive_path}: {err}")
+    if not isinstance(chart, dict):
+        raise ChartArchiveError(f"invalid {CHART_FILE} in {archive_path}")
+    return report_summary.convert_chart_metadata(chart)
+
+def get_name_and_version(archive_path):
+    chart = get_chart_metadata(archive_path)
+    return chart.get("name", ""), chart.get("version", "")
+
+def update_chart_yaml(archive_path, output_path, update):
+    """Copy the chart archive to output_path with Chart.yaml replaced by update(content).
+
+    Members are copied as they are read, in the same order and with the same headers, only
+    the Chart.yaml content and size change. The gzip header has no timestamp or file name
+    and a fixed compression level is used, so the output only depends on the input.
+    """
+    found = False
+    try:
+        with gzip.open(archive_path, "rb") as archive, tarfile.open(fileobj=archive, mode="r|") as tar, \
+             open(output_path, "wb") as output, \
+             gzip.GzipFile(filename="", mode="wb", fileobj=output, compresslevel=COMPRESS_LEVEL, mtime=0) as compressed, \
+             tarfile.open(fileobj=compressed, mode="w|", format=tarfile.PAX_FORMAT) as updated_tar:
+            for member in tar:
+                if member.isfile() and is_chart_file(member.name) and not found:
+                    found = True
+                    content = update(tar.extractfile(member).read().decode("utf-8")).encode("utf-8")
+                    member.size = len(content)
+                    updated_tar.addfile(member, io.BytesIO(content))
+                elif member.isfile():
+                    updated_tar.addfile(member, tar.extractfile(member))
+                else:
+                    updated_tar.addfile(member)
+    except (OSError, EOFError, tarfile.TarError, UnicodeDecodeError) as err:
+        raise ChartArchiveError(f"unable to update {archive_path}: {err}")
+    if not found:
+        raise ChartArchiveError(f"{CHART_FILE} not found in {archive_path}")
@@ -0,0 +1,70 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+from tools import chartarchive
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "tests", "data")
+
+
+def write_archive(path, files):
+    with tarfile.open(path, "w:gz") as tar:
+        for name, content in files:
+            data = content.encode("utf-8")
+            member = tarfile.TarInfo(name)
+            member.size = len(data)
+            tar.addfile(member, io.BytesIO(data))
+
+
+def test_get_name_and_version():
+    assert chartarchive.get_name_and_version(os.path.join(DATA_DIR, "vault-0.17.0.tgz")) == ("vault", "0.17.0")
+    assert chartarchive.get_name_and_version(os.path.join(DATA_DIR, "psql-service-0.1.10-1.tgz")) == ("psql-service", "0.1.10-1")
+
+
+def test_dependency_chart_yaml_is_ignored(tmpdir):
+    archive_path = os.path.join(tmpdir, "parent-1.10.tgz")
+    write_archive(archive_path, [("parent/charts/child/Chart.yaml", "name: child\nversion: 2.0.0\n"),
+                                 ("parent/Chart.yaml", "apiVersion: v2\nname: parent\nversion: 1.10\ndeprecated: false\n")])
+    chart = chartarchive.get_chart_metadata(archive_path)
+    assert chart == {"apiVersion": "v2", "name": "parent", "version": "1.10"}
+
+
+def test_missing_chart_yaml(tmpdir):
+    archive_path = os.path.join(tmpdir, "empty.tgz")
+    write_archive(archive_path, [("empty/values.yaml", "")])
+    with pytest.raises(chartarchive.ChartArchiveError):
+        chartarchive.get_chart_metadata(archive_path)
+
+
+def read_members(archive_path):
+    with tarfile.open(archive_path, "r:gz") as tar:
+        return [(member.name, member.mtime, member.mode, tar.extractfile(member).read() if member.isfile() else None)
+                for member in tar.getmembers()]
+
+
+def test_update_chart_yaml(tmpdir):
+    archive_path = os.path.join(DATA_DIR, "vault-0.17.0.tgz")
+    first_path = os.path.join(tmpdir, "first.tgz")
+    second_path = os.path.join(tmpdir, "second.tgz")
+
+    def update(content):
+        return content + "annotations:\n  charts.openshift.io/provider: acme\n"
+
+    chartarchive.update_chart_yaml(archive_path, first_path, update)
+    chartarchive.update_chart_yaml(archive_path, second_path, update)
+
+    with open(first_path, "rb") as first, open(second_path, "rb") as second:
+        assert first.read() == second.read()
+
+    original = read_members(archive_path)
+    updated = read_members(first_path)
+    assert [member[:3] for member in updated] == [member[:3] for member in original]
+    for original_member, updated_member in zip(original, updated):
+        if original_member[0] == "vault/Chart.yaml":
+            assert updated_member[3] == update(original_member[3].decode("utf-8")).encode("utf-8")
+        else:
+            assert updated_member[3] == original_member[3]
+
+    assert chartarchive.get_chart_metadata(first_path)["annotations"] == {"charts.openshift.io/provider": "acme"}
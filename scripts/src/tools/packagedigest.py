@@ -0,0 +1,59 @@
+"""
+SHA-256 digests of chart packages (.tgz) at a URL.
+
+The package is downloaded with a single streaming GET, following redirects, and hashed
+in chunks so the package is never held in memory. Digests of packages downloaded with a
+200 response are kept for the process and, if PACKAGE_DIGEST_CACHE_DIR is set, in a cache
+directory that can be shared between workflow steps. Other responses are not kept, so a
+package that is not available yet is requested again. A cached digest is stored with the ETag of the download and revalidated
+with If-None-Match, so an unchanged package is not downloaded again.
+"""
+
+import os
+import sys
+import hashlib
+
+sys.path.append('../')
+from tools import cacheutils
+
+CACHE_DIR_ENV = "PACKAGE_DIGEST_CACHE_DIR"
+CHUNK_SIZE = cacheutils.CHUNK_SIZE
+TIMEOUT = 60
+
+# url -> digest
+package_digests = {}
+
+def _get_cache_path(url):
+    cache_dir = os.environ.get(CACHE_DIR_ENV, "")
+    if not cache_dir:
+        return ""
+    return os.path.join(cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+def _get_response_digest(response):
+    sha256 = hashlib.sha256()
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        sha256.update(chunk)
+    digest = sha256.hexdigest()
+    print(f"[DEBUG]: calculated digest : {digest}")
+    return digest
+
+def get_package_digest(url):
+    """Return (HTTP status code, sha256 hex digest) of the package at url.
+
+    The digest is empty if the status code is not 200. requests exceptions, for example
+    for an invalid URL, are raised.
+    """
+    if url in package_digests:
+        return 200, package_digests[url]
+
+    status_code, digest = cacheutils.conditional_get(url, _get_cache_path(url), _get_response_digest, TIMEOUT)
+    print(f"[DEBUG]: response code for {url}: {status_code}")
+    if status_code != 200:
+        return status_code, ""
+
+    package_digests[url] = digest
+    return status_code, digest
+
+def add_known_package_digest(url, digest):
+    """Use digest for url, for example the digest of the local file uploaded to url."""
+    package_digests[url] = digest
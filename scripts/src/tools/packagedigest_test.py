@@ -0,0 +1,44 @@
+import hashlib
+
+import pytest
+
+from tools import packagedigest
+
+PACKAGE = b"chart package content" * 100000
+
+
+@pytest.fixture
+def server(monkeypatch, static_server):
+    monkeypatch.setattr(packagedigest, "package_digests", {})
+    static_server.files["/chart.tgz"] = PACKAGE
+    static_server.redirects["/redirect.tgz"] = "/chart.tgz"
+    return static_server
+
+
+def test_get_package_digest(server, monkeypatch, tmpdir):
+    monkeypatch.setenv(packagedigest.CACHE_DIR_ENV, str(tmpdir))
+    url = f"{server.url}/redirect.tgz"
+    expected = (200, hashlib.sha256(PACKAGE).hexdigest())
+    etag = server.get_etag(PACKAGE)
+
+    assert packagedigest.get_package_digest(url) == expected
+    assert packagedigest.get_package_digest(url) == expected
+    assert server.requests == [("/redirect.tgz", None), ("/chart.tgz", None)]
+
+    # a new process revalidates the cached digest
+    monkeypatch.setattr(packagedigest, "package_digests", {})
+    assert packagedigest.get_package_digest(url) == expected
+    assert server.requests[2:] == [("/redirect.tgz", etag), ("/chart.tgz", etag)]
+
+
+def test_get_package_digest_not_found_is_not_kept(server, monkeypatch, tmpdir):
+    monkeypatch.setenv(packagedigest.CACHE_DIR_ENV, str(tmpdir))
+    url = f"{server.url}/chart-0.1.0.tgz"
+    assert packagedigest.get_package_digest(url) == (404, "")
+    assert url not in packagedigest.package_digests
+    assert tmpdir.listdir() == []
+
+    # the package is uploaded
+    server.files["/chart-0.1.0.tgz"] = PACKAGE
+    assert packagedigest.get_package_digest(url) == (200, hashlib.sha256(PACKAGE).hexdigest())
+    assert server.requests == [("/chart-0.1.0.tgz", None), ("/chart-0.1.0.tgz", None)]
@@ -0,0 +1,82 @@
+"""
+Release manifest handed from chart-pr-review to chart-repo-manager.
+
+chart-pr-review writes the values it computed while reviewing a chart to
+release-manifest.json in the PR artifact directory: the chart entry from the report, the
+index annotations, the report digests and whether a redhat chart is published as
+community.
+
+The manifest includes the sha256 of the report it was computed from and a sha256 of its
+own content. chart-repo-manager only uses the manifest if both still match and it is
+for the same chart, otherwise the values are computed again. The manifest hash only
+detects a changed or truncated file, it is not a signature. The manifest has no package
+digest, the release always computes it from the chart package.
+"""
+
+import os
+import sys
+import json
+import hashlib
+
+sys.path.append('../')
+from tools import cacheutils
+
+MANIFEST_FILE = "release-manifest.json"
+MANIFEST_VERSION = 1
+MANIFEST_HASH = "manifest_sha256"
+
+def _get_content_digest(manifest):
+    content = {key: value for key, value in manifest.items() if key != MANIFEST_HASH}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+def create_manifest(category, organization, chart, version, report_path, chart_entry, chart_url,
+                    annotations, digests, redhat_to_community):
+    manifest = {"version": MANIFEST_VERSION,
+                "chart": {"category": category,
+                          "organization": organization,
+                          "name": chart,
+                          "version": version},
+                "report_sha256": cacheutils.get_file_digest(report_path),
+                "chart_entry": chart_entry,
+                "chart_url": chart_url,
+                "annotations": annotations,
+                "digests": digests,
+                "redhat_to_community": redhat_to_community}
+    manifest[MANIFEST_HASH] = _get_content_digest(manifest)
+    return manifest
+
+def write_manifest(directory, manifest):
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    cacheutils.write_file(manifest_path, json.dumps(manifest, sort_keys=True, indent=2))
+    print(f"[INFO] release manifest written to {manifest_path}")
+    return manifest_path
+
+def load_manifest(manifest_path, category, organization, chart, version, report_path):
+    """Return the manifest if it is valid for the chart and the report, otherwise None."""
+    if not manifest_path or not os.path.exists(manifest_path):
+        print("[INFO] no release manifest")
+        return None
+
+    try:
+        with open(manifest_path) as fd:
+            manifest = json.load(fd)
+    except (OSError, ValueError) as err:
+        print(f"[WARNING] release manifest not used, unable to load {manifest_path}: {err}")
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        print("[WARNING] release manifest not used, unknown manifest version")
+        return None
+    if manifest.get(MANIFEST_HASH) != _get_content_digest(manifest):
+        print("[WARNING] release manifest not used, content does not match the manifest hash")
+        return None
+    expected_chart = {"category": category, "organization": organization, "name": chart, "version": version}
+    if manifest.get("chart") != expected_chart:
+        print(f"[WARNING] release manifest not used, it is for {manifest.get('chart')}")
+        return None
+    if not report_path or not os.path.exists(report_path) or manifest.get("report_sha256") != cacheutils.get_file_digest(report_path):
+        print("[WARNING] release manifest not used, the report does not match the manifest")
+        return None
+
+    print(f"[INFO] using release manifest {manifest_path}")
+    return manifest
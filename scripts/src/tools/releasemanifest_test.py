@@ -0,0 +1,44 @@
+import json
+import os
+
+from tools import releasemanifest
+
+CHART = ("partners", "acme", "awesome", "1.0.0")
+
+
+def write_report(tmpdir, content="apiversion: v1\nkind: verify-report\n"):
+    report_path = os.path.join(tmpdir, "report.yaml")
+    with open(report_path, "w") as fd:
+        fd.write(content)
+    return report_path
+
+
+def write_test_manifest(tmpdir, report_path):
+    manifest = releasemanifest.create_manifest(*CHART, report_path,
+                                               {"name": "awesome", "version": "1.0.0"},
+                                               "https://example.com/awesome-1.0.0.tgz",
+                                               {"charts.openshift.io/supportedOpenShiftVersions": ">=4.8"},
+                                               {"chart": "sha256:abc", "package": "def"}, False)
+    return releasemanifest.write_manifest(os.path.join(tmpdir, "pr"), manifest), manifest
+
+
+def test_load_manifest(tmpdir):
+    report_path = write_report(tmpdir)
+    manifest_path, manifest = write_test_manifest(tmpdir, report_path)
+    assert releasemanifest.load_manifest(manifest_path, *CHART, report_path) == manifest
+
+
+def test_manifest_not_used(tmpdir):
+    report_path = write_report(tmpdir)
+    manifest_path, manifest = write_test_manifest(tmpdir, report_path)
+
+    assert releasemanifest.load_manifest("", *CHART, report_path) is None
+    assert releasemanifest.load_manifest(manifest_path, "partners", "acme", "awesome", "1.0.1", report_path) is None
+
+    changed_report_path = write_report(os.path.join(tmpdir, "pr"), "apiversion: v1\nkind: other\n")
+    assert releasemanifest.load_manifest(manifest_path, *CHART, changed_report_path) is None
+
+    manifest["redhat_to_community"] = True
+    with open(manifest_path, "w") as fd:
+        json.dump(manifest, fd)
+    assert releasemanifest.load_manifest(manifest_path, *CHART, report_path) is None
@@ -2,13 +2,16 @@
 """Utility module for processing chart files."""
 
 import os
-import tarfile
 import yaml
 import shutil
+import sys
 import json
 from enum import Enum
 from dataclasses import dataclass
 
+sys.path.append('../../../../../scripts/src')
+from tools import chartarchive
+
 class Chart_Type(Enum):
     SRC = 1
     TAR = 2
@@ -76,19 +79,10 @@ def get_name_and_version_from_chart_tar(path):
     str: chart name
     str: chart version
     """
-    tar = tarfile.open(path)
-    for member in tar.getmembers():
-        if member.name.split('/')[-1] == 'Chart.yaml':
-            chart = tar.extractfile(member)
-            if chart is not None:
-                content = chart.read()
-                try:
-                    chart_yaml = yaml.safe_load(content)
-                    return chart_yaml['name'], chart_yaml['version']
-                except yaml.YAMLError as err:
-                    raise AssertionError(f"error parsing '{path}': {err}")
-    else:
-        raise AssertionError(f"Chart.yaml not in {path}")
+    try:
+        return chartarchive.get_name_and_version(path)
+    except chartarchive.ChartArchiveError as err:
+        raise AssertionError(f"error reading '{path}': {err}")
 
 
 def get_name_and_version_from_chart_src(path):
@@ -121,9 +115,8 @@ def extract_chart_tgz(src, dst, chart_name, logger):
     except FileNotFoundError:
         logger.info(f"'{dst}/src' does not exist")
     finally:
-        with tarfile.open(src, 'r') as fd:
-            fd.extractall(dst)
-            os.rename(f'{dst}/{chart_name}', f'{dst}/src')
+        shutil.unpack_archive(src, dst, 'gztar')
+        os.rename(f'{dst}/{chart_name}', f'{dst}/src')
 
 def get_all_charts(charts_path: str, vendor_types: str) -> list:
     # TODO: Support `community` as vendor_type.
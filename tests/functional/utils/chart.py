@@ -2,10 +2,13 @@
 """Utility module for processing chart files."""
 
 import os
-import tarfile
 import pytest
 import yaml
 import shutil
+import sys
+
+sys.path.append('../../../scripts/src')
+from tools import chartarchive
 
 def get_name_and_version_from_report(path):
     """
@@ -34,19 +37,10 @@ def get_name_and_version_from_chart_tar(path):
     str: chart name
     str: chart version
     """
-    tar = tarfile.open(path)
-    for member in tar.getmembers():
-        if member.name.split('/')[-1] == 'Chart.yaml':
-            chart = tar.extractfile(member)
-            if chart is not None:
-                content = chart.read()
-                try:
-                    chart_yaml = yaml.safe_load(content)
-                    return chart_yaml['name'], chart_yaml['version']
-                except yaml.YAMLError as err:
-                    pytest.fail(f"error parsing '{path}': {err}")
-    else:
-        pytest.fail(f"Chart.yaml not in {path}")
+    try:
+        return chartarchive.get_name_and_version(path)
+    except chartarchive.ChartArchiveError as err:
+        pytest.fail(f"error reading '{path}': {err}")
 
 
 def get_name_and_version_from_chart_src(path):
@@ -79,9 +73,8 @@ def extract_chart_tgz(src, dst, secrets, logger):
     except FileNotFoundError:
         logger.info(f"'{dst}/src' does not exist")
     finally:
-        with tarfile.open(src, 'r') as fd:
-            fd.extractall(dst)
-            os.rename(f'{dst}/{secrets.chart_name}', f'{dst}/src')
+        shutil.unpack_archive(src, dst, 'gztar')
+        os.rename(f'{dst}/{secrets.chart_name}', f'{dst}/src')
 
 def get_all_charts(charts_path: str, vendor_types: str) -> list:
     # TODO: Support `community` as vendor_type.
@@ -4,7 +4,6 @@ import semantic_version
 import sys
 
 sys.path.append('../../../scripts/src')
-from chartrepomanager import indexannotations
 from indexfile import index
 
 
@@ -16,17 +15,24 @@ def check_index_entries(ocpVersion):
 
     OCP_VERSION = semantic_version.Version.coerce(ocpVersion)
 
-    for chart in all_chart_list:
+    for chart in index.get_ocp_compatibility(ocpVersion, all_chart_list):
+        compatible = chart["compatibility"][ocpVersion]
+        if compatible is None:
+            if chart["ocpSpec"]:
+                chart["message"] = f'chart {chart["name"]} {chart["version"]} supported OCP version {chart["ocpSpec"]} is not a valid OCP version range'
+                logging.info(f'   ERROR: Chart {chart["name"]} {chart["version"]} supported OCP version {chart["ocpSpec"]} is not a valid OCP version range')
+                failed_chart_list.append(chart)
+            continue
         if "supportedOCP" in chart and chart["supportedOCP"] != "N/A" and chart["supportedOCP"] != "":
-            if OCP_VERSION in semantic_version.NpmSpec(chart["supportedOCP"]):
+            if compatible:
                 logging.info(f'PASS: Chart {chart["name"]} {chart["version"]} supported OCP version {chart["supportedOCP"]} includes: {OCP_VERSION}')
             else:
                 chart["message"] = f'chart {chart["name"]} {chart["version"]} supported OCP version {chart["supportedOCP"]} does not include latest OCP version {OCP_VERSION}'
                 logging.info(f'   ERROR: Chart {chart["name"]} {chart["version"]} supported OCP version {chart["supportedOCP"]} does not include {OCP_VERSION}')
                 failed_chart_list.append(chart)
-        elif "kubeVersion" in chart and chart["kubeVersion"] != "":
-            supportedOCPVersion = indexannotations.getOCPVersions(chart["kubeVersion"])
-            if OCP_VERSION in semantic_version.NpmSpec(supportedOCPVersion):
+        else:
+            supportedOCPVersion = chart["ocpSpec"]
+            if compatible:
                 logging.info(f'PASS: Chart {chart["name"]} {chart["version"]} kubeVersion  {chart["kubeVersion"]} (OCP: {supportedOCPVersion}) includes OCP version: {OCP_VERSION}')
             else:
                 chart["message"] = f'chart {chart["name"]} {chart["version"]} kubeVersion {chart["kubeVersion"]} (OCP: {supportedOCPVersion}) does not include latest OCP version {OCP_VERSION}'
@@ -34,10 +40,3 @@ def check_index_entries(ocpVersion):
                 failed_chart_list.append(chart)
 
     return failed_chart_list
-
-
-
-
-
-
-